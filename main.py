@@ -12,10 +12,17 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 import logging
+import numpy as np
+import pandas as pd
 from src.config_manager import load_config
 from src.logger_setup import setup_logger
-from src.exchange_handler import ExchangeHandler
+from src.exchange_pool import ExchangeHandlerPool
+from src.markets_cache import MarketsCache
+from src.request_stats import get_request_stats
+from src.retry_policy import RetryPolicy
 from src.data_fetcher import DataFetcher
+from src.candle_store import CandleStore
+from src.resampler import resample_store
 from src.models.signal_generator import RandomSignalGenerator, MovingAverageCrossoverSignalGenerator
 from src.trading_engine import TradingEngine
 
@@ -42,6 +49,37 @@ def check_config():
         return False
     return True
 
+_handler_pool = None
+
+def create_exchange_handler(config, pool_size=None):
+    """Returns the pooled ExchangeHandler for the configured account, creating the pool on first use."""
+    global _handler_pool
+    if _handler_pool is None:
+        cache_config = config.get('markets_cache') or {}
+        markets_cache = MarketsCache(cache_config['dir'], cache_config['ttl']) if cache_config.get('ttl') else None
+        _handler_pool = ExchangeHandlerPool(
+            pool_size=pool_size or config.get('http_pool_size', 10),
+            rate_limits=config.get('rate_limits'),
+            markets_cache=markets_cache,
+            retry_policy=RetryPolicy(**(config.get('retry') or {})),
+            balance_ttl=config.get('balance_ttl', 5.0)
+        )
+    return _handler_pool.get(
+        exchange_id=config['default_exchange_id'],
+        api_key=config['api_key'],
+        api_secret=config['api_secret'],
+        is_testnet=config['use_testnet']
+    )
+
+def parse_datetime_arg(value):
+    """Converts a CLI date/time argument (ISO 8601 or epoch milliseconds) to epoch milliseconds."""
+    if value.isdigit():
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.timestamp() * 1000)
+
 def handle_get_balance(args):
     logger.info("Handling get-balance command...")
     if not check_config():
@@ -54,17 +92,12 @@ def handle_get_balance(args):
         return
 
     try:
-        handler = ExchangeHandler(
-            exchange_id=config['default_exchange_id'],
-            api_key=config['api_key'],
-            api_secret=config['api_secret'],
-            is_testnet=config['use_testnet']
-        )
+        handler = create_exchange_handler(config)
         if not handler.exchange: # Initialization failed
             logger.error("Exchange handler initialization failed. Check exchange ID and credentials.")
             return
 
-        if not handler.load_markets():
+        if not handler.load_markets(reload=args.refresh_markets):
             logger.warning("Failed to load markets. Check network or exchange status.")
             return
 
@@ -93,25 +126,60 @@ def handle_fetch_ohlcv(args):
         return
 
     try:
-        handler = ExchangeHandler(
-            exchange_id=config['default_exchange_id'],
-            api_key=config['api_key'],
-            api_secret=config['api_secret'],
-            is_testnet=config['use_testnet']
-        )
+        handler = create_exchange_handler(config)
         if not handler.exchange:
             logger.error("Exchange handler initialization failed.")
             return
-        if not handler.load_markets(): # Important before fetching data for specific symbols
+        if not handler.load_markets(reload=args.refresh_markets): # Important before fetching data for specific symbols
             logger.warning("Failed to load markets.")
             return
 
-        fetcher = DataFetcher(exchange_handler=handler)
+        fetcher = DataFetcher(exchange_handler=handler, compact=args.compact)
+
+        if args.since:
+            since_ms = parse_datetime_arg(args.since)
+            until_ms = parse_datetime_arg(args.until) if args.until else None
+            written = fetcher.backfill_ohlcv(
+                symbol=args.symbol,
+                timeframe=args.timeframe,
+                since=since_ms,
+                until=until_ms,
+                output_dir=args.output,
+                page_limit=args.limit,
+                fmt=args.format
+            )
+            if written is None:
+                logger.error(f"Failed to backfill OHLCV data for {args.symbol}.")
+            else:
+                logger.info(f"Backfilled {written} candles for {args.symbol} to {args.output}/ directory.")
+            return
+
+        if args.store:
+            if args.format not in CandleStore.STORE_FORMATS:
+                logger.error(f"--store supports the formats {CandleStore.STORE_FORMATS}, not '{args.format}'.")
+                return
+            store = CandleStore(args.store, fmt=args.format)
+            appended = fetcher.update_ohlcv(store, symbol=args.symbol, timeframe=args.timeframe, limit=args.limit)
+            if appended is None:
+                logger.error(f"Failed to update the candle store for {args.symbol}.")
+            else:
+                logger.info(f"Appended {appended} new candles for {args.symbol} to "
+                            f"{store.path_for(handler.exchange.id, args.symbol, args.timeframe)}.")
+            if args.repair_gaps:
+                filled = fetcher.repair_gaps(store, symbol=args.symbol, timeframe=args.timeframe)
+                if filled is None:
+                    logger.error(f"Failed to repair gaps in stored {args.symbol} candles.")
+            for target_timeframe in args.resample or []:
+                if resample_store(store, handler.exchange.id, args.symbol, args.timeframe, target_timeframe) is None:
+                    logger.error(f"Failed to resample {args.symbol} {args.timeframe} to {target_timeframe}.")
+            return
+
         df = fetcher.fetch_historical_ohlcv(
             symbol=args.symbol,
             timeframe=args.timeframe,
             limit=args.limit,
-            output_dir=args.output
+            output_dir=args.output,
+            fmt=args.format
         )
 
         if df is not None:
@@ -119,13 +187,96 @@ def handle_fetch_ohlcv(args):
                 logger.info(f"Successfully fetched and saved data for {args.symbol} to {args.output}/ directory.")
                 logger.info(f"Shape of data: {df.shape}")
             else:
-                logger.info(f"No data returned for {args.symbol} with timeframe {args.timeframe}. An empty CSV might have been created.")
+                logger.info(f"No data returned for {args.symbol} with timeframe {args.timeframe}. An empty file might have been created.")
         else:
             logger.error(f"Failed to fetch OHLCV data for {args.symbol}.")
 
     except Exception as e:
         logger.error(f"An error occurred during fetch-ohlcv: {e}", exc_info=True)
 
+def handle_fetch_many(args):
+    logger.info("Handling fetch-many command...")
+    if not check_config():
+        return
+
+    config = load_config(CONFIG_FILE_PATH)
+    if not config:
+        logger.error("Failed to load configuration.")
+        return
+
+    try:
+        handler = create_exchange_handler(config, pool_size=max(args.workers, config.get('http_pool_size', 10)))
+        if not handler.exchange:
+            logger.error("Exchange handler initialization failed.")
+            return
+        if not handler.load_markets(reload=args.refresh_markets):
+            logger.warning("Failed to load markets.")
+            return
+
+        symbols = list(args.symbols)
+        if args.futures:
+            futures_pairs = handler.fetch_futures_trading_pairs()
+            if futures_pairs is None:
+                logger.error("Could not list futures trading pairs.")
+                return
+            symbols.extend(futures_pairs)
+        if not symbols:
+            logger.error("No symbols given. Pass symbols and/or --futures.")
+            return
+
+        fetcher = DataFetcher(exchange_handler=handler, compact=args.compact)
+        succeeded = failed = 0
+        for symbol, timeframe, df in fetcher.fetch_many(symbols, args.timeframes, limit=args.limit,
+                                                         output_dir=args.output, fmt=args.format,
+                                                         max_workers=args.workers):
+            if df is None:
+                failed += 1
+                logger.error(f"Failed to fetch OHLCV data for {symbol} {timeframe}.")
+            else:
+                succeeded += 1
+                logger.info(f"Fetched {len(df)} candles for {symbol} {timeframe}.")
+        logger.info(f"fetch-many finished: {succeeded} succeeded, {failed} failed.")
+
+    except Exception as e:
+        logger.error(f"An error occurred during fetch-many: {e}", exc_info=True)
+
+def handle_fetch_tickers(args):
+    logger.info("Handling fetch-tickers command...")
+    if not check_config():
+        return
+
+    config = load_config(CONFIG_FILE_PATH)
+    if not config:
+        logger.error("Failed to load configuration.")
+        return
+
+    try:
+        handler = create_exchange_handler(config)
+        if not handler.exchange:
+            logger.error("Exchange handler initialization failed.")
+            return
+        if not handler.load_markets(reload=args.refresh_markets):
+            logger.warning("Failed to load markets.")
+            return
+
+        symbols = list(args.symbols) or None
+        if symbols is None and (args.type or args.quote):
+            symbols = handler.market_index.select(type=args.type, quote=args.quote, active=True)
+        snapshot = handler.fetch_tickers_snapshot(symbols)
+        if snapshot is None:
+            logger.error("Could not fetch the ticker snapshot.")
+            return
+
+        # Rank by quote volume, highest first; symbols without volume go last
+        order = np.argsort(-np.nan_to_num(snapshot['quoteVolume'], nan=-np.inf), kind='stable')[:args.top]
+        logger.info(f"\n--- Top {len(order)} of {len(snapshot['symbol'])} tickers by quote volume ---")
+        for i in order:
+            logger.info(f"{snapshot['symbol'][i]}: last {snapshot['last'][i]}, bid {snapshot['bid'][i]}, "
+                        f"ask {snapshot['ask'][i]}, quote volume {snapshot['quoteVolume'][i]:,.0f}")
+
+    except Exception as e:
+        logger.error(f"An error occurred during fetch-tickers: {e}", exc_info=True)
+
 def handle_get_signal(args):
     logger.info(f"Handling get-signal for {args.symbol} using model {args.model}...")
     if not check_config():
@@ -137,16 +288,11 @@ def handle_get_signal(args):
         return
 
     try:
-        handler = ExchangeHandler(
-            exchange_id=config['default_exchange_id'],
-            api_key=config['api_key'],
-            api_secret=config['api_secret'],
-            is_testnet=config['use_testnet']
-        )
+        handler = create_exchange_handler(config)
         if not handler.exchange:
             logger.error("Exchange handler initialization failed.")
             return
-        if not handler.load_markets():
+        if not handler.load_markets(reload=args.refresh_markets):
             logger.warning("Failed to load markets.")
             return
 
@@ -156,15 +302,30 @@ def handle_get_signal(args):
         if args.model == 'ma_crossover' and data_limit < args.long_window + 1:
              data_limit = args.long_window + 10 
 
-        logger.info(f"Fetching {data_limit} candles of '1h' data for {args.symbol} to generate signal...")
-        historical_data_df = fetcher.fetch_historical_ohlcv(
-            symbol=args.symbol,
-            timeframe='1h', 
-            limit=data_limit,
-            output_dir=None 
-        )
+        if args.store:
+            store = CandleStore(args.store, fmt=args.format)
+            logger.info(f"Topping up '1h' candles for {args.symbol} in store '{args.store}' to generate signal...")
+            if fetcher.update_ohlcv(store, symbol=args.symbol, timeframe='1h', limit=data_limit) is None:
+                logger.warning(f"Could not update the candle store for {args.symbol}. Using stored candles only.")
+            if args.format == 'npy':
+                # Memory-mapped columns: generators read only the candles they need.
+                historical_data_df = store.load_arrays(handler.exchange.id, args.symbol, '1h')
+            else:
+                historical_data_df = store.load(handler.exchange.id, args.symbol, '1h', tail=data_limit)
+        else:
+            logger.info(f"Fetching {data_limit} candles of '1h' data for {args.symbol} to generate signal...")
+            historical_data_df = fetcher.fetch_historical_ohlcv(
+                symbol=args.symbol,
+                timeframe='1h', 
+                limit=data_limit,
+                output_dir=None 
+            )
 
-        if historical_data_df is None or historical_data_df.empty:
+        if isinstance(historical_data_df, dict):
+            data_length = len(historical_data_df['close'])
+        else:
+            data_length = 0 if historical_data_df is None else len(historical_data_df)
+        if data_length == 0:
             logger.warning(f"Could not fetch sufficient historical data for {args.symbol} to generate a signal.")
             return
 
@@ -205,17 +366,12 @@ def handle_execute_trade(args):
         return
 
     try:
-        handler = ExchangeHandler(
-            exchange_id=config['default_exchange_id'],
-            api_key=config['api_key'],
-            api_secret=config['api_secret'],
-            is_testnet=config['use_testnet']
-        )
+        handler = create_exchange_handler(config)
         if not handler.exchange:
             logger.error("Exchange handler initialization failed.")
             return
         
-        if not handler.load_markets():
+        if not handler.load_markets(reload=args.refresh_markets):
             logger.warning("Failed to load markets. This might affect trade execution if symbol is not recognized.")
 
         engine = TradingEngine(exchange_handler=handler, config=config) 
@@ -245,6 +401,10 @@ def handle_execute_trade(args):
 def main():
     logger.info("Application started.")
     parser = argparse.ArgumentParser(description="Crypto Trading Bot CLI")
+    parser.add_argument('--refresh-markets', action='store_true',
+                        help="Download the exchange's market catalog even if a fresh cached copy exists.")
+    parser.add_argument('--request-stats', action='store_true',
+                        help="Log per-endpoint request counts, errors, latencies and bytes received on exit.")
     subparsers = parser.add_subparsers(dest='command', help='Available commands', required=True)
 
     # Get Balance command
@@ -252,13 +412,57 @@ def main():
     parser_balance.set_defaults(func=handle_get_balance)
 
     # Fetch OHLCV command
-    parser_ohlcv = subparsers.add_parser('fetch-ohlcv', help='Fetch historical OHLCV data and save to CSV.')
+    parser_ohlcv = subparsers.add_parser('fetch-ohlcv', help='Fetch historical OHLCV data and save it to a file.')
     parser_ohlcv.add_argument('symbol', type=str, help="Trading symbol (e.g., 'BTC/USDT')")
     parser_ohlcv.add_argument('--timeframe', type=str, default='1h', help="Timeframe (e.g., '1m', '5m', '1h', '1d'). Default: '1h'")
-    parser_ohlcv.add_argument('--limit', type=int, default=100, help="Number of candles to fetch. Default: 100")
-    parser_ohlcv.add_argument('--output', type=str, default='data', help="Output directory for CSV file. Default: 'data'")
+    parser_ohlcv.add_argument('--limit', type=int, default=100,
+                              help="Number of candles to fetch (candles per page when --since is given). Default: 100")
+    parser_ohlcv.add_argument('--since', type=str, default=None,
+                              help="Backfill start (ISO date/time or epoch ms). Pages through the exchange until --until.")
+    parser_ohlcv.add_argument('--until', type=str, default=None,
+                              help="Backfill end, exclusive (ISO date/time or epoch ms). Default: latest candle")
+    parser_ohlcv.add_argument('--output', type=str, default='data', help="Output directory for the data file. Default: 'data'")
+    parser_ohlcv.add_argument('--format', type=str, default='csv', choices=['csv', 'parquet', 'feather', 'npy'],
+                              help="Output file format. 'parquet' and 'feather' require pyarrow; 'npy' writes "
+                                   "one .npy file per column into a directory. Default: 'csv'")
+    parser_ohlcv.add_argument('--store', type=str, default=None,
+                              help="Candle store directory (csv or npy --format). "
+                                   "Appends only candles newer than the last stored one.")
+    parser_ohlcv.add_argument('--repair-gaps', action='store_true',
+                              help="With --store, also re-fetch candles missing inside the stored history.")
+    parser_ohlcv.add_argument('--compact', action='store_true',
+                              help="Keep candles as float32 columns indexed by epoch-ms timestamps, halving memory. "
+                                   "Saved prices are rounded to float32.")
+    parser_ohlcv.add_argument('--resample', type=str, nargs='+', default=None, metavar='TIMEFRAME',
+                              help="With --store, derive these higher timeframes (e.g. 5m 1h 4h 1d) from the "
+                                   "stored --timeframe series locally, without extra requests.")
     parser_ohlcv.set_defaults(func=handle_fetch_ohlcv)
 
+    # Fetch Many command
+    parser_many = subparsers.add_parser('fetch-many', help='Fetch OHLCV data for many symbols concurrently.')
+    parser_many.add_argument('symbols', type=str, nargs='*', help="Trading symbols (e.g., 'BTC/USDT' 'ETH/USDT')")
+    parser_many.add_argument('--futures', action='store_true', help="Also fetch all active futures trading pairs.")
+    parser_many.add_argument('--timeframes', type=str, nargs='+', default=['1h'], help="Timeframes to fetch. Default: 1h")
+    parser_many.add_argument('--limit', type=int, default=100, help="Number of candles per symbol. Default: 100")
+    parser_many.add_argument('--output', type=str, default='data', help="Output directory for the data files. Default: 'data'")
+    parser_many.add_argument('--format', type=str, default='csv', choices=['csv', 'parquet', 'feather', 'npy'],
+                             help="Output file format. Default: 'csv'")
+    parser_many.add_argument('--compact', action='store_true',
+                             help="Keep candles as float32 columns indexed by epoch-ms timestamps, halving memory. "
+                                  "Saved prices are rounded to float32.")
+    parser_many.add_argument('--workers', type=int, default=8, help="Maximum concurrent requests. Default: 8")
+    parser_many.set_defaults(func=handle_fetch_many)
+
+    # Fetch Tickers command
+    parser_tickers = subparsers.add_parser('fetch-tickers', help='Fetch a ticker snapshot and rank it by quote volume.')
+    parser_tickers.add_argument('symbols', type=str, nargs='*',
+                                help="Trading symbols. Default: every ticker, or the markets selected by --type/--quote.")
+    parser_tickers.add_argument('--type', type=str, default=None, choices=['spot', 'swap', 'future'],
+                                help="Only active markets of this type.")
+    parser_tickers.add_argument('--quote', type=str, default=None, help="Only active markets quoted in this currency (e.g. USDT).")
+    parser_tickers.add_argument('--top', type=int, default=20, help="Number of tickers to display. Default: 20")
+    parser_tickers.set_defaults(func=handle_fetch_tickers)
+
     # Get Signal command
     parser_signal = subparsers.add_parser('get-signal', help='Generate a trading signal for a symbol.')
     parser_signal.add_argument('symbol', type=str, help="Trading symbol (e.g., 'BTC/USDT')")
@@ -268,6 +472,10 @@ def main():
                                help="Short window for MA crossover. Default: 5")
     parser_signal.add_argument('--long_window', type=int, default=10,
                                help="Long window for MA crossover. Default: 10")
+    parser_signal.add_argument('--store', type=str, default=None,
+                               help="Candle store directory. Tops up stored history instead of re-downloading it.")
+    parser_signal.add_argument('--format', type=str, default='csv', choices=['csv', 'npy'],
+                               help="Candle store format. 'npy' stores are memory-mapped instead of loaded. Default: 'csv'")
     parser_signal.set_defaults(func=handle_get_signal)
 
     # Execute Trade command
@@ -280,6 +488,8 @@ def main():
 
     args = parser.parse_args()
     args.func(args)
+    if args.request_stats:
+        logger.info(f"\n--- Request statistics ---\n{get_request_stats().format_table()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import logging
+from .candle_store import OHLCV_FORMATS
+from .data_fetcher import DataFetcher
+from .lazy_import import lazy_import
+
+ccxt_async = lazy_import('ccxt.async_support')
+
+logger = logging.getLogger(__name__)
+
+class AsyncDataFetcher:
+    """
+    asyncio variant of DataFetcher for use with an AsyncExchangeHandler.
+
+    Requests are awaited on the handler's shared session and throttled by the process-wide
+    rate-limit scheduler. DataFrame conversion and file writes are delegated to a DataFetcher and
+    run in a worker thread so they do not block the event loop.
+    """
+    def __init__(self, exchange_handler, compact=False, float_dtype=np.float32):
+        """
+        Initializes the AsyncDataFetcher.
+
+        Args:
+            exchange_handler (AsyncExchangeHandler): An instance of the AsyncExchangeHandler class.
+            compact (bool): Whether to return compact DataFrames, as for DataFetcher. Defaults to False.
+            float_dtype (np.dtype): Price and volume dtype of compact DataFrames. Defaults to np.float32.
+        """
+        self.exchange_handler = exchange_handler
+        self._frames = DataFetcher(exchange_handler, compact=compact, float_dtype=float_dtype)
+        logger.debug("AsyncDataFetcher initialized.")
+
+    async def _fetch_ohlcv(self, symbol, timeframe, since, limit):
+        """
+        Issues a single fetch_ohlcv request through the handler's shared rate limiter.
+        """
+        return await self.exchange_handler.request('fetch_ohlcv', symbol, timeframe, since, limit)
+
+    async def fetch_historical_ohlcv(self, symbol, timeframe='1h', since=None, limit=100, output_dir='data', fmt='csv'):
+        """
+        Fetches historical OHLCV data, converts it to a Pandas DataFrame, and saves it to a file.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe for OHLCV data (e.g., '1h', '1d').
+            since (int, optional): Timestamp in milliseconds for the start of the data. Defaults to None.
+            limit (int): The maximum number of candles to fetch. Defaults to 100.
+            output_dir (str): The directory to save the file. Defaults to 'data'.
+                              If None, data is not saved.
+            fmt (str): Output format, one of 'csv', 'parquet', 'feather' or 'npy'. Defaults to 'csv'.
+
+        Returns:
+            pd.DataFrame: The OHLCV data as a Pandas DataFrame, or None if an error occurs.
+        """
+        if not self.exchange_handler or not self.exchange_handler.exchange:
+            logger.error("ExchangeHandler not properly initialized in AsyncDataFetcher.")
+            return None
+        if fmt not in OHLCV_FORMATS:
+            logger.error(f"Unsupported output format '{fmt}'. Choose from {sorted(OHLCV_FORMATS)}.")
+            return None
+
+        logger.info(f"Fetching OHLCV for {symbol}, timeframe {timeframe}, limit {limit}, since {since}.")
+        try:
+            ohlcv = await self._fetch_ohlcv(symbol, timeframe, since, limit)
+            if not ohlcv:
+                logger.info(f"No data returned by exchange for {symbol} on timeframe {timeframe}.")
+                return pd.DataFrame()
+
+        except ccxt_async.NetworkError as e:
+            logger.error(f"Network error fetching OHLCV for {symbol}: {e}", exc_info=True)
+            return None
+        except ccxt_async.ExchangeError as e:
+            logger.error(f"Exchange error fetching OHLCV for {symbol}: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred fetching OHLCV for {symbol}: {e}", exc_info=True)
+            return None
+
+        return await asyncio.to_thread(self._frames._process_ohlcv, ohlcv, symbol, timeframe, output_dir, fmt)
+
+    async def fetch_many(self, symbols, timeframes=('1h',), since=None, limit=100, output_dir=None, fmt='csv',
+                         max_concurrency=50):
+        """
+        Fetches OHLCV data for many symbols and timeframes concurrently on the event loop.
+
+        Args:
+            symbols (list): Trading symbols.
+            timeframes (list or str): One or more timeframes. Defaults to ('1h',).
+            since (int, optional): Timestamp in milliseconds for the start of the data. Defaults to None.
+            limit (int): The maximum number of candles to fetch per pair. Defaults to 100.
+            output_dir (str, optional): Directory to save each result to. Defaults to None (not saved).
+            fmt (str): Output format used when output_dir is set. Defaults to 'csv'.
+            max_concurrency (int): The maximum number of requests in flight. Defaults to 50.
+
+        Yields:
+            tuple: (symbol, timeframe, pd.DataFrame or None) in completion order. None marks a failed fetch.
+        """
+        if isinstance(timeframes, str):
+            timeframes = [timeframes]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_pair(symbol, timeframe):
+            async with semaphore:
+                df = await self.fetch_historical_ohlcv(symbol, timeframe, since, limit, output_dir, fmt)
+            return symbol, timeframe, df
+
+        tasks = [asyncio.ensure_future(fetch_pair(symbol, timeframe)) for symbol in symbols for timeframe in timeframes]
+        logger.info(f"Fetching {len(tasks)} symbol/timeframe pairs with up to {max_concurrency} requests in flight.")
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
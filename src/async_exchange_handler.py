@@ -0,0 +1,222 @@
+import asyncio
+import contextvars
+import time
+import logging
+from .lazy_import import lazy_import
+from .market_index import MarketIndex
+from .rate_limiter import get_rate_limiter
+from .retry_policy import RetryPolicy, RetryStats, is_idempotent
+
+ccxt_async = lazy_import('ccxt.async_support')
+
+logger = logging.getLogger(__name__)
+
+# Endpoint of the request() running in the current task, and whether its weight was reserved.
+_request_context = contextvars.ContextVar('request_context', default=(None, False))
+
+class AsyncExchangeHandler:
+    """
+    asyncio variant of ExchangeHandler built on ccxt.async_support.
+
+    All coroutines share the exchange's single aiohttp session, so one event loop can drive
+    many concurrent requests. Requests are throttled by the same process-wide scheduler as
+    ExchangeHandler, waiting with asyncio.sleep. Call close() (or use the handler as an
+    async context manager) to release the session.
+    """
+    def __init__(self, exchange_id, api_key, api_secret, is_testnet=False, session=None, rate_limits=None,
+                 markets_cache=None, retry_policy=None):
+        """
+        Initializes the AsyncExchangeHandler.
+
+        Args:
+            exchange_id (str): The ccxt exchange id (e.g., 'binance').
+            api_key (str): The API key.
+            api_secret (str): The API secret.
+            is_testnet (bool): Whether to enable the exchange's sandbox mode. Defaults to False.
+            session (aiohttp.ClientSession, optional): An existing HTTP session to share with other
+                                                       handlers. Defaults to None (ccxt creates one).
+            rate_limits (dict, optional): Rate-limit overrides, as for ExchangeHandler.
+            markets_cache (MarketsCache, optional): On-disk cache used by load_markets(). Defaults to None.
+            retry_policy (RetryPolicy, optional): Retry policy of request(), as for ExchangeHandler.
+        """
+        self.exchange_id = exchange_id
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.is_testnet = is_testnet
+        self.rate_limiter = get_rate_limiter()
+        self.markets_cache = markets_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self._market_index = None
+
+        exchange_config = {
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            'enableRateLimit': False,
+        }
+        if session is not None:
+            exchange_config['session'] = session
+
+        try:
+            self.exchange = getattr(ccxt_async, self.exchange_id)(exchange_config)
+
+            if self.is_testnet:
+                if hasattr(self.exchange, 'set_sandbox_mode'):
+                    self.exchange.set_sandbox_mode(True)
+                else:
+                    logger.warning(f"Sandbox mode is not supported by {self.exchange_id}")
+
+        except ccxt_async.ExchangeError as e:
+            logger.error(f"Error initializing exchange {self.exchange_id}: {e}", exc_info=True)
+            self.exchange = None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during exchange initialization: {e}", exc_info=True)
+            self.exchange = None
+
+        if self.exchange:
+            self.rate_limiter.register_exchange(self.exchange_id, self.exchange.rateLimit, rate_limits)
+            self._charge_endpoint_costs()
+
+    def _charge_endpoint_costs(self):
+        """
+        Hooks ccxt's fetch2() to reserve each HTTP request's ccxt cost from the shared scheduler,
+        unless request() already reserved an explicit or configured weight (see ExchangeHandler).
+        """
+        fetch2 = self.exchange.fetch2
+
+        async def hook(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            endpoint, prepaid = _request_context.get()
+            if not prepaid:
+                cost = self.exchange.calculate_rate_limiter_cost(api, method, path, params, config)
+                wait = self.rate_limiter.reserve(self.exchange_id, endpoint, cost)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            return await fetch2(path, api, method, params, headers, body, config)
+
+        self.exchange.fetch2 = hook
+
+    async def request(self, endpoint, *args, weight=None, idempotent=None, **kwargs):
+        """
+        Awaits a ccxt exchange method, throttled by the shared rate-limit scheduler and retrying
+        transient errors like ExchangeHandler.request.
+
+        ccxt exceptions that are not retried propagate to the caller.
+        """
+        if idempotent is None:
+            idempotent = is_idempotent(endpoint)
+        method = getattr(self.exchange, endpoint)
+        if weight is None:
+            weight = self.rate_limiter.weight_for(self.exchange_id, endpoint, default=None)
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            if weight is not None:
+                wait = self.rate_limiter.reserve(self.exchange_id, endpoint, weight)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            outer = _request_context.set((endpoint, weight is not None))
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as e:
+                _request_context.reset(outer)
+                delay = self.retry_policy.next_delay(e, attempt, time.monotonic() - start, idempotent)
+                if delay is None:
+                    self.retry_stats.record(self.exchange_id, endpoint, attempt, time.monotonic() - start, False)
+                    raise
+                logger.warning(f"{self.exchange_id}.{endpoint} failed on attempt {attempt}/{self.retry_policy.max_attempts} "
+                               f"({type(e).__name__}: {e}). Retrying in {delay:.2f}s.")
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                _request_context.reset(outer)
+                self.retry_stats.record(self.exchange_id, endpoint, attempt, time.monotonic() - start, True)
+                return result
+
+    async def load_markets(self, reload=False):
+        """
+        Loads the exchange's markets, from the markets cache when it holds a fresh entry.
+
+        Args:
+            reload (bool): Download the catalog even if a fresh cache entry exists, and refresh
+                           the cache with it. Defaults to False.
+
+        Returns:
+            bool: True if the markets are loaded, False otherwise.
+        """
+        if not self.exchange:
+            logger.error("Exchange not initialized. Cannot load markets.")
+            return False
+        if self.markets_cache and not reload and self.markets_cache.restore(self.exchange, self.is_testnet):
+            return True
+        try:
+            logger.info(f"Loading markets for {self.exchange_id}...")
+            await self.request('load_markets', reload)
+            logger.info(f"Markets loaded successfully for {self.exchange_id}.")
+            if self.markets_cache:
+                self.markets_cache.store(self.exchange, self.is_testnet)
+            return True
+        except ccxt_async.NetworkError as e:
+            logger.error(f"Error loading markets for {self.exchange_id} (network issue): {e}", exc_info=True)
+            return False
+        except ccxt_async.ExchangeError as e:
+            logger.error(f"Error loading markets for {self.exchange_id} (exchange issue): {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while loading markets for {self.exchange_id}: {e}", exc_info=True)
+            return False
+
+    async def fetch_balance(self):
+        if not self.exchange:
+            logger.error("Exchange not initialized. Cannot fetch balance.")
+            return None
+        try:
+            logger.info(f"Fetching balance for {self.exchange_id}...")
+            balance = await self.request('fetch_balance')
+            logger.info(f"Balance fetched successfully for {self.exchange_id}.")
+            logger.debug(f"Full balance details: {balance}")
+            return balance
+        except ccxt_async.NetworkError as e:
+            logger.error(f"Error fetching balance for {self.exchange_id} (network issue): {e}", exc_info=True)
+            return None
+        except ccxt_async.ExchangeError as e:
+            logger.error(f"Error fetching balance for {self.exchange_id} (exchange issue): {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while fetching balance for {self.exchange_id}: {e}", exc_info=True)
+            return None
+
+    @property
+    def market_index(self):
+        """
+        MarketIndex over the loaded markets, rebuilt only when the markets are (re)loaded.
+        """
+        markets = (self.exchange.markets if self.exchange else None) or {}
+        if self._market_index is None or self._market_index.markets is not markets:
+            self._market_index = MarketIndex(markets)
+        return self._market_index
+
+    def fetch_futures_trading_pairs(self):
+        """
+        Returns the active futures symbols from the loaded markets. No request is made.
+        """
+        if not self.exchange:
+            logger.error("Exchange not initialized. Cannot fetch futures trading pairs.")
+            return None
+        if not self.exchange.markets:
+            logger.error(f"Markets not loaded for {self.exchange_id}. Call load_markets() first.")
+            return None
+        return self.market_index.select(type='future', active=True)
+
+    async def close(self):
+        """
+        Closes the exchange's HTTP session.
+        """
+        if self.exchange:
+            await self.exchange.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
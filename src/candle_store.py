@@ -0,0 +1,572 @@
+import io
+import os
+import shutil
+import tempfile
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Supported on-disk formats and their path suffix. 'npy' is a directory holding one
+# .npy file per column (timestamps as int64 epoch milliseconds, the rest as float64).
+OHLCV_FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'npy': '',
+}
+
+def make_safe_filename(symbol):
+    """
+    Replaces characters in a symbol that are invalid for filenames.
+    """
+    return "".join(c if c.isalnum() else "_" for c in symbol)
+
+def timestamp_to_ms(value):
+    """
+    Converts a stored timestamp (datetime string or pd.Timestamp, naive UTC) to epoch milliseconds.
+    """
+    return int(round(pd.Timestamp(value).timestamp() * 1000))
+
+def find_gaps(timestamps, interval_ms):
+    """
+    Finds missing candles in a sorted series of timestamps.
+
+    Consecutive timestamps are compared in one vectorized pass; any step larger than the
+    timeframe interval is reported as a gap.
+
+    Args:
+        timestamps (array-like): Sorted candle timestamps in epoch milliseconds.
+        interval_ms (int): The timeframe interval in milliseconds.
+
+    Returns:
+        list: (start_ms, end_ms) tuples, where start is the first missing timestamp and end is
+              the timestamp of the next stored candle (exclusive).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) < 2:
+        return []
+    gap_positions = np.flatnonzero(np.diff(timestamps) > interval_ms)
+    starts = timestamps[gap_positions] + interval_ms
+    ends = timestamps[gap_positions + 1]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def ohlcv_to_frame(ohlcv, compact=False, float_dtype=np.float32):
+    """
+    Builds an OHLCV DataFrame from raw [timestamp, open, high, low, close, volume] candles.
+
+    The default layout has a datetime 'timestamp' column and float64 values. The compact
+    layout keeps the int64 epoch-millisecond timestamps as the index (named 'timestamp') and
+    stores the price and volume columns as `float_dtype`, which with float32 takes about half
+    the memory and skips the datetime conversion.
+
+    Args:
+        ohlcv (list): Raw candles as returned by ccxt's fetch_ohlcv.
+        compact (bool): Whether to build the compact layout. Defaults to False.
+        float_dtype (np.dtype): Value dtype of the compact layout. Defaults to np.float32.
+
+    Returns:
+        pd.DataFrame: The candles.
+    """
+    if not compact:
+        df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+    values = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    index = pd.Index(values[:, 0].astype(np.int64), name='timestamp')
+    return pd.DataFrame(values[:, 1:].astype(float_dtype), index=index, columns=OHLCV_COLUMNS[1:])
+
+def expand_compact_frame(df):
+    """
+    Converts a compact OHLCV DataFrame (see ohlcv_to_frame) to the default layout. Other frames are returned as is.
+    """
+    if 'timestamp' in df.columns:
+        return df
+    expanded = df.astype(np.float64).reset_index()
+    expanded['timestamp'] = pd.to_datetime(expanded['timestamp'], unit='ms')
+    return expanded[OHLCV_COLUMNS]
+
+def ohlcv_filename(exchange_id, symbol, timeframe, fmt='csv'):
+    """
+    Returns the file (or, for 'npy', directory) name used for an OHLCV series.
+    """
+    return f"{exchange_id}_{make_safe_filename(symbol)}_{timeframe}{OHLCV_FORMATS[fmt]}"
+
+def _import_pyarrow(fmt):
+    """
+    Imports pyarrow, which is an optional dependency needed for the parquet and feather formats.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(f"The '{fmt}' format requires pyarrow. Install it with 'pip install pyarrow'.") from e
+    return pyarrow
+
+def _write_npy_column(filepath, raw_path, dtype, length):
+    """
+    Writes a .npy file from a header and a raw, already encoded column data file.
+    """
+    with open(filepath, 'wb') as out, open(raw_path, 'rb') as raw:
+        np.lib.format.write_array_header_1_0(out, {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                   'fortran_order': False, 'shape': (length,)})
+        shutil.copyfileobj(raw, out)
+
+class OHLCVWriter:
+    """
+    Streams OHLCV DataFrame chunks to a single output in one of OHLCV_FORMATS.
+
+    Each chunk is encoded and written as it arrives, so the full series is never held in
+    memory: CSV rows are appended, parquet chunks become row groups, feather chunks become
+    Arrow IPC record batches and npy columns are spooled to raw files and given their
+    header on close().
+    """
+    def __init__(self, filepath, fmt='csv'):
+        """
+        Initializes the writer. Any existing output at `filepath` is replaced on the first write.
+
+        Args:
+            filepath (str): The output file path (a directory path for 'npy').
+            fmt (str): One of OHLCV_FORMATS. Defaults to 'csv'.
+        """
+        if fmt not in OHLCV_FORMATS:
+            raise ValueError(f"Unsupported OHLCV format '{fmt}'. Choose from {sorted(OHLCV_FORMATS)}.")
+        self.filepath = filepath
+        self.fmt = fmt
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._spool_dir = None
+        if fmt in ('parquet', 'feather'):
+            self._pa = _import_pyarrow(fmt)
+
+    def write(self, df):
+        """
+        Writes one chunk with the columns of OHLCV_COLUMNS and a datetime 'timestamp' column,
+        or a compact frame indexed by epoch-millisecond timestamps.
+        """
+        if self.fmt == 'csv':
+            if self._file is None:
+                self._file = open(self.filepath, 'w', newline='')
+            expand_compact_frame(df).to_csv(self._file, index=False, header=(self.rows == 0))
+        elif self.fmt == 'npy':
+            if self._spool_dir is None:
+                self._spool_dir = tempfile.mkdtemp(prefix='ohlcv_npy_')
+            if 'timestamp' in df.columns:
+                timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+            else:
+                timestamps = df.index.to_numpy(dtype=np.int64)
+            for column in OHLCV_COLUMNS:
+                values = timestamps if column == 'timestamp' else df[column].to_numpy(dtype=np.float64)
+                with open(os.path.join(self._spool_dir, column), 'ab') as raw:
+                    raw.write(np.ascontiguousarray(values).tobytes())
+        else:
+            table = self._pa.Table.from_pandas(expand_compact_frame(df), preserve_index=False)
+            if self._writer is None:
+                if self.fmt == 'parquet':
+                    self._writer = self._pa.parquet.ParquetWriter(self.filepath, table.schema)
+                else:
+                    self._writer = self._pa.ipc.new_file(self.filepath, table.schema)
+            if self.fmt == 'parquet':
+                self._writer.write_table(table)
+            else:
+                self._writer.write(table)
+        self.rows += len(df)
+
+    def close(self):
+        """
+        Finalizes the output. An empty output is still created if nothing was written.
+        """
+        if self.fmt == 'csv':
+            if self._file is None:
+                self._file = open(self.filepath, 'w', newline='')
+                self._file.write(','.join(OHLCV_COLUMNS) + '\n')
+            self._file.close()
+        elif self.fmt == 'npy':
+            if os.path.isdir(self.filepath):
+                shutil.rmtree(self.filepath)
+            os.makedirs(self.filepath)
+            for column in OHLCV_COLUMNS:
+                dtype = np.int64 if column == 'timestamp' else np.float64
+                raw_path = os.path.join(self._spool_dir, column) if self._spool_dir else os.devnull
+                _write_npy_column(os.path.join(self.filepath, f"{column}.npy"), raw_path, dtype, self.rows)
+            if self._spool_dir:
+                shutil.rmtree(self._spool_dir, ignore_errors=True)
+        else:
+            if self._writer is None:
+                self.write(pd.DataFrame({column: pd.Series(dtype='datetime64[ns]' if column == 'timestamp' else 'float64')
+                                         for column in OHLCV_COLUMNS}))
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def append_npy(filepath, values):
+    """
+    Appends a 1-D array to a .npy file without rewriting the existing data.
+
+    The new data is written after the existing bytes first, then the shape in the header is
+    updated in place. numpy reserves room in the header for the shape to grow; should the new
+    header not fit anyway, the file is rewritten as a whole.
+    """
+    values = np.ascontiguousarray(values)
+    if not os.path.exists(filepath):
+        np.save(filepath, values)
+        return
+    with open(filepath, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        header_length = f.tell()
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {'descr': np.lib.format.dtype_to_descr(dtype),
+                                                      'fortran_order': False, 'shape': (shape[0] + len(values),)})
+        if version == (1, 0) and len(header.getvalue()) == header_length:
+            f.seek(0, os.SEEK_END)
+            f.write(values.astype(dtype, copy=False).tobytes())
+            f.flush()
+            f.seek(0)
+            f.write(header.getvalue())
+            return
+    existing = np.load(filepath)
+    np.save(filepath, np.concatenate([existing, values.astype(existing.dtype, copy=False)]))
+
+def load_ohlcv_arrays(dirpath, mmap_mode='r'):
+    """
+    Opens the per-column .npy files of an 'npy' series as memory-mapped arrays.
+
+    No candle data is copied into process memory: pages are read from the OS page cache on
+    access, and several processes mapping the same series share those pages.
+
+    Args:
+        dirpath (str): The series directory written with the 'npy' format.
+        mmap_mode (str): Passed to np.load. Defaults to 'r' (read-only).
+
+    Returns:
+        dict: Column name to np.memmap. 'timestamp' holds int64 epoch milliseconds.
+    """
+    return {column: np.load(os.path.join(dirpath, f"{column}.npy"), mmap_mode=mmap_mode) for column in OHLCV_COLUMNS}
+
+def save_ohlcv(df, filepath, fmt='csv'):
+    """
+    Saves a complete OHLCV DataFrame to `filepath` in the given format.
+    """
+    with OHLCVWriter(filepath, fmt) as writer:
+        if not df.empty:
+            writer.write(df)
+
+def load_ohlcv(filepath, fmt='csv'):
+    """
+    Loads an OHLCV series written by OHLCVWriter/save_ohlcv.
+
+    Args:
+        filepath (str): The file path (a directory path for 'npy').
+        fmt (str): One of OHLCV_FORMATS. Defaults to 'csv'.
+
+    Returns:
+        pd.DataFrame: The candles with a datetime 'timestamp' column.
+    """
+    if fmt == 'csv':
+        df = pd.read_csv(filepath)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+        return df
+    if fmt == 'npy':
+        columns = {column: np.load(os.path.join(filepath, f"{column}.npy")) for column in OHLCV_COLUMNS}
+        columns['timestamp'] = pd.to_datetime(columns['timestamp'], unit='ms')
+        return pd.DataFrame(columns, columns=OHLCV_COLUMNS)
+    if fmt == 'parquet':
+        _import_pyarrow(fmt)
+        return pd.read_parquet(filepath)
+    if fmt == 'feather':
+        _import_pyarrow(fmt)
+        return pd.read_feather(filepath)
+    raise ValueError(f"Unsupported OHLCV format '{fmt}'. Choose from {sorted(OHLCV_FORMATS)}.")
+
+class CandleStore:
+    """
+    Persistent, append-only OHLCV store with one series per (exchange, symbol, timeframe).
+
+    Series are named like DataFetcher output (`{exchange_id}_{safe_symbol}_{timeframe}`) and
+    kept either as CSV files with the fetch_historical_ohlcv column layout, so existing output
+    directories can be used as a store, or as 'npy' column directories that can be
+    memory-mapped with load_arrays(). The last stored timestamp of each series is remembered
+    so that new candles can be appended without re-reading the series.
+    """
+    STORE_FORMATS = ('csv', 'npy')
+
+    def __init__(self, base_dir='data', fmt='csv'):
+        """
+        Initializes the CandleStore.
+
+        Args:
+            base_dir (str): The directory holding the candle files. Defaults to 'data'.
+            fmt (str): Storage format, 'csv' or 'npy'. Defaults to 'csv'.
+        """
+        if fmt not in self.STORE_FORMATS:
+            raise ValueError(f"Unsupported candle store format '{fmt}'. Choose from {self.STORE_FORMATS}.")
+        self.base_dir = base_dir
+        self.fmt = fmt
+        self._last_timestamps = {}
+        logger.debug(f"CandleStore initialized at '{base_dir}' ({fmt}).")
+
+    def path_for(self, exchange_id, symbol, timeframe):
+        """
+        Returns the file (or 'npy' directory) path of the series for the given exchange, symbol and timeframe.
+        """
+        return os.path.join(self.base_dir, ohlcv_filename(exchange_id, symbol, timeframe, self.fmt))
+
+    def _read_tail_lines(self, filepath, count, block_size=8192):
+        """
+        Reads the last `count` non-empty lines of a file by seeking backwards from its end.
+        """
+        with open(filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= count:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+        lines = [line for line in data.decode('utf-8').splitlines() if line.strip()]
+        if position > 0:
+            lines = lines[1:] # The first line may have been cut by the block boundary
+        return lines[-count:]
+
+    def last_timestamp(self, exchange_id, symbol, timeframe):
+        """
+        Returns the timestamp of the last stored candle.
+
+        Args:
+            exchange_id (str): The exchange id (e.g., 'binance').
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe (e.g., '1h').
+
+        Returns:
+            int: The last stored timestamp in milliseconds, or None if the series is empty or missing.
+        """
+        key = (exchange_id, symbol, timeframe)
+        if key in self._last_timestamps:
+            return self._last_timestamps[key]
+
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        last_ts = None
+        if os.path.exists(filepath):
+            try:
+                if self.fmt == 'npy':
+                    timestamps = np.load(os.path.join(filepath, 'timestamp.npy'), mmap_mode='r')
+                    if len(timestamps):
+                        last_ts = int(timestamps[-1])
+                else:
+                    tail = self._read_tail_lines(filepath, 1)
+                    if tail and not tail[0].startswith('timestamp'):
+                        last_ts = timestamp_to_ms(tail[0].split(',', 1)[0])
+            except (IOError, ValueError) as e:
+                logger.error(f"Error reading last timestamp from {filepath}: {e}", exc_info=True)
+                return None
+
+        self._last_timestamps[key] = last_ts
+        return last_ts
+
+    def append(self, exchange_id, symbol, timeframe, candles):
+        """
+        Appends raw OHLCV candles that are newer than the last stored candle.
+
+        Args:
+            exchange_id (str): The exchange id.
+            symbol (str): The trading symbol.
+            timeframe (str): The timeframe.
+            candles (list): [timestamp, open, high, low, close, volume] rows in ascending time order.
+
+        Returns:
+            int: The number of candles appended, or None if an error occurs.
+        """
+        last_ts = self.last_timestamp(exchange_id, symbol, timeframe)
+        if last_ts is not None:
+            candles = [candle for candle in candles if candle[0] > last_ts]
+        if not candles:
+            return 0
+
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            if self.fmt == 'npy':
+                os.makedirs(filepath, exist_ok=True)
+                values = np.asarray(candles, dtype=np.float64)
+                append_npy(os.path.join(filepath, 'timestamp.npy'),
+                           np.asarray([candle[0] for candle in candles], dtype=np.int64))
+                for position, column in enumerate(OHLCV_COLUMNS[1:], start=1):
+                    append_npy(os.path.join(filepath, f"{column}.npy"), values[:, position])
+            else:
+                df = pd.DataFrame(candles, columns=OHLCV_COLUMNS)
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                write_header = not os.path.exists(filepath) or os.path.getsize(filepath) == 0
+                df.to_csv(filepath, mode='a', index=False, header=write_header)
+        except (IOError, OSError) as e:
+            logger.error(f"Error appending candles to {filepath}: {e}", exc_info=True)
+            return None
+
+        self._last_timestamps[(exchange_id, symbol, timeframe)] = int(candles[-1][0])
+        logger.debug(f"Appended {len(candles)} candles to {filepath}.")
+        return len(candles)
+
+    def insert(self, exchange_id, symbol, timeframe, candles):
+        """
+        Merges raw OHLCV candles anywhere into a series, e.g. to fill gaps.
+
+        Unlike append(), this rewrites the series: the stored and new candles are combined,
+        sorted and de-duplicated (stored candles win on equal timestamps).
+
+        Returns:
+            int: The number of candles added, or None if an error occurs.
+        """
+        if not candles:
+            return 0
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        stored = self.load(exchange_id, symbol, timeframe)
+        if stored is None:
+            return None
+
+        new_df = pd.DataFrame(candles, columns=OHLCV_COLUMNS)
+        new_df['timestamp'] = pd.to_datetime(new_df['timestamp'], unit='ms')
+        frames = [frame for frame in (stored, new_df) if not frame.empty]
+        merged = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        merged = merged.drop_duplicates(subset='timestamp', keep='first').sort_values('timestamp', ignore_index=True)
+        try:
+            os.makedirs(self.base_dir, exist_ok=True)
+            save_ohlcv(merged, filepath, self.fmt)
+        except (IOError, OSError) as e:
+            logger.error(f"Error rewriting candles to {filepath}: {e}", exc_info=True)
+            return None
+
+        self._last_timestamps.pop((exchange_id, symbol, timeframe), None)
+        added = len(merged) - len(stored)
+        logger.debug(f"Inserted {added} candles into {filepath}.")
+        return added
+
+    def load_timestamps(self, exchange_id, symbol, timeframe):
+        """
+        Returns the stored timestamps of a series as an int64 array of epoch milliseconds.
+
+        Only the timestamp column is read ('npy' series are memory-mapped).
+        """
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        if not os.path.exists(filepath):
+            return np.array([], dtype=np.int64)
+        if self.fmt == 'npy':
+            return np.load(os.path.join(filepath, 'timestamp.npy'), mmap_mode='r')
+        timestamps = pd.to_datetime(pd.read_csv(filepath, usecols=['timestamp'])['timestamp'], format='ISO8601')
+        return timestamps.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+    def load_columns(self, exchange_id, symbol, timeframe, since=None):
+        """
+        Loads a stored series as numpy column arrays, optionally only from `since` onwards.
+
+        For 'npy' series the start is located with a binary search on the memory-mapped
+        timestamps, so only the requested range is read.
+
+        Args:
+            exchange_id (str): The exchange id.
+            symbol (str): The trading symbol.
+            timeframe (str): The timeframe.
+            since (int, optional): First timestamp to include, in epoch milliseconds.
+
+        Returns:
+            dict: Column name to numpy array (int64 epoch-ms timestamps), or None if an error occurs.
+        """
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        if not os.path.exists(filepath):
+            return {column: np.array([], dtype=np.int64 if column == 'timestamp' else np.float64)
+                    for column in OHLCV_COLUMNS}
+        try:
+            if self.fmt == 'npy':
+                arrays = load_ohlcv_arrays(filepath)
+                start = 0 if since is None else int(np.searchsorted(arrays['timestamp'], since, side='left'))
+                return {column: np.array(values[start:]) for column, values in arrays.items()}
+            df = self.load(exchange_id, symbol, timeframe)
+            if df is None:
+                return None
+            columns = {column: df[column].to_numpy(dtype=np.float64) for column in OHLCV_COLUMNS[1:]}
+            columns['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+            if since is not None:
+                keep = columns['timestamp'] >= since
+                columns = {column: values[keep] for column, values in columns.items()}
+            return columns
+        except (IOError, ValueError) as e:
+            logger.error(f"Error loading candles from {filepath}: {e}", exc_info=True)
+            return None
+
+    def find_gaps(self, exchange_id, symbol, timeframe, interval_ms):
+        """
+        Returns the missing candle ranges of a stored series. See find_gaps().
+        """
+        return find_gaps(self.load_timestamps(exchange_id, symbol, timeframe), interval_ms)
+
+    def load_arrays(self, exchange_id, symbol, timeframe):
+        """
+        Returns the stored columns of an 'npy' series as read-only memory-mapped arrays.
+
+        The arrays can be passed straight to signal generators that accept a mapping of
+        columns (e.g. MovingAverageCrossoverSignalGenerator), which then only touch the
+        pages they read.
+
+        Returns:
+            dict: Column name to np.memmap, or None if the store is not 'npy' or the series is missing.
+        """
+        if self.fmt != 'npy':
+            logger.error("load_arrays() requires a CandleStore with fmt='npy'.")
+            return None
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        if not os.path.isdir(filepath):
+            logger.warning(f"No stored candles at {filepath}.")
+            return None
+        try:
+            return load_ohlcv_arrays(filepath)
+        except (IOError, ValueError) as e:
+            logger.error(f"Error memory-mapping candles from {filepath}: {e}", exc_info=True)
+            return None
+
+    def load(self, exchange_id, symbol, timeframe, tail=None):
+        """
+        Loads a stored series as a DataFrame with the same layout as fetch_historical_ohlcv.
+
+        Args:
+            exchange_id (str): The exchange id.
+            symbol (str): The trading symbol.
+            timeframe (str): The timeframe.
+            tail (int, optional): If given, only the last `tail` candles are read from disk.
+
+        Returns:
+            pd.DataFrame: The stored candles (empty if the series does not exist), or None if an error occurs.
+        """
+        filepath = self.path_for(exchange_id, symbol, timeframe)
+        if not os.path.exists(filepath):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        try:
+            if self.fmt == 'npy':
+                arrays = load_ohlcv_arrays(filepath)
+                start = 0 if tail is None else max(len(arrays['timestamp']) - tail, 0)
+                columns = {column: np.array(values[start:]) for column, values in arrays.items()}
+                df = pd.DataFrame(columns, columns=OHLCV_COLUMNS)
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                return df
+            if tail is None:
+                df = pd.read_csv(filepath)
+            else:
+                lines = [line for line in self._read_tail_lines(filepath, tail) if not line.startswith('timestamp')]
+                df = pd.read_csv(io.StringIO('\n'.join([','.join(OHLCV_COLUMNS)] + lines)))
+        except (IOError, ValueError) as e:
+            logger.error(f"Error loading candles from {filepath}: {e}", exc_info=True)
+            return None
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+        return df
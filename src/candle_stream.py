@@ -0,0 +1,312 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import logging
+import numpy as np
+from .candle_store import load_ohlcv
+from .lazy_import import lazy_import
+from .resampler import timeframe_to_ms
+
+ccxt = lazy_import('ccxt')
+
+logger = logging.getLogger(__name__)
+
+class CandleTransport:
+    """
+    Source of candle updates for a CandleSubscription.
+
+    run() pushes lists of raw [timestamp, open, high, low, close, volume] candles to
+    `on_candles` until `stop_event` is set or the source is exhausted. Updates may repeat
+    candles or revise the still-open bar; the subscription turns them into closed bars.
+    """
+    # Live transports start at the bar open when subscribing unless `since` is given.
+    live = True
+    # Milliseconds after a bar's end from which it counts as closed even if no newer bar has
+    # arrived yet. None: bars close only when a newer bar arrives or the transport ends.
+    # Transports that set it call on_candles([]) while no updates arrive, so the open bar's
+    # close is still checked on a quiet market.
+    close_delay_ms = None
+
+    def run(self, symbol, timeframe, since, on_candles, stop_event):
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+class PollingTransport(CandleTransport):
+    """
+    Polls fetch_ohlcv through an ExchangeHandler, asking only for bars from the currently
+    open one onwards, and sleeps until the next bar is due to close.
+
+    Network errors left over after the handler's retries are logged and polled through;
+    any other error (e.g. BadSymbol or AuthenticationError) ends the subscription.
+    """
+    def __init__(self, exchange_handler, page_limit=1000, settle_delay=1.0, min_interval=1.0):
+        """
+        Initializes the PollingTransport.
+
+        Args:
+            exchange_handler (ExchangeHandler): Handler used for the (rate-limited) requests.
+            page_limit (int): Maximum candles per request. Defaults to 1000.
+            settle_delay (float): Seconds to wait after a bar's close before polling for it. Defaults to 1.0.
+            min_interval (float): Minimum seconds between polls. Defaults to 1.0.
+        """
+        self.exchange_handler = exchange_handler
+        self.page_limit = page_limit
+        self.settle_delay = settle_delay
+        self.min_interval = min_interval
+        self.close_delay_ms = int(settle_delay * 1000)
+
+    def run(self, symbol, timeframe, since, on_candles, stop_event):
+        interval_ms = timeframe_to_ms(timeframe)
+        cursor = since
+        while not stop_event.is_set():
+            try:
+                page = self.exchange_handler.request('fetch_ohlcv', symbol, timeframe, cursor, self.page_limit)
+            except ccxt.NetworkError as e:
+                logger.warning(f"Polling {symbol} {timeframe} failed: {e}")
+                page = None
+            if page:
+                on_candles(page)
+                # The last bar may still be open: start the next poll from it
+                cursor = page[-1][0]
+                if len(page) >= self.page_limit:
+                    continue # Still catching up
+            now = time.time() * 1000
+            next_close = (cursor if cursor is not None else now) + interval_ms
+            wait = max(self.min_interval, (next_close - now) / 1000 + self.settle_delay)
+            stop_event.wait(wait)
+
+class WebsocketTransport(CandleTransport):
+    """
+    Streams candle updates with ccxt.pro's watch_ohlcv on a private event loop.
+
+    The bars from `since` up to the live stream are first fetched in pages through the
+    ExchangeHandler (rate-limited, retried and counted like any other request), so none
+    are missed.
+    """
+    def __init__(self, exchange_handler, poll_timeout=1.0, close_delay=2.0, page_limit=1000):
+        """
+        Initializes the WebsocketTransport.
+
+        Args:
+            exchange_handler (ExchangeHandler): Handler whose exchange id, credentials and sandbox mode the
+                                                stream uses, and through which the REST catch-up is requested.
+            poll_timeout (float): Seconds between checks of the stop event and of the open bar's close while no
+                                  update arrives. Defaults to 1.0.
+            close_delay (float): Seconds after a bar's end until it is delivered without waiting for the next
+                                 bar's first trade. Defaults to 2.0.
+            page_limit (int): Maximum candles per catch-up request. Defaults to 1000.
+        """
+        self.exchange_handler = exchange_handler
+        self.poll_timeout = poll_timeout
+        self.close_delay_ms = int(close_delay * 1000)
+        self.page_limit = page_limit
+
+    def run(self, symbol, timeframe, since, on_candles, stop_event):
+        asyncio.run(self._run(symbol, timeframe, since, on_candles, stop_event))
+
+    async def _run(self, symbol, timeframe, since, on_candles, stop_event):
+        import ccxt.pro as ccxtpro # Optional: only needed by this transport
+
+        handler = self.exchange_handler
+        exchange = getattr(ccxtpro, handler.exchange_id)({'apiKey': handler.api_key, 'secret': handler.api_secret})
+        if handler.is_testnet:
+            exchange.set_sandbox_mode(True)
+        try:
+            await self._catch_up(symbol, timeframe, since, on_candles, stop_event)
+            while not stop_event.is_set():
+                try:
+                    candles = await asyncio.wait_for(exchange.watch_ohlcv(symbol, timeframe), self.poll_timeout)
+                except asyncio.TimeoutError:
+                    on_candles([]) # Closes the open bar once its interval has passed
+                    continue
+                on_candles(candles)
+        finally:
+            await exchange.close()
+
+    async def _catch_up(self, symbol, timeframe, since, on_candles, stop_event):
+        """
+        Fetches the bars from `since` onwards over REST, a page at a time.
+        """
+        cursor = since
+        while cursor is not None and not stop_event.is_set():
+            page = await asyncio.to_thread(self.exchange_handler.request, 'fetch_ohlcv', symbol, timeframe,
+                                           cursor, self.page_limit)
+            if page:
+                on_candles(page)
+            if len(page or ()) < self.page_limit:
+                return
+            cursor = page[-1][0]
+
+class ReplayTransport(CandleTransport):
+    """
+    Replays recorded candles, for testing consumers offline. Bars close as soon as the next
+    one is replayed; the last one when the replay ends.
+    """
+    live = False
+
+    def __init__(self, candles, delay=0.0):
+        """
+        Initializes the ReplayTransport.
+
+        Args:
+            candles (list): Raw [timestamp, open, high, low, close, volume] candles in time order. Repeated
+                            timestamps replay revisions of an open bar.
+            delay (float): Seconds to wait between candles. Defaults to 0.0 (as fast as possible).
+        """
+        self.candles = candles
+        self.delay = delay
+
+    @classmethod
+    def from_file(cls, filepath, fmt='csv', delay=0.0):
+        """
+        Creates a ReplayTransport from a file written by save_ohlcv/OHLCVWriter or a CandleStore.
+        """
+        df = load_ohlcv(filepath, fmt)
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64).tolist()
+        return cls([[timestamp] + row for timestamp, row in zip(timestamps.tolist(), values)], delay)
+
+    def run(self, symbol, timeframe, since, on_candles, stop_event):
+        for candle in self.candles:
+            if stop_event.is_set():
+                return
+            if since is not None and candle[0] < since:
+                continue
+            on_candles([candle])
+            if self.delay:
+                stop_event.wait(self.delay)
+        on_candles([], final=True)
+
+class SocketReplayTransport(CandleTransport):
+    """
+    Replays candles sent over a TCP socket as newline-delimited JSON arrays
+    ([timestamp, open, high, low, close, volume]), e.g. by a local test feed.
+    """
+    live = False
+
+    def __init__(self, host, port, timeout=1.0):
+        """
+        Initializes the SocketReplayTransport.
+
+        Args:
+            host (str): Host of the feed.
+            port (int): Port of the feed.
+            timeout (float): Seconds between checks of the stop event while no data arrives. Defaults to 1.0.
+        """
+        self.address = (host, port)
+        self.timeout = timeout
+
+    def run(self, symbol, timeframe, since, on_candles, stop_event):
+        with socket.create_connection(self.address, timeout=self.timeout) as conn:
+            buffer = b''
+            while not stop_event.is_set():
+                try:
+                    data = conn.recv(65536)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                candles = [json.loads(line) for line in lines if line.strip()]
+                if since is not None:
+                    candles = [candle for candle in candles if candle[0] >= since]
+                if candles:
+                    on_candles(candles)
+        on_candles([], final=True)
+
+class CandleSubscription:
+    """
+    Delivers each closed bar of a symbol and timeframe exactly once to a callback.
+
+    The transport runs in a background thread. A bar counts as closed once a newer bar has
+    been seen or, for live transports, shortly after its interval has passed. Bars at or before the
+    last delivered one are ignored, so overlapping polls and websocket revisions never cause
+    duplicates.
+    """
+    def __init__(self, symbol, timeframe, callback, transport, since=None):
+        """
+        Initializes the CandleSubscription. Call start() to begin receiving bars.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe (e.g., '1m').
+            callback (callable): Called with each closed bar as [timestamp, open, high, low, close, volume].
+            transport (CandleTransport): Source of candle updates.
+            since (int, optional): First bar to deliver, in epoch milliseconds. Defaults to None (the bar open
+                                   when a live subscription starts, or the whole replay).
+        """
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.callback = callback
+        self.transport = transport
+        self.interval_ms = timeframe_to_ms(timeframe)
+        self.since = since
+        self.last_delivered = None if since is None else since - self.interval_ms
+        self._open_bar = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the transport in a background daemon thread. Returns self.
+        """
+        if self.since is None and self.transport.live:
+            self.since = int(time.time() * 1000) // self.interval_ms * self.interval_ms
+            self.last_delivered = self.since - self.interval_ms
+        self._thread = threading.Thread(target=self._run, name=f"candles-{self.symbol}-{self.timeframe}", daemon=True)
+        self._thread.start()
+        logger.info(f"Subscribed to {self.symbol} {self.timeframe} candles via {type(self.transport).__name__}.")
+        return self
+
+    def _run(self):
+        try:
+            self.transport.run(self.symbol, self.timeframe, self.since, self._on_candles, self._stop)
+        except Exception as e:
+            logger.error(f"Candle subscription for {self.symbol} {self.timeframe} stopped: {e}", exc_info=True)
+
+    def _deliver(self, bar):
+        self.last_delivered = bar[0]
+        try:
+            self.callback(list(bar))
+        except Exception as e:
+            logger.error(f"Candle callback for {self.symbol} failed: {e}", exc_info=True)
+
+    def _on_candles(self, candles, final=False):
+        """
+        Receives updates from the transport and delivers the bars they close.
+        """
+        with self._lock:
+            for candle in sorted(candles, key=lambda candle: candle[0]):
+                if self.last_delivered is not None and candle[0] <= self.last_delivered:
+                    continue
+                if self._open_bar is not None and candle[0] > self._open_bar[0]:
+                    self._deliver(self._open_bar)
+                self._open_bar = candle
+            if self._open_bar is not None and (final or self._interval_passed(self._open_bar)):
+                self._deliver(self._open_bar)
+                self._open_bar = None
+
+    def _interval_passed(self, bar):
+        delay = self.transport.close_delay_ms
+        return delay is not None and bar[0] + self.interval_ms + delay <= time.time() * 1000
+
+    def stop(self, timeout=None):
+        """
+        Stops the subscription and waits up to `timeout` seconds for the transport to finish.
+        """
+        self._stop.set()
+        self.join(timeout)
+
+    def join(self, timeout=None):
+        """
+        Waits until the transport finishes, e.g. when a replay is exhausted.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
@@ -58,6 +58,13 @@ def load_config(config_path='config/config.ini'):
         logger.error(f"DEFAULT_EXCHANGE_ID cannot be empty in '{config_path}'.")
         return None
 
+    try:
+        config_values['balance_ttl'] = config.getfloat('EXCHANGE', 'BALANCE_TTL', fallback=5.0)
+        config_values['http_pool_size'] = config.getint('EXCHANGE', 'HTTP_POOL_SIZE', fallback=10)
+    except ValueError as e:
+        logger.error(f"Invalid numeric value in [EXCHANGE] section of '{config_path}': {e}", exc_info=True)
+        return None
+
     # GENERAL section (optional, with defaults)
     config_values['LOG_LEVEL'] = 'INFO' # Default
     config_values['LOG_FILE'] = 'logs/app.log' # Default
@@ -79,6 +86,53 @@ def load_config(config_path='config/config.ini'):
             config_values['LOG_LEVEL'] = 'INFO'
             config_values['LOG_FILE'] = 'logs/app.log'
 
+    # RATE_LIMIT section (optional). Empty values keep the defaults derived from ccxt.
+    config_values['rate_limits'] = {}
+    if 'RATE_LIMIT' in config:
+        try:
+            rate = config.get('RATE_LIMIT', 'RATE', fallback='').strip()
+            if rate:
+                config_values['rate_limits']['rate'] = float(rate)
+            burst = config.get('RATE_LIMIT', 'BURST', fallback='').strip()
+            if burst:
+                config_values['rate_limits']['burst'] = float(burst)
+            weights = config.get('RATE_LIMIT', 'ENDPOINT_WEIGHTS', fallback='').strip()
+            if weights:
+                config_values['rate_limits']['weights'] = {
+                    endpoint.strip(): float(weight)
+                    for endpoint, weight in (item.split(':', 1) for item in weights.split(',') if item.strip())
+                }
+        except ValueError as e:
+            logger.error(f"Invalid value in [RATE_LIMIT] section of '{config_path}': {e}", exc_info=True)
+            return None
+
+    # RETRY section (optional). Empty values keep the RetryPolicy defaults.
+    config_values['retry'] = {}
+    if 'RETRY' in config:
+        try:
+            for option, key, parse in (('MAX_ATTEMPTS', 'max_attempts', int), ('BASE_DELAY', 'base_delay', float),
+                                       ('MAX_DELAY', 'max_delay', float), ('DEADLINE', 'deadline', float)):
+                value = config.get('RETRY', option, fallback='').strip()
+                if value:
+                    config_values['retry'][key] = parse(value)
+        except ValueError as e:
+            logger.error(f"Invalid value in [RETRY] section of '{config_path}': {e}", exc_info=True)
+            return None
+
+    # MARKETS_CACHE section (optional). A TTL of 0 disables the on-disk markets cache.
+    config_values['markets_cache'] = {'dir': 'cache', 'ttl': 86400.0}
+    if 'MARKETS_CACHE' in config:
+        try:
+            cache_dir = config.get('MARKETS_CACHE', 'DIR', fallback='').strip()
+            if cache_dir:
+                config_values['markets_cache']['dir'] = cache_dir
+            ttl = config.get('MARKETS_CACHE', 'TTL', fallback='').strip()
+            if ttl:
+                config_values['markets_cache']['ttl'] = float(ttl)
+        except ValueError as e:
+            logger.error(f"Invalid value in [MARKETS_CACHE] section of '{config_path}': {e}", exc_info=True)
+            return None
+
     logger.debug(f"Configuration loaded from '{config_path}': {config_values}")
     return config_values
 
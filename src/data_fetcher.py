@@ -1,40 +1,88 @@
+import numpy as np
 import pandas as pd
 import os
-import ccxt # For ccxt.base.errors
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+from .candle_store import OHLCV_FORMATS, OHLCVWriter, make_safe_filename, ohlcv_filename, ohlcv_to_frame, save_ohlcv
+from .lazy_import import lazy_import
+
+ccxt = lazy_import('ccxt') # For ccxt.base.errors, loaded on first use
 
 logger = logging.getLogger(__name__)
 
+def plan_gap_requests(gaps, interval_ms, page_limit):
+    """
+    Plans the fewest fetch_ohlcv requests that cover all gaps.
+
+    Gaps are covered greedily from the earliest: each request starts at the first candle still
+    missing and spans up to `page_limit` candles, so nearby gaps share one request and long
+    gaps are split into full pages.
+
+    Args:
+        gaps (list): Sorted (start_ms, end_ms) ranges, end exclusive, as returned by find_gaps().
+        interval_ms (int): The timeframe interval in milliseconds.
+        page_limit (int): The maximum number of candles per request.
+
+    Returns:
+        list: (since_ms, limit) tuples.
+    """
+    requests = [] # [since, end of the last missing candle covered, end of the request's window]
+    for start, end in gaps:
+        while start < end:
+            if requests and start < requests[-1][2]:
+                request = requests[-1]
+            else:
+                request = [start, start, start + page_limit * interval_ms]
+                requests.append(request)
+            covered_until = min(end, request[2])
+            request[1] = max(request[1], covered_until)
+            start = covered_until
+    return [(since, int((covered_until - since) // interval_ms)) for since, covered_until, _ in requests]
+
 class DataFetcher:
-    def __init__(self, exchange_handler):
+    def __init__(self, exchange_handler, compact=False, float_dtype=np.float32):
         """
         Initializes the DataFetcher with an ExchangeHandler instance.
 
         Args:
             exchange_handler (ExchangeHandler): An instance of the ExchangeHandler class.
+            compact (bool): Whether fetch_historical_ohlcv returns compact DataFrames, indexed by int64
+                            epoch-millisecond timestamps with `float_dtype` values. Defaults to False.
+            float_dtype (np.dtype): Price and volume dtype of compact DataFrames. Defaults to np.float32.
+                                    Files saved from compact DataFrames hold these (rounded) values.
         """
         self.exchange_handler = exchange_handler
+        self.compact = compact
+        self.float_dtype = float_dtype
         logger.debug("DataFetcher initialized.")
 
+    def _fetch_ohlcv(self, symbol, timeframe, since, limit):
+        """
+        Issues a single fetch_ohlcv request through the handler's shared rate limiter.
+        """
+        return self.exchange_handler.request('fetch_ohlcv', symbol, timeframe, since, limit)
+
     def _make_safe_filename(self, symbol):
         """
         Replaces characters in a symbol that are invalid for filenames.
         """
-        safe_name = "".join(c if c.isalnum() else "_" for c in symbol)
+        safe_name = make_safe_filename(symbol)
         logger.debug(f"Original symbol '{symbol}' sanitized to '{safe_name}'.")
         return safe_name
 
-    def fetch_historical_ohlcv(self, symbol, timeframe='1h', since=None, limit=100, output_dir='data'):
+    def fetch_historical_ohlcv(self, symbol, timeframe='1h', since=None, limit=100, output_dir='data', fmt='csv'):
         """
-        Fetches historical OHLCV data, converts it to a Pandas DataFrame, and saves it to a CSV file.
+        Fetches historical OHLCV data, converts it to a Pandas DataFrame, and saves it to a file.
 
         Args:
             symbol (str): The trading symbol (e.g., 'BTC/USDT').
             timeframe (str): The timeframe for OHLCV data (e.g., '1h', '1d').
             since (int, optional): Timestamp in milliseconds for the start of the data. Defaults to None.
             limit (int): The maximum number of candles to fetch. Defaults to 100.
-            output_dir (str): The directory to save the CSV file. Defaults to 'data'.
-                              If None, data is not saved to CSV.
+            output_dir (str): The directory to save the file. Defaults to 'data'.
+                              If None, data is not saved.
+            fmt (str): Output format, one of 'csv', 'parquet', 'feather' or 'npy'. Defaults to 'csv'.
 
         Returns:
             pd.DataFrame: The OHLCV data as a Pandas DataFrame, or None if an error occurs.
@@ -42,10 +90,13 @@ class DataFetcher:
         if not self.exchange_handler or not self.exchange_handler.exchange:
             logger.error("ExchangeHandler not properly initialized in DataFetcher.")
             return None
+        if fmt not in OHLCV_FORMATS:
+            logger.error(f"Unsupported output format '{fmt}'. Choose from {sorted(OHLCV_FORMATS)}.")
+            return None
 
         logger.info(f"Fetching OHLCV for {symbol}, timeframe {timeframe}, limit {limit}, since {since}.")
         try:
-            ohlcv = self.exchange_handler.exchange.fetch_ohlcv(symbol, timeframe, since, limit)
+            ohlcv = self._fetch_ohlcv(symbol, timeframe, since, limit)
             if not ohlcv:
                 logger.info(f"No data returned by exchange for {symbol} on timeframe {timeframe}.")
                 return pd.DataFrame()
@@ -60,12 +111,20 @@ class DataFetcher:
             logger.error(f"An unexpected error occurred fetching OHLCV for {symbol}: {e}", exc_info=True)
             return None
 
+        return self._process_ohlcv(ohlcv, symbol, timeframe, output_dir, fmt)
+
+    def _process_ohlcv(self, ohlcv, symbol, timeframe, output_dir, fmt):
+        """
+        Converts raw candles to a DataFrame and saves it to `output_dir` unless that is None.
+
+        Returns:
+            pd.DataFrame: The OHLCV data, or None if saving fails.
+        """
         logger.debug(f"Fetched {len(ohlcv)} candles for {symbol}.")
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df = ohlcv_to_frame(ohlcv, compact=self.compact, float_dtype=self.float_dtype)
 
         if not df.empty:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            logger.debug(f"Converted timestamp to datetime. Head of DataFrame:\n{df.head()}")
+            logger.debug(f"Built OHLCV DataFrame. Head of DataFrame:\n{df.head()}")
         else:
             logger.info(f"No data available for {symbol} with timeframe {timeframe}. Returning empty DataFrame.")
             return df # Already an empty DataFrame if ohlcv was empty and processed
@@ -81,22 +140,311 @@ class DataFetcher:
             logger.error(f"Error creating directory {output_dir}: {e}", exc_info=True)
             return None # Or return df without saving if preferred
 
-        exchange_id = self.exchange_handler.exchange.id
-        safe_symbol = self._make_safe_filename(symbol)
-        filename = f"{exchange_id}_{safe_symbol}_{timeframe}.csv"
-        filepath = os.path.join(output_dir, filename)
+        filepath = self._output_path(output_dir, symbol, timeframe, fmt)
         logger.debug(f"Constructed filepath: {filepath}")
 
         try:
-            df.to_csv(filepath, index=False)
+            save_ohlcv(df, filepath, fmt)
             logger.info(f"Successfully saved data for {symbol} to {filepath}")
-        except IOError as e:
-            logger.error(f"Error saving DataFrame to CSV file {filepath}: {e}", exc_info=True)
+        except ImportError as e:
+            logger.error(f"Cannot save {symbol} as {fmt}: {e}")
+            return None
+        except (IOError, OSError) as e:
+            logger.error(f"Error saving DataFrame to {fmt} file {filepath}: {e}", exc_info=True)
             return None # Or return df if saving is not critical
 
         return df
 
+    def _output_path(self, output_dir, symbol, timeframe, fmt='csv'):
+        """
+        Builds the output path `{output_dir}/{exchange_id}_{safe_symbol}_{timeframe}{ext}`.
+        """
+        return os.path.join(output_dir, ohlcv_filename(self.exchange_handler.exchange.id, symbol, timeframe, fmt))
+
+    def _timeframe_to_ms(self, timeframe):
+        """
+        Converts a ccxt timeframe string (e.g. '1m', '4h', '1d') to milliseconds.
+        """
+        return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+    def iter_ohlcv_pages(self, symbol, timeframe='1h', since=None, until=None, page_limit=1000):
+        """
+        Walks `since` forward and yields one page of raw OHLCV candles at a time.
+
+        Each request asks for up to `page_limit` candles starting at the cursor; the cursor
+        is then moved to one interval past the last candle received. Iteration stops when the
+        exchange returns no new candles or the `until` bound is reached. Exchange errors are
+        not caught here and propagate to the caller.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe for OHLCV data (e.g., '1m', '1h').
+            since (int, optional): Start timestamp in milliseconds (inclusive).
+            until (int, optional): End timestamp in milliseconds (exclusive). Defaults to None (no bound).
+            page_limit (int): The maximum number of candles requested per call. Defaults to 1000.
+
+        Yields:
+            list: A non-empty list of [timestamp, open, high, low, close, volume] candles.
+        """
+        timeframe_ms = self._timeframe_to_ms(timeframe)
+        cursor = since
+        while True:
+            page = self._fetch_ohlcv(symbol, timeframe, cursor, page_limit)
+            if not page:
+                break
+            if cursor is not None:
+                page = [candle for candle in page if candle[0] >= cursor]
+            if until is not None:
+                page = [candle for candle in page if candle[0] < until]
+            if not page:
+                break
+
+            logger.debug(f"Fetched page of {len(page)} candles for {symbol} starting at {page[0][0]}.")
+            yield page
+
+            next_cursor = page[-1][0] + timeframe_ms
+            if until is not None and next_cursor >= until:
+                break
+            if cursor is not None and next_cursor <= cursor:
+                logger.warning(f"Pagination for {symbol} did not advance past {cursor}. Stopping.")
+                break
+            cursor = next_cursor
+
+    def backfill_ohlcv(self, symbol, timeframe='1h', since=None, until=None, output_dir='data', page_limit=1000,
+                       fmt='csv'):
+        """
+        Fetches a long OHLCV range page by page and streams each page to the output file.
+
+        Unlike fetch_historical_ohlcv, only one page is held in memory at a time, so the
+        range covered is not capped by the exchange's per-request limit. The output file
+        uses the same name and column layout as fetch_historical_ohlcv and is overwritten.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe for OHLCV data (e.g., '1m', '1h').
+            since (int): Start timestamp in milliseconds (inclusive).
+            until (int, optional): End timestamp in milliseconds (exclusive). Defaults to None,
+                                   which backfills up to the most recent candle.
+            output_dir (str): The directory to save the CSV file. Defaults to 'data'.
+            page_limit (int): The maximum number of candles requested per call. Defaults to 1000.
+            fmt (str): Output format, one of 'csv', 'parquet', 'feather' or 'npy'. Defaults to 'csv'.
+
+        Returns:
+            int: The number of candles written, or None if an error occurs.
+        """
+        if not self.exchange_handler or not self.exchange_handler.exchange:
+            logger.error("ExchangeHandler not properly initialized in DataFetcher.")
+            return None
+        if since is None:
+            logger.error("backfill_ohlcv requires a 'since' timestamp.")
+            return None
+
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Error creating directory {output_dir}: {e}", exc_info=True)
+            return None
+
+        filepath = self._output_path(output_dir, symbol, timeframe, fmt)
+
+        logger.info(f"Backfilling OHLCV for {symbol}, timeframe {timeframe}, since {since}, until {until} into {filepath}.")
+        written = 0
+        try:
+            with OHLCVWriter(filepath, fmt) as writer:
+                for page in self.iter_ohlcv_pages(symbol, timeframe, since=since, until=until, page_limit=page_limit):
+                    page_df = ohlcv_to_frame(page, compact=True, float_dtype=np.float64)
+                    writer.write(page_df)
+                    written += len(page_df)
+        except ImportError as e:
+            logger.error(f"Cannot backfill {symbol} as {fmt}: {e}")
+            return None
+        except ccxt.NetworkError as e:
+            logger.error(f"Network error backfilling OHLCV for {symbol} after {written} candles: {e}", exc_info=True)
+            return None
+        except ccxt.ExchangeError as e:
+            logger.error(f"Exchange error backfilling OHLCV for {symbol} after {written} candles: {e}", exc_info=True)
+            return None
+        except IOError as e:
+            logger.error(f"Error writing backfill data to {filepath}: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred backfilling OHLCV for {symbol}: {e}", exc_info=True)
+            return None
+
+        logger.info(f"Backfilled {written} candles for {symbol} to {filepath}")
+        return written
+
+    def update_ohlcv(self, store, symbol, timeframe='1h', since=None, limit=100, page_limit=1000):
+        """
+        Tops up a CandleStore series with candles newer than its last stored timestamp.
+
+        Only closed candles are stored, so a stored bar is never revised later. If the series
+        is empty, the fetch starts at `since`, or takes the latest `limit` candles when `since`
+        is None.
+
+        Args:
+            store (CandleStore): The store to update.
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe for OHLCV data (e.g., '1h').
+            since (int, optional): Start timestamp in milliseconds used when the series is empty.
+            limit (int): Number of recent candles fetched when the series is empty and `since` is None.
+            page_limit (int): The maximum number of candles requested per call. Defaults to 1000.
+
+        Returns:
+            int: The number of candles appended to the store, or None if an error occurs.
+        """
+        if not self.exchange_handler or not self.exchange_handler.exchange:
+            logger.error("ExchangeHandler not properly initialized in DataFetcher.")
+            return None
+
+        exchange_id = self.exchange_handler.exchange.id
+        timeframe_ms = self._timeframe_to_ms(timeframe)
+        last_ts = store.last_timestamp(exchange_id, symbol, timeframe)
+        # Candles whose interval has not ended yet are still forming and are left for a later run.
+        until = (int(time.time() * 1000) // timeframe_ms) * timeframe_ms
+
+        appended = 0
+        try:
+            if last_ts is None and since is None:
+                logger.info(f"No stored candles for {symbol} {timeframe}. Fetching the latest {limit}.")
+                candles = self._fetch_ohlcv(symbol, timeframe, None, limit)
+                result = store.append(exchange_id, symbol, timeframe, [c for c in candles or [] if c[0] < until])
+                return result
+
+            start = since if last_ts is None else last_ts + timeframe_ms
+            logger.info(f"Topping up {symbol} {timeframe} from {start}.")
+            for page in self.iter_ohlcv_pages(symbol, timeframe, since=start, until=until, page_limit=page_limit):
+                result = store.append(exchange_id, symbol, timeframe, page)
+                if result is None:
+                    return None
+                appended += result
+        except ccxt.NetworkError as e:
+            logger.error(f"Network error updating OHLCV for {symbol} after {appended} candles: {e}", exc_info=True)
+            return None
+        except ccxt.ExchangeError as e:
+            logger.error(f"Exchange error updating OHLCV for {symbol} after {appended} candles: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred updating OHLCV for {symbol}: {e}", exc_info=True)
+            return None
+
+        logger.info(f"Appended {appended} new candles for {symbol} {timeframe}.")
+        return appended
+
+    def repair_gaps(self, store, symbol, timeframe='1h', page_limit=1000):
+        """
+        Finds holes in a stored series and re-fetches only the missing candles.
+
+        The stored timestamps are scanned with find_gaps() and the holes are covered with the
+        fewest requests (see plan_gap_requests()). Fetched candles outside the holes are
+        discarded, and the recovered candles are merged into the store in one rewrite. Holes
+        the exchange has no data for (e.g. maintenance windows) stay open.
+
+        Args:
+            store (CandleStore): The store holding the series.
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe of the series (e.g., '1m').
+            page_limit (int): The maximum number of candles requested per call. Defaults to 1000.
+
+        Returns:
+            int: The number of candles filled in, or None if an error occurs.
+        """
+        if not self.exchange_handler or not self.exchange_handler.exchange:
+            logger.error("ExchangeHandler not properly initialized in DataFetcher.")
+            return None
+
+        exchange_id = self.exchange_handler.exchange.id
+        timeframe_ms = self._timeframe_to_ms(timeframe)
+        try:
+            gaps = store.find_gaps(exchange_id, symbol, timeframe, timeframe_ms)
+        except (IOError, ValueError) as e:
+            logger.error(f"Error scanning {symbol} {timeframe} for gaps: {e}", exc_info=True)
+            return None
+        if not gaps:
+            logger.info(f"No gaps found in stored {symbol} {timeframe} candles.")
+            return 0
+
+        missing = sum((end - start) // timeframe_ms for start, end in gaps)
+        requests = plan_gap_requests(gaps, timeframe_ms, page_limit)
+        logger.info(f"Found {len(gaps)} gaps ({missing} candles) in {symbol} {timeframe}. "
+                    f"Re-fetching with {len(requests)} requests.")
+
+        gap_starts = [start for start, _ in gaps]
+        gap_ends = [end for _, end in gaps]
+        recovered = []
+        try:
+            for since, limit in requests:
+                candles = self._fetch_ohlcv(symbol, timeframe, since, limit) or []
+                timestamps = np.asarray([candle[0] for candle in candles], dtype=np.int64)
+                # A candle is missing if it falls inside the gap that starts at or before it.
+                gap_index = np.searchsorted(gap_starts, timestamps, side='right') - 1
+                inside = (gap_index >= 0) & (timestamps < np.take(gap_ends, np.maximum(gap_index, 0)))
+                recovered.extend(candle for candle, keep in zip(candles, inside) if keep)
+        except ccxt.NetworkError as e:
+            logger.error(f"Network error repairing gaps for {symbol}: {e}", exc_info=True)
+            return None
+        except ccxt.ExchangeError as e:
+            logger.error(f"Exchange error repairing gaps for {symbol}: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred repairing gaps for {symbol}: {e}", exc_info=True)
+            return None
+
+        filled = store.insert(exchange_id, symbol, timeframe, recovered)
+        if filled is None:
+            return None
+        if filled < missing:
+            logger.warning(f"{missing - filled} candles of {symbol} {timeframe} are not available from the exchange.")
+        logger.info(f"Filled {filled} missing candles for {symbol} {timeframe}.")
+        return filled
+
+    def fetch_many(self, symbols, timeframes=('1h',), since=None, limit=100, output_dir=None, fmt='csv', max_workers=8):
+        """
+        Fetches OHLCV data for many symbols and timeframes concurrently.
+
+        Each (symbol, timeframe) pair is fetched with fetch_historical_ohlcv on a bounded thread
+        pool. All requests go through the process-wide rate-limit scheduler, so the exchange's
+        limit holds regardless of `max_workers`.
+
+        Args:
+            symbols (list): Trading symbols (e.g., the result of fetch_futures_trading_pairs()).
+            timeframes (list or str): One or more timeframes. Defaults to ('1h',).
+            since (int, optional): Timestamp in milliseconds for the start of the data. Defaults to None.
+            limit (int): The maximum number of candles to fetch per pair. Defaults to 100.
+            output_dir (str, optional): Directory to save each result to. Defaults to None (not saved).
+            fmt (str): Output format used when output_dir is set. Defaults to 'csv'.
+            max_workers (int): The maximum number of concurrent requests. Defaults to 8.
+
+        Yields:
+            tuple: (symbol, timeframe, pd.DataFrame or None) in completion order. None marks a failed fetch.
+        """
+        if isinstance(timeframes, str):
+            timeframes = [timeframes]
+        pairs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        if not pairs:
+            return
+        if not self.exchange_handler or not self.exchange_handler.exchange:
+            logger.error("ExchangeHandler not properly initialized in DataFetcher.")
+            for symbol, timeframe in pairs:
+                yield symbol, timeframe, None
+            return
+
+        logger.info(f"Fetching {len(pairs)} symbol/timeframe pairs with up to {max_workers} workers.")
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch_many')
+        try:
+            futures = {
+                executor.submit(self.fetch_historical_ohlcv, symbol, timeframe, since, limit, output_dir, fmt): (symbol, timeframe)
+                for symbol, timeframe in pairs
+            }
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                yield symbol, timeframe, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
 if __name__ == '__main__':
+    # Run from the project root as `python -m src.data_fetcher`: the module uses package-relative imports,
+    # so `python src/data_fetcher.py` cannot import it.
     # Setup basic logging for __main__ execution
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                         handlers=[logging.StreamHandler()])
@@ -136,6 +484,9 @@ if __name__ == '__main__':
             logger.info("[DummyExchangeHandler] Markets loaded (simulated).")
             return True
 
+        def request(self, endpoint, *args, **kwargs):
+            return getattr(self.exchange, endpoint)(*args, **kwargs)
+
     logger.info("\n--- Simulating DataFetcher ---")
     dummy_handler = DummyExchangeHandler(exchange_id='binance_dummy')
     fetcher = DataFetcher(exchange_handler=dummy_handler)
@@ -1,20 +1,80 @@
-import ccxt
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .candle_stream import CandleSubscription, PollingTransport
+from .lazy_import import lazy_import
+from .market_index import MarketIndex
+from .rate_limiter import get_rate_limiter
+from .request_stats import get_request_stats
+from .retry_policy import RetryPolicy, RetryStats, is_idempotent
+from .single_flight import SingleFlight, freeze
+
+ccxt = lazy_import('ccxt') # Loaded on first use; importing ccxt loads every exchange
 
 logger = logging.getLogger(__name__)
 
+# Numeric ticker fields kept by fetch_tickers_snapshot().
+SNAPSHOT_FIELDS = ('bid', 'ask', 'last', 'quoteVolume')
+
 class ExchangeHandler:
-    def __init__(self, exchange_id, api_key, api_secret, is_testnet=False):
+    def __init__(self, exchange_id, api_key, api_secret, is_testnet=False, rate_limits=None, markets_cache=None,
+                 retry_policy=None, balance_ttl=5.0, session=None, coalesce=True, request_stats=None):
+        """
+        Initializes the ExchangeHandler.
+
+        Args:
+            exchange_id (str): The ccxt exchange id (e.g., 'binance').
+            api_key (str): The API key.
+            api_secret (str): The API secret.
+            is_testnet (bool): Whether to enable the exchange's sandbox mode. Defaults to False.
+            rate_limits (dict, optional): Overrides for the shared rate-limit scheduler with the keys
+                'rate' (weight units per second), 'burst' and 'weights' ({endpoint: weight}).
+                By default the exchange is limited to ccxt's documented `rateLimit`, and each HTTP request
+                costs what ccxt's endpoint definitions charge for it.
+            markets_cache (MarketsCache, optional): On-disk cache of market catalogs. When set, load_markets()
+                restores the catalog from it and only downloads it when the entry is missing or expired.
+            retry_policy (RetryPolicy, optional): How request() retries transient errors. Defaults to RetryPolicy().
+            balance_ttl (float): Seconds a fetched balance is reused by fetch_balance(). 0 disables the cache.
+                                 Defaults to 5.0.
+            session (requests.Session, optional): HTTP session to send requests through, e.g. one shared by an
+                                                  ExchangeHandlerPool. It is left open when the exchange is closed
+                                                  or garbage-collected. Defaults to None (ccxt creates one).
+            coalesce (bool): Whether concurrent identical read calls share one request (see request()).
+                             Defaults to True.
+            request_stats (RequestStats, optional): Where request() accounts attempts, errors, latencies, rate-limit
+                                                    waits, retries and response bytes. `retry_stats` reads its
+                                                    counters from it. Defaults to get_request_stats().
+        """
         self.exchange_id = exchange_id
         self.api_key = api_key
         self.api_secret = api_secret
         self.is_testnet = is_testnet
+        self.rate_limiter = get_rate_limiter()
+        self.markets_cache = markets_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.request_stats = request_stats or get_request_stats()
+        self.retry_stats = RetryStats(self.request_stats)
+        self._context = threading.local() # Endpoint of the request running in each thread, whether its weight was reserved, and its throttle wait
+        self.balance_ttl = balance_ttl
+        self._balance = None # (balance, time.monotonic() when fetched)
+        self._balance_lock = threading.Lock()
+        self._market_index = None
+        self.coalesce = coalesce
+        self.single_flight = SingleFlight()
+
+        exchange_config = {
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            # Throttling is done by the process-wide scheduler (see request() and _charge_endpoint_costs()).
+            'enableRateLimit': False,
+        }
+        if session is not None:
+            exchange_config['session'] = session
 
         try:
-            self.exchange = getattr(ccxt, self.exchange_id)({
-                'apiKey': self.api_key,
-                'secret': self.api_secret,
-            })
+            self.exchange = getattr(ccxt, self.exchange_id)(exchange_config)
 
             if self.is_testnet:
                 # Attempt to set sandbox mode if supported
@@ -30,14 +90,167 @@ class ExchangeHandler:
             logger.error(f"An unexpected error occurred during exchange initialization: {e}", exc_info=True)
             self.exchange = None
 
-    def load_markets(self):
+        if self.exchange:
+            self.rate_limiter.register_exchange(self.exchange_id, self.exchange.rateLimit, rate_limits)
+            self._count_response_bytes()
+            self._charge_endpoint_costs()
+            if session is not None:
+                self._keep_session_open()
+
+    def _keep_session_open(self):
+        """
+        Stops ccxt's close(), which Exchange.__del__ also calls, from closing a session owned by
+        the caller (e.g. an ExchangeHandlerPool) when this handler's exchange is disposed of.
+        """
+        exchange = self.exchange
+        close = exchange.close
+
+        def detached_close(*args, **kwargs):
+            exchange.session = None
+            return close(*args, **kwargs)
+
+        exchange.close = detached_close
+
+    def _count_response_bytes(self):
+        """
+        Hooks ccxt's per-response callback to add each HTTP response to `request_stats` under
+        the endpoint being requested by the current thread.
+        """
+        on_rest_response = self.exchange.on_rest_response
+
+        def hook(code, reason, url, method, response_headers, response_body, *args):
+            endpoint = getattr(self._context, 'endpoint', None)
+            if endpoint is not None:
+                length = (response_headers or {}).get('Content-Length')
+                nbytes = int(length) if length else len((response_body or '').encode())
+                self.request_stats.record_response(self.exchange_id, endpoint, nbytes)
+            return on_rest_response(code, reason, url, method, response_headers, response_body, *args)
+
+        self.exchange.on_rest_response = hook
+
+    def _charge_endpoint_costs(self):
+        """
+        Hooks ccxt's fetch2(), through which every HTTP request passes, to reserve each request's
+        ccxt cost (e.g. 16 for binance's fetch_tickers without symbols, 0.2 for a ping) from the
+        shared scheduler, unless request() already reserved an explicit or configured weight.
+        """
+        fetch2 = self.exchange.fetch2
+
+        def hook(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            if not getattr(self._context, 'prepaid', False):
+                cost = self.exchange.calculate_rate_limiter_cost(api, method, path, params, config)
+                wait = self.rate_limiter.acquire(self.exchange_id, getattr(self._context, 'endpoint', None), cost)
+                self._context.wait = getattr(self._context, 'wait', 0.0) + wait
+            return fetch2(path, api, method, params, headers, body, config)
+
+        self.exchange.fetch2 = hook
+
+    def request(self, endpoint, *args, weight=None, idempotent=None, **kwargs):
+        """
+        Calls a ccxt exchange method, throttled by the shared rate-limit scheduler.
+
+        All exchange calls made by the handler, DataFetcher and TradingEngine go through here.
+        A call with an explicit `weight`, or a weight configured for its endpoint, reserves it
+        before each attempt; otherwise each HTTP request the call makes is charged its ccxt cost.
+        Transient errors are retried according to `retry_policy`; every attempt is throttled.
+        Calls that change state (orders, see is_idempotent) are only retried on errors showing
+        that the exchange rejected them. Every attempt's latency (without its rate-limit wait, which
+        is recorded separately), error class and response bytes are recorded in `request_stats`,
+        and each logical call's retries and latency in `retry_stats`.
+        ccxt exceptions that are not retried propagate to the caller.
+
+        With `coalesce`, an idempotent call made while an identical one (same endpoint and
+        arguments) is in flight waits for that call and shares its result or exception, so
+        e.g. several strategies asking for the same OHLCV page, markets or balance cost one
+        request. Shared results must not be modified.
+
+        Args:
+            endpoint (str): The ccxt method name (e.g., 'fetch_ohlcv').
+            *args: Positional arguments for the ccxt method.
+            weight (float, optional): Rate-limit weight of this call. Defaults to the configured endpoint weight,
+                                      or else the ccxt cost of its HTTP requests.
+            idempotent (bool, optional): Whether the call may be repeated safely. Defaults to is_idempotent(endpoint).
+            **kwargs: Keyword arguments for the ccxt method.
+
+        Returns:
+            The ccxt method's return value.
+        """
+        if idempotent is None:
+            idempotent = is_idempotent(endpoint)
+        if self.coalesce and idempotent:
+            key = (endpoint, freeze(args), freeze(kwargs), weight)
+            return self.single_flight.do(key, self._request, endpoint, args, kwargs, weight, idempotent)
+        return self._request(endpoint, args, kwargs, weight, idempotent)
+
+    def _request(self, endpoint, args, kwargs, weight, idempotent):
+        """
+        Makes one logical call for request(): throttled attempts with retries.
+        """
+        method = getattr(self.exchange, endpoint)
+        if weight is None:
+            weight = self.rate_limiter.weight_for(self.exchange_id, endpoint, default=None)
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            wait = self.rate_limiter.acquire(self.exchange_id, endpoint, weight) if weight is not None else 0.0
+            outer = (getattr(self._context, 'endpoint', None), getattr(self._context, 'prepaid', False),
+                     getattr(self._context, 'wait', 0.0))
+            self._context.endpoint, self._context.prepaid, self._context.wait = endpoint, weight is not None, 0.0
+            attempt_start = time.monotonic()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                latency, wait = self._end_attempt(attempt_start, wait, outer)
+                self.request_stats.record(self.exchange_id, endpoint, latency, e, wait)
+                delay = self.retry_policy.next_delay(e, attempt, time.monotonic() - start, idempotent)
+                if delay is None:
+                    self.retry_stats.record(self.exchange_id, endpoint, attempt, time.monotonic() - start, False)
+                    raise
+                logger.warning(f"{self.exchange_id}.{endpoint} failed on attempt {attempt}/{self.retry_policy.max_attempts} "
+                               f"({type(e).__name__}: {e}). Retrying in {delay:.2f}s.")
+                time.sleep(delay)
+                attempt += 1
+            else:
+                latency, wait = self._end_attempt(attempt_start, wait, outer)
+                self.request_stats.record(self.exchange_id, endpoint, latency, wait=wait)
+                self.retry_stats.record(self.exchange_id, endpoint, attempt, time.monotonic() - start, True)
+                return result
+
+    def _end_attempt(self, attempt_start, wait, outer):
+        """
+        Restores the outer request's context after an attempt and splits the attempt's time.
+
+        Returns:
+            tuple: (latency, wait) in seconds, where `wait` adds the throttle waits of the attempt's
+                   HTTP requests to the up-front one, and `latency` excludes them.
+        """
+        elapsed = time.monotonic() - attempt_start
+        hook_wait = self._context.wait
+        self._context.endpoint, self._context.prepaid, self._context.wait = outer
+        return max(elapsed - hook_wait, 0.0), wait + hook_wait
+
+    def load_markets(self, reload=False):
+        """
+        Loads the exchange's markets, from the markets cache when it holds a fresh entry.
+
+        Args:
+            reload (bool): Download the catalog even if a fresh cache entry exists, and refresh
+                           the cache with it. Defaults to False.
+
+        Returns:
+            bool: True if the markets are loaded, False otherwise.
+        """
         if not self.exchange:
             logger.error("Exchange not initialized. Cannot load markets.")
             return False
+        if self.markets_cache and not reload and self.markets_cache.restore(self.exchange, self.is_testnet):
+            return True
         try:
             logger.info(f"Loading markets for {self.exchange_id}...")
-            self.exchange.load_markets()
+            self.request('load_markets', reload)
             logger.info(f"Markets loaded successfully for {self.exchange_id}.")
+            if self.markets_cache:
+                self.markets_cache.store(self.exchange, self.is_testnet)
             return True
         except ccxt.NetworkError as e:
             logger.error(f"Error loading markets for {self.exchange_id} (network issue): {e}", exc_info=True)
@@ -49,13 +262,35 @@ class ExchangeHandler:
             logger.error(f"An unexpected error occurred while loading markets for {self.exchange_id}: {e}", exc_info=True)
             return False
 
-    def fetch_balance(self):
+    def fetch_balance(self, max_age=None):
+        """
+        Fetches the account balance, reusing the cached snapshot while it is fresh.
+
+        The snapshot is shared by all callers; do not modify it. apply_fill_to_balance() keeps
+        the cache current by replacing it with an updated copy, so snapshots already returned
+        never change.
+
+        Args:
+            max_age (float, optional): Maximum age in seconds of a snapshot to reuse. Defaults to `balance_ttl`;
+                                       0 always fetches.
+
+        Returns:
+            dict: The ccxt balance structure, or None if an error occurs.
+        """
         if not self.exchange:
             logger.error("Exchange not initialized. Cannot fetch balance.")
             return None
+        max_age = self.balance_ttl if max_age is None else max_age
+        with self._balance_lock:
+            if self._balance is not None and time.monotonic() - self._balance[1] <= max_age:
+                logger.debug(f"Using cached balance for {self.exchange_id}.")
+                return self._balance[0]
         try:
             logger.info(f"Fetching balance for {self.exchange_id}...")
-            balance = self.exchange.fetch_balance()
+            fetched_at = time.monotonic()
+            balance = self.request('fetch_balance')
+            with self._balance_lock:
+                self._balance = (balance, fetched_at)
             logger.info(f"Balance fetched successfully for {self.exchange_id}.")
             logger.debug(f"Full balance details: {balance}")
             return balance
@@ -69,23 +304,173 @@ class ExchangeHandler:
             logger.error(f"An unexpected error occurred while fetching balance for {self.exchange_id}: {e}", exc_info=True)
             return None
 
+    def invalidate_balance(self):
+        """
+        Drops the cached balance so the next fetch_balance() call requests it again.
+        """
+        with self._balance_lock:
+            self._balance = None
+
+    def _fill_deltas(self, order):
+        """
+        Returns the balance change {currency: amount} of a filled spot order, or None if it cannot be derived.
+        """
+        filled, cost, side = order.get('filled'), order.get('cost'), order.get('side')
+        market = (self.exchange.markets or {}).get(order.get('symbol'))
+        if not filled or cost is None or side not in ('buy', 'sell') or not market or not market.get('spot'):
+            return None
+        sign = 1.0 if side == 'buy' else -1.0
+        deltas = {market['base']: sign * filled, market['quote']: -sign * cost}
+        for fee in order.get('fees') or [order.get('fee')]:
+            if fee and fee.get('cost') and fee.get('currency'):
+                deltas[fee['currency']] = deltas.get(fee['currency'], 0.0) - fee['cost']
+        return deltas
+
+    def apply_fill_to_balance(self, order):
+        """
+        Updates the cached balance after an order so sizing the next trade needs no request.
+
+        Spot orders reporting their filled amount and cost are applied locally to the free and
+        total amounts of the base, quote and fee currencies. For any other order the cache is
+        invalidated instead.
+
+        Args:
+            order (dict): The ccxt order structure returned by the exchange.
+
+        Returns:
+            bool: True if the cached balance was patched, False if it was invalidated or empty.
+        """
+        with self._balance_lock:
+            if self._balance is None:
+                return False
+            deltas = self._fill_deltas(order) if order else None
+            if deltas is None:
+                logger.debug(f"Cannot apply order to the cached balance of {self.exchange_id}; invalidating it.")
+                self._balance = None
+                return False
+            # Copy the dicts being changed: the cached snapshot was handed out by fetch_balance()
+            balance = dict(self._balance[0])
+            for key in ('free', 'total'):
+                balance[key] = dict(balance.get(key) or {})
+            for currency, delta in deltas.items():
+                account = balance[currency] = dict(balance.get(currency) or {})
+                for key in ('free', 'total'):
+                    account[key] = (account.get(key) or 0.0) + delta
+                    balance[key][currency] = account[key]
+            self._balance = (balance, self._balance[1])
+            logger.debug(f"Applied order {order.get('id')} to the cached balance: {deltas}")
+            return True
+
+    def _fetch_ticker_or_none(self, symbol):
+        """
+        Fetches one ticker, logging and returning None on failure so one symbol cannot fail a snapshot.
+        """
+        try:
+            return self.request('fetch_ticker', symbol)
+        except Exception as e:
+            logger.warning(f"Skipping {symbol} in ticker snapshot: {e}")
+            return None
+
+    def fetch_tickers_snapshot(self, symbols=None, chunk_size=100, max_workers=8):
+        """
+        Fetches last prices and volumes of many symbols in as few requests as possible.
+
+        Exchanges with a bulk ticker endpoint are asked for all tickers in one request, or for
+        `symbols` in chunks of `chunk_size`. Otherwise tickers are fetched one by one from up
+        to `max_workers` threads (still throttled by the shared rate limiter), and symbols that
+        fail are left out.
+
+        Args:
+            symbols (list, optional): The symbols to include. Defaults to None (every ticker the exchange
+                                      returns, or all active markets without a bulk endpoint).
+            chunk_size (int): Maximum symbols per bulk request. Defaults to 100.
+            max_workers (int): Threads used without a bulk endpoint. Defaults to 8.
+
+        Returns:
+            dict: Columns 'symbol' (object array) and 'bid', 'ask', 'last', 'quoteVolume' (float64 arrays, NaN
+                  where the exchange gave no value), or None if an error occurs.
+        """
+        if not self.exchange:
+            logger.error("Exchange not initialized. Cannot fetch tickers.")
+            return None
+        if symbols is not None:
+            symbols = list(symbols)
+        try:
+            if self.exchange.has.get('fetchTickers'):
+                if symbols is None:
+                    tickers = self.request('fetch_tickers')
+                else:
+                    chunks = [list(symbols[i:i + chunk_size]) for i in range(0, len(symbols), chunk_size)]
+                    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+                        tickers = {}
+                        for chunk_tickers in executor.map(lambda chunk: self.request('fetch_tickers', chunk), chunks):
+                            tickers.update(chunk_tickers)
+            else:
+                if symbols is None:
+                    symbols = self.market_index.select(active=True)
+                logger.info(f"{self.exchange_id} has no bulk ticker endpoint; fetching {len(symbols)} tickers one by one.")
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    tickers = {symbol: ticker for symbol, ticker in zip(symbols, executor.map(self._fetch_ticker_or_none, symbols))
+                               if ticker is not None}
+        except ccxt.NetworkError as e:
+            logger.error(f"Error fetching tickers for {self.exchange_id} (network issue): {e}", exc_info=True)
+            return None
+        except ccxt.ExchangeError as e:
+            logger.error(f"Error fetching tickers for {self.exchange_id} (exchange issue): {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while fetching tickers for {self.exchange_id}: {e}", exc_info=True)
+            return None
+
+        included = list(tickers) if symbols is None else [symbol for symbol in symbols if symbol in tickers]
+        snapshot = {'symbol': np.array(included, dtype=object)}
+        for field in SNAPSHOT_FIELDS:
+            snapshot[field] = np.array([tickers[symbol].get(field) for symbol in included], dtype=np.float64)
+        logger.info(f"Fetched a ticker snapshot of {len(included)} symbols for {self.exchange_id}.")
+        return snapshot
+
+    def subscribe_candles(self, symbol, timeframe, callback, transport=None, since=None):
+        """
+        Calls `callback` once with each closed bar of a symbol as it completes.
+
+        Args:
+            symbol (str): The trading symbol (e.g., 'BTC/USDT').
+            timeframe (str): The timeframe (e.g., '1m').
+            callback (callable): Called from a background thread with each closed bar as
+                                 [timestamp, open, high, low, close, volume].
+            transport (CandleTransport, optional): Source of candle updates, e.g. WebsocketTransport(handler) or a
+                                                   ReplayTransport. Defaults to polling through this handler.
+            since (int, optional): First bar to deliver, in epoch milliseconds. Defaults to None (the bar open now).
+
+        Returns:
+            CandleSubscription: The running subscription; call stop() to end it.
+        """
+        if transport is None:
+            transport = PollingTransport(self)
+        return CandleSubscription(symbol, timeframe, callback, transport, since=since).start()
+
+    @property
+    def market_index(self):
+        """
+        MarketIndex over the loaded markets, rebuilt only when the markets are (re)loaded.
+        """
+        markets = (self.exchange.markets if self.exchange else None) or {}
+        if self._market_index is None or self._market_index.markets is not markets:
+            self._market_index = MarketIndex(markets)
+        return self._market_index
+
     def fetch_futures_trading_pairs(self):
+        """
+        Returns the active futures symbols from the loaded markets, using the market index.
+        """
         if not self.exchange:
             logger.error("Exchange not initialized. Cannot fetch futures trading pairs.")
             return None
         if not self.exchange.markets:
-            logger.error("Markets not loaded for {self.exchange_id}. Call load_markets() first.")
+            logger.error(f"Markets not loaded for {self.exchange_id}. Call load_markets() first.")
             return None
 
-        futures_pairs = []
-        try:
-            logger.info(f"Fetching futures trading pairs for {self.exchange_id}...")
-            for symbol, market in self.exchange.markets.items():
-                if market.get('future') and market.get('active'):
-                    futures_pairs.append(symbol)
-            logger.info(f"Found {len(futures_pairs)} active futures trading pairs for {self.exchange_id}.")
-            logger.debug(f"Futures pairs: {futures_pairs}")
-            return futures_pairs
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching futures trading pairs for {self.exchange_id}: {e}", exc_info=True)
-            return None
+        futures_pairs = self.market_index.select(type='future', active=True)
+        logger.info(f"Found {len(futures_pairs)} active futures trading pairs for {self.exchange_id}.")
+        logger.debug(f"Futures pairs: {futures_pairs}")
+        return futures_pairs
@@ -0,0 +1,95 @@
+import threading
+import logging
+from .exchange_handler import ExchangeHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+
+def create_http_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Creates a requests Session whose keep-alive connection pools hold up to `pool_size` connections per host.
+
+    requests keeps only 10 connections per host by default; with more concurrent workers the
+    extra connections are discarded after each request and need a new TLS handshake.
+    """
+    import requests # ccxt depends on requests; imported here so building a pool stays cheap
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class ExchangeHandlerPool:
+    """
+    Reuses ExchangeHandler instances across calls and threads.
+
+    Handlers are keyed by exchange id, credentials and testnet flag, so each account gets one
+    ccxt exchange with its loaded markets and cached balance. All handlers send their requests
+    through one shared HTTP session, so repeated calls reuse open keep-alive connections
+    instead of paying a TCP and TLS handshake each time.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, **handler_kwargs):
+        """
+        Initializes the ExchangeHandlerPool.
+
+        Args:
+            pool_size (int): Maximum keep-alive connections per host. Set it to at least the number of
+                             threads issuing requests concurrently. Defaults to DEFAULT_POOL_SIZE.
+            **handler_kwargs: Default keyword arguments for new handlers (e.g. rate_limits, markets_cache,
+                              retry_policy, balance_ttl).
+        """
+        self.pool_size = pool_size
+        self.handler_kwargs = handler_kwargs
+        self.session = create_http_session(pool_size)
+        self._handlers = {}
+        self._lock = threading.Lock()
+        logger.debug(f"ExchangeHandlerPool initialized with {pool_size} connections per host.")
+
+    def get(self, exchange_id, api_key, api_secret, is_testnet=False, **handler_kwargs):
+        """
+        Returns the pooled handler for an account, creating it on first use.
+
+        Keyword arguments only take effect when the handler is created.
+
+        Args:
+            exchange_id (str): The ccxt exchange id (e.g., 'binance').
+            api_key (str): The API key.
+            api_secret (str): The API secret.
+            is_testnet (bool): Whether to enable the exchange's sandbox mode. Defaults to False.
+            **handler_kwargs: Overrides of the pool's default handler arguments.
+
+        Returns:
+            ExchangeHandler: The handler. Its `exchange` is None if initialization failed.
+        """
+        key = (exchange_id, api_key, api_secret, bool(is_testnet))
+        with self._lock:
+            handler = self._handlers.get(key)
+            if handler is None:
+                kwargs = {**self.handler_kwargs, **handler_kwargs}
+                handler = ExchangeHandler(exchange_id, api_key, api_secret, is_testnet=is_testnet,
+                                          session=self.session, **kwargs)
+                if handler.exchange:
+                    self._handlers[key] = handler
+                logger.info(f"Created pooled handler for {exchange_id}{' (testnet)' if is_testnet else ''}.")
+            return handler
+
+    def close(self):
+        """
+        Drops all handlers and closes the shared HTTP session.
+        """
+        with self._lock:
+            self._handlers.clear()
+        self.session.close()
+
+    def __len__(self):
+        return len(self._handlers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
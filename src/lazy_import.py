@@ -0,0 +1,38 @@
+import importlib
+import sys
+import threading
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Used for ccxt, whose package import loads every exchange implementation: modules can
+    refer to `ccxt.NetworkError` or `getattr(ccxt, exchange_id)` as usual, and the import
+    cost is only paid by commands that actually talk to an exchange. `except ccxt.X`
+    clauses are evaluated only when an exception reaches them, so they do not trigger it.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        module = self._module if self._module is not None else self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """
+    Returns a LazyModule for `name`, or the module itself if it has already been imported.
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
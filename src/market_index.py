@@ -0,0 +1,91 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Order of the per-market values and of the select() criteria.
+INDEXED_FIELDS = ('type', 'active', 'base', 'quote', 'settle')
+MARKET_TYPES = ('spot', 'swap', 'future', 'option', 'margin')
+
+def market_type(market):
+    """
+    Returns a market's type ('spot', 'swap', 'future', ...), falling back to ccxt's boolean flags.
+    """
+    if market.get('type'):
+        return market['type']
+    return next((flag for flag in MARKET_TYPES if market.get(flag)), None)
+
+class MarketIndex:
+    """
+    Read-only index over a loaded ccxt markets dict.
+
+    Built once per markets load, it keeps the symbols of every type, active flag, base, quote
+    and settle currency value in market order. A query on several fields scans only the
+    smallest matching list the first time, and its result is memoized, so repeated screens
+    such as "all active USDT-margined swaps" cost one dict lookup plus the size of the result.
+    """
+    def __init__(self, markets):
+        """
+        Builds the index.
+
+        Args:
+            markets (dict): Symbol to ccxt market structure, as in `exchange.markets`.
+        """
+        self.markets = markets
+        self._values = {}
+        self._postings = {((), ()): list(markets)}
+        self._precision = {}
+        self._limits = {}
+        for symbol, market in markets.items():
+            values = (market_type(market), bool(market.get('active')), market.get('base'),
+                      market.get('quote'), market.get('settle'))
+            self._values[symbol] = values
+            for position, value in enumerate(values):
+                self._postings.setdefault(((position,), (value,)), []).append(symbol)
+            self._precision[symbol] = market.get('precision') or {}
+            self._limits[symbol] = market.get('limits') or {}
+        logger.debug(f"MarketIndex built for {len(markets)} markets.")
+
+    def select(self, type=None, active=None, base=None, quote=None, settle=None):
+        """
+        Returns the symbols matching all given criteria. Criteria left as None are ignored.
+
+        Args:
+            type (str, optional): Market type, e.g. 'spot', 'swap' or 'future'.
+            active (bool, optional): Whether the market is active.
+            base (str, optional): Base currency code, e.g. 'BTC'.
+            quote (str, optional): Quote currency code, e.g. 'USDT'.
+            settle (str, optional): Settlement currency of derivatives, e.g. 'USDT' for USDT-margined contracts.
+
+        Returns:
+            list: The matching symbols.
+        """
+        criteria = (type, active, base, quote, settle)
+        combo = tuple(position for position, value in enumerate(criteria) if value is not None)
+        wanted = tuple([criteria[position] for position in combo])
+        symbols = self._postings.get((combo, wanted))
+        if symbols is None:
+            if len(combo) < 2:
+                return []
+            candidates = min((self._postings.get(((position,), (criteria[position],)), []) for position in combo), key=len)
+            symbols = [symbol for symbol in candidates
+                       if all(self._values[symbol][position] == criteria[position] for position in combo)]
+            self._postings[(combo, wanted)] = symbols
+        return list(symbols)
+
+    def precision(self, symbol):
+        """
+        Returns the ccxt precision dict ('amount', 'price', ...) of a symbol, or None if it is not listed.
+        """
+        return self._precision.get(symbol)
+
+    def limits(self, symbol):
+        """
+        Returns the ccxt limits dict ('amount', 'cost', ...) of a symbol, or None if it is not listed.
+        """
+        return self._limits.get(symbol)
+
+    def __contains__(self, symbol):
+        return symbol in self.markets
+
+    def __len__(self):
+        return len(self.markets)
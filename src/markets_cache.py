@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKETS_TTL = 86400 # One day; market catalogs change rarely.
+
+class MarketsCache:
+    """
+    On-disk cache of exchange market catalogs, keyed by exchange id and testnet flag.
+
+    Each entry is a JSON file holding the markets and currencies loaded by ccxt, so a new
+    process can populate an exchange with set_markets() instead of downloading the catalog.
+    Entries older than `ttl` seconds are treated as missing.
+    """
+    def __init__(self, cache_dir='cache', ttl=DEFAULT_MARKETS_TTL):
+        """
+        Initializes the MarketsCache.
+
+        Args:
+            cache_dir (str): Directory holding the cache files. Defaults to 'cache'.
+            ttl (float): Maximum age of an entry in seconds. Defaults to DEFAULT_MARKETS_TTL.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        logger.debug(f"MarketsCache initialized at '{cache_dir}' with TTL {ttl}s.")
+
+    def path_for(self, exchange_id, is_testnet=False):
+        """
+        Builds the cache file path `{cache_dir}/markets_{exchange_id}[_testnet].json`.
+        """
+        suffix = '_testnet' if is_testnet else ''
+        return os.path.join(self.cache_dir, f"markets_{exchange_id}{suffix}.json")
+
+    def load(self, exchange_id, is_testnet=False):
+        """
+        Returns the cached catalog if it exists and is younger than the TTL.
+
+        Args:
+            exchange_id (str): The exchange id.
+            is_testnet (bool): Whether the catalog is for the exchange's sandbox.
+
+        Returns:
+            tuple: (markets, currencies) dicts, or None if there is no fresh entry.
+        """
+        filepath = self.path_for(exchange_id, is_testnet)
+        try:
+            with open(filepath, 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable markets cache {filepath}: {e}")
+            return None
+
+        age = time.time() - entry.get('saved_at', 0)
+        if age > self.ttl:
+            logger.info(f"Markets cache for {exchange_id} is {age:.0f}s old (TTL {self.ttl}s), reloading.")
+            return None
+        if not entry.get('markets'):
+            return None
+        return entry['markets'], entry.get('currencies')
+
+    def save(self, exchange_id, markets, currencies=None, is_testnet=False):
+        """
+        Writes a catalog to the cache. The file is replaced atomically, so concurrent readers
+        never see a partial entry.
+
+        Returns:
+            bool: True if the entry was written, False otherwise.
+        """
+        filepath = self.path_for(exchange_id, is_testnet)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.markets_', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'saved_at': time.time(), 'markets': markets, 'currencies': currencies}, f)
+                os.replace(tmp_path, filepath)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (IOError, OSError, TypeError, ValueError) as e:
+            logger.error(f"Error writing markets cache {filepath}: {e}", exc_info=True)
+            return False
+        logger.debug(f"Saved {len(markets)} markets for {exchange_id} to {filepath}.")
+        return True
+
+    def restore(self, exchange, is_testnet=False):
+        """
+        Populates a ccxt exchange from a fresh cache entry without any request.
+
+        Args:
+            exchange (ccxt.Exchange): The exchange instance (sync or async).
+            is_testnet (bool): Whether the exchange runs in sandbox mode.
+
+        Returns:
+            bool: True if the markets were restored, False if there is no usable entry.
+        """
+        cached = self.load(exchange.id, is_testnet)
+        if cached is None:
+            return False
+        markets, currencies = cached
+        try:
+            exchange.set_markets(markets, currencies)
+        except Exception as e:
+            logger.warning(f"Ignoring markets cache for {exchange.id} that could not be applied: {e}")
+            return False
+        logger.info(f"Loaded {len(exchange.markets)} markets for {exchange.id} from cache.")
+        return True
+
+    def store(self, exchange, is_testnet=False):
+        """
+        Saves the markets and currencies currently loaded in a ccxt exchange.
+        """
+        return self.save(exchange.id, exchange.markets, exchange.currencies, is_testnet)
+
+    def invalidate(self, exchange_id, is_testnet=False):
+        """
+        Removes the cached catalog of an exchange, if any.
+        """
+        try:
+            os.remove(self.path_for(exchange_id, is_testnet))
+        except FileNotFoundError:
+            pass
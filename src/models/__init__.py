@@ -1,7 +1,15 @@
 from .signal_generator import SignalGenerator, RandomSignalGenerator, MovingAverageCrossoverSignalGenerator
+from .indicators import StreamingIndicator, SMA, EMA, RSI, MACD, BollingerBands, ATR
 
 __all__ = [
     'SignalGenerator',
     'RandomSignalGenerator',
-    'MovingAverageCrossoverSignalGenerator'
+    'MovingAverageCrossoverSignalGenerator',
+    'StreamingIndicator',
+    'SMA',
+    'EMA',
+    'RSI',
+    'MACD',
+    'BollingerBands',
+    'ATR'
 ]
@@ -0,0 +1,468 @@
+import math
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Batch functions take full price arrays and return arrays of the same length, NaN until an
+# indicator has enough data. Streaming classes take one bar per update() call, in constant
+# time, and return None until then. Both use the same definitions, so a streaming indicator
+# fed a history ends on the batch function's last value:
+#  - SMA: the mean of the last `period` values, NaN (None) while one of them is NaN. Window
+#    sums are compensated (batch) or exact (streaming), so they do not drift on long histories.
+#  - EMA: seeded with the simple mean of the first `period` values, then smoothed with
+#    alpha = 2 / (period + 1).
+#  - RSI and ATR: Wilder's smoothing (alpha = 1 / period), seeded the same way.
+#  - MACD: EMA(fast) - EMA(slow), its signal line an EMA of it, and their difference.
+#  - Bollinger bands: SMA +/- num_std population standard deviations.
+# Inputs are expected to be finite, apart from leading NaNs, which are skipped.
+
+def _add_exact(partials, x):
+    """
+    Adds x to a sum kept exactly as non-overlapping float partials (Shewchuk's algorithm, as
+    used by math.fsum); math.fsum(partials) is then the correctly rounded sum.
+    """
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        high = x + y
+        low = y - (high - x)
+        if low:
+            partials[i] = low
+            i += 1
+        x = high
+    partials[i:] = [x]
+
+def _prefix_sums(close):
+    """
+    Returns prefix sums of `close` along its last axis for window means in O(1) per window.
+
+    Sums are taken over deviations from each series' first finite value, and NaN closes are
+    counted separately (and summed as 0). The rounding error of each addition of the running
+    sum is recovered exactly (Knuth's two-sum) and accumulated separately, so window sums
+    stay accurate to a few ulps however long the history is.
+
+    Returns:
+        tuple: (sums, errors, nan_counts, reference); the first three have one more element than
+               `close` along the last axis, `reference` is the first finite value per series.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    finite = ~np.isnan(close)
+    shape = close.shape[:-1] + (close.shape[-1] + 1,)
+    if not close.shape[-1]:
+        return np.zeros(shape), np.zeros(shape), np.zeros(shape, dtype=np.int64), np.zeros(close.shape[:-1] + (1,))
+    reference = np.take_along_axis(close, finite.argmax(axis=-1)[..., np.newaxis], axis=-1)
+    reference = np.where(np.isnan(reference), 0.0, reference)
+    deviations = np.where(finite, close - reference, 0.0)
+    sums = np.zeros(shape)
+    np.cumsum(deviations, axis=-1, out=sums[..., 1:])
+    # Two-sum of each step sums[k] = sums[k - 1] + deviations[k - 1]
+    previous, current = sums[..., :-1], sums[..., 1:]
+    added = current - previous
+    step_errors = (previous - (current - added)) + (deviations - added)
+    errors = np.zeros(shape)
+    np.cumsum(step_errors, axis=-1, out=errors[..., 1:])
+    nan_counts = np.zeros(shape, dtype=np.int64)
+    np.cumsum(~finite, axis=-1, out=nan_counts[..., 1:])
+    return sums, errors, nan_counts, reference
+
+def _window_means(prefix, window):
+    """
+    Returns the means of the deviations summed by _prefix_sums over `window` values, NaN where
+    the window is incomplete or holds a NaN.
+    """
+    sums, errors, nan_counts, _ = prefix
+    means = np.full(sums.shape[:-1] + (sums.shape[-1] - 1,), np.nan)
+    if window <= means.shape[-1]:
+        tail = ((sums[..., window:] - sums[..., :-window]) + (errors[..., window:] - errors[..., :-window])) / window
+        tail[nan_counts[..., window:] - nan_counts[..., :-window] > 0] = np.nan
+        means[..., window - 1:] = tail
+    return means
+
+def sma(close, period):
+    """
+    Computes the simple moving average of a price array.
+
+    Window sums are differences of compensated prefix sums, so the cost is linear in the
+    length of `close` whatever the period, and the means stay accurate to a few ulps on long
+    histories.
+
+    Args:
+        close (array-like): The prices; a 2-D array holds one series per row.
+        period (int): The SMA period.
+
+    Returns:
+        np.ndarray: The SMA, NaN for the first period - 1 values and where a window holds a NaN.
+    """
+    prefix = _prefix_sums(close)
+    return _window_means(prefix, period) + prefix[3]
+
+def _seeded_ewm(values, period, alpha):
+    """
+    Returns the exponential smoothing of `values`, seeded with the mean of the first `period`
+    non-NaN values and NaN before that.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    smoothed = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    start = valid[0] if len(valid) else len(values)
+    if start + period > len(values):
+        return smoothed
+    seeded = values[start + period - 1:].copy()
+    seeded[0] = values[start:start + period].mean()
+    smoothed[start + period - 1:] = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return smoothed
+
+def ema(close, period):
+    """
+    Computes the exponential moving average of a price array.
+
+    Args:
+        close (array-like): The prices.
+        period (int): The EMA period.
+
+    Returns:
+        np.ndarray: The EMA, NaN for the first period - 1 values.
+    """
+    return _seeded_ewm(close, period, 2.0 / (period + 1))
+
+def rsi(close, period=14):
+    """
+    Computes Wilder's relative strength index (0 to 100) of a price array.
+
+    Args:
+        close (array-like): The prices.
+        period (int): The RSI period. Defaults to 14.
+
+    Returns:
+        np.ndarray: The RSI, NaN for the first `period` values.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    changes = np.diff(close)
+    average_gain = _seeded_ewm(np.clip(changes, 0, None), period, 1.0 / period)
+    average_loss = _seeded_ewm(np.clip(-changes, 0, None), period, 1.0 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+    values = np.where(average_loss == 0, np.where(average_gain == 0, 50.0, 100.0), values)
+    values[np.isnan(average_gain) | np.isnan(average_loss)] = np.nan
+    return np.concatenate([[np.nan] * min(1, len(close)), values])
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    Computes the moving average convergence/divergence of a price array.
+
+    Args:
+        close (array-like): The prices.
+        fast (int): The fast EMA period. Defaults to 12.
+        slow (int): The slow EMA period. Defaults to 26.
+        signal (int): The signal line's EMA period. Defaults to 9.
+
+    Returns:
+        dict: 'macd', 'signal' and 'histogram' arrays.
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {'macd': line, 'signal': signal_line, 'histogram': line - signal_line}
+
+def bollinger_bands(close, period=20, num_std=2.0):
+    """
+    Computes Bollinger bands of a price array.
+
+    Args:
+        close (array-like): The prices.
+        period (int): The moving average period. Defaults to 20.
+        num_std (float): Band width in (population) standard deviations. Defaults to 2.0.
+
+    Returns:
+        dict: 'middle', 'upper' and 'lower' arrays, NaN for the first period - 1 values.
+    """
+    series = pd.Series(np.asarray(close, dtype=np.float64))
+    middle = series.rolling(period).mean().to_numpy()
+    width = num_std * series.rolling(period).std(ddof=0).to_numpy()
+    return {'middle': middle, 'upper': middle + width, 'lower': middle - width}
+
+def true_range(high, low, close):
+    """
+    Returns the true range of each bar; the first bar's is its high - low.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    previous_close = np.asarray(close, dtype=np.float64)[:-1]
+    ranges = high - low
+    ranges[1:] = np.maximum.reduce([ranges[1:], np.abs(high[1:] - previous_close), np.abs(low[1:] - previous_close)])
+    return ranges
+
+def atr(high, low, close, period=14):
+    """
+    Computes Wilder's average true range.
+
+    Args:
+        high (array-like): The bar highs.
+        low (array-like): The bar lows.
+        close (array-like): The bar closes.
+        period (int): The ATR period. Defaults to 14.
+
+    Returns:
+        np.ndarray: The ATR, NaN for the first period - 1 values.
+    """
+    return _seeded_ewm(true_range(high, low, close), period, 1.0 / period)
+
+class StreamingIndicator:
+    """
+    Base class of indicators updated one bar at a time.
+
+    get_state() returns the parameters and internal state as a JSON-serializable dict, and
+    from_state() restores an indicator from it, e.g. to resume after a restart without
+    re-reading history.
+    """
+    _param_fields = ()
+    _state_fields = ()
+
+    def update(self, *args):
+        """
+        Adds one bar and returns the indicator's current value, or None while warming up.
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses.
+        """
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    def _get_state(self):
+        state = {}
+        for name in self._state_fields:
+            value = getattr(self, name)
+            state[name] = value._get_state() if isinstance(value, StreamingIndicator) else \
+                list(value) if isinstance(value, list) else value
+        return state
+
+    def _set_state(self, state):
+        for name in self._state_fields:
+            current = getattr(self, name)
+            if isinstance(current, StreamingIndicator):
+                current._set_state(state[name])
+            else:
+                setattr(self, name, list(state[name]) if isinstance(current, list) else state[name])
+
+    def get_state(self):
+        """
+        Returns the indicator's type, parameters and state as a JSON-serializable dict.
+        """
+        return {
+            'indicator': type(self).__name__,
+            'params': {name: getattr(self, name) for name in self._param_fields},
+            'state': self._get_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Creates an indicator from a dict returned by get_state().
+
+        Raises:
+            ValueError: If the state belongs to another indicator type.
+        """
+        if state.get('indicator') != cls.__name__:
+            raise ValueError(f"State of a {state.get('indicator')} cannot be loaded into a {cls.__name__}")
+        indicator = cls(**state['params'])
+        indicator._set_state(state['state'])
+        return indicator
+
+class _SeededSmoother(StreamingIndicator):
+    """
+    Streaming counterpart of _seeded_ewm(): the mean of the first `period` values, then
+    exponential smoothing. Leading None/NaN values are skipped.
+    """
+    _param_fields = ('period', 'alpha')
+    _state_fields = ('count', 'total', 'value')
+
+    def __init__(self, period, alpha):
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x):
+        if x is None or (self.count == 0 and math.isnan(x)):
+            return self.value
+        if self.value is not None:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        else:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        return self.value
+
+class SMA(StreamingIndicator):
+    """
+    Streaming simple moving average. See sma().
+
+    The window sum is kept exactly, as float partials (see _add_exact), so it never drifts.
+    """
+    _param_fields = ('period',)
+    _state_fields = ('_window', '_count', '_last_nan', '_partials')
+
+    def __init__(self, period):
+        self.period = period
+        self._window = [0.0] * period # Last `period` closes, NaN stored as 0.0
+        self._count = 0
+        self._last_nan = None # Index of the last NaN close
+        self._partials = []
+
+    def update(self, close):
+        close = float(close)
+        if math.isnan(close):
+            self._last_nan = self._count
+            close = 0.0
+        position = self._count % self.period
+        _add_exact(self._partials, close)
+        _add_exact(self._partials, -self._window[position])
+        self._window[position] = close
+        self._count += 1
+        if self._count < self.period or (self._last_nan is not None and self._count - self._last_nan <= self.period):
+            return None
+        return math.fsum(self._partials) / self.period
+
+class EMA(StreamingIndicator):
+    """
+    Streaming exponential moving average. See ema().
+    """
+    _param_fields = ('period',)
+    _state_fields = ('_smoother',)
+
+    def __init__(self, period):
+        self.period = period
+        self._smoother = _SeededSmoother(period, 2.0 / (period + 1))
+
+    def update(self, close):
+        return self._smoother.update(float(close))
+
+    @property
+    def value(self):
+        return self._smoother.value
+
+class RSI(StreamingIndicator):
+    """
+    Streaming Wilder's relative strength index. See rsi().
+    """
+    _param_fields = ('period',)
+    _state_fields = ('_previous', '_gain', '_loss')
+
+    def __init__(self, period=14):
+        self.period = period
+        self._previous = None
+        self._gain = _SeededSmoother(period, 1.0 / period)
+        self._loss = _SeededSmoother(period, 1.0 / period)
+
+    def update(self, close):
+        close = float(close)
+        previous, self._previous = self._previous, close
+        if previous is None:
+            return None
+        change = close - previous
+        gain = self._gain.update(max(change, 0.0))
+        loss = self._loss.update(max(-change, 0.0))
+        if gain is None or loss is None:
+            return None
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+class MACD(StreamingIndicator):
+    """
+    Streaming moving average convergence/divergence. See macd().
+    """
+    _param_fields = ('fast', 'slow', 'signal')
+    _state_fields = ('_fast', '_slow', '_signal')
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+
+    def update(self, close):
+        """
+        Adds a close and returns {'macd', 'signal', 'histogram'} once the slow EMA is ready
+        ('signal' and 'histogram' are None until the signal line is), else None.
+        """
+        fast = self._fast.update(close)
+        slow = self._slow.update(close)
+        if fast is None or slow is None:
+            return None
+        line = fast - slow
+        signal_line = self._signal.update(line)
+        return {'macd': line, 'signal': signal_line,
+                'histogram': None if signal_line is None else line - signal_line}
+
+class BollingerBands(StreamingIndicator):
+    """
+    Streaming Bollinger bands. See bollinger_bands().
+
+    Sums are kept relative to a reference price and recomputed exactly once per pass over the
+    window, so the variance neither drifts nor loses precision to cancellation.
+    """
+    _param_fields = ('period', 'num_std')
+    _state_fields = ('_window', '_count', '_reference', '_sum', '_sum_sq')
+
+    def __init__(self, period=20, num_std=2.0):
+        self.period = period
+        self.num_std = num_std
+        self._window = [0.0] * period # Last `period` closes minus the reference
+        self._count = 0
+        self._reference = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def update(self, close):
+        """
+        Adds a close and returns {'middle', 'upper', 'lower'} once `period` closes were seen, else None.
+        """
+        close = float(close)
+        if self._reference is None:
+            self._reference = close
+        position = self._count % self.period
+        deviation = close - self._reference
+        old = self._window[position]
+        self._window[position] = deviation
+        self._sum += deviation - old
+        self._sum_sq += deviation * deviation - old * old
+        self._count += 1
+        if position == self.period - 1:
+            # Re-base on the current mean and recompute the sums exactly
+            shift = math.fsum(self._window) / self.period
+            self._window = [value - shift for value in self._window]
+            self._reference += shift
+            self._sum = math.fsum(self._window)
+            self._sum_sq = math.fsum(value * value for value in self._window)
+        if self._count < self.period:
+            return None
+        mean = self._sum / self.period
+        width = self.num_std * math.sqrt(max(self._sum_sq / self.period - mean * mean, 0.0))
+        middle = self._reference + mean
+        return {'middle': middle, 'upper': middle + width, 'lower': middle - width}
+
+class ATR(StreamingIndicator):
+    """
+    Streaming Wilder's average true range. See atr().
+    """
+    _param_fields = ('period',)
+    _state_fields = ('_previous_close', '_smoother')
+
+    def __init__(self, period=14):
+        self.period = period
+        self._previous_close = None
+        self._smoother = _SeededSmoother(period, 1.0 / period)
+
+    def update(self, high, low, close):
+        high, low, close = float(high), float(low), float(close)
+        bar_range = high - low
+        if self._previous_close is not None:
+            bar_range = max(bar_range, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+        return self._smoother.update(bar_range)
@@ -1,9 +1,104 @@
 import random
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
 import logging
+from .indicators import SMA, sma
 
 logger = logging.getLogger(__name__)
 
+# Signal labels by code, as used by the vectorized helpers below.
+SIGNAL_LABELS = np.array(["HOLD", "BUY", "SELL"], dtype=object)
+HOLD, BUY, SELL = 0, 1, 2
+
+# Two SMAs closer than this, relative to their size, count as equal (a deterministic tie,
+# which never signals). It is far above the rounding error of every SMA computed below and
+# far below the gap between unequal SMAs of tick-rounded prices, so ties on flat stretches
+# are resolved the same way by all code paths.
+TIE_TOLERANCE = 1e-12
+
+def _sma_gap(short_sma, long_sma):
+    """
+    Returns short_sma - long_sma, or 0.0 if the two are equal within TIE_TOLERANCE.
+    """
+    gap = short_sma - long_sma
+    return 0.0 if abs(gap) <= TIE_TOLERANCE * max(abs(short_sma), abs(long_sma)) else gap
+
+def _crossover_label(gap, previous_gap):
+    """
+    Maps the current and previous SMA gaps (see _sma_gap) to "BUY", "SELL" or "HOLD".
+    """
+    if gap > 0 and previous_gap <= 0:
+        return "BUY"
+    if gap < 0 and previous_gap >= 0:
+        return "SELL"
+    return "HOLD"
+
+def _sma_gaps(short_sma, long_sma):
+    """
+    Returns short_sma - long_sma, NaN where either SMA is undefined and 0.0 where they tie
+    (see _sma_gap). The SMAs may be stacked along leading axes, e.g. one long SMA per row.
+    """
+    gaps = short_sma - long_sma
+    with np.errstate(invalid='ignore'):
+        scale = np.maximum(np.abs(short_sma), np.abs(long_sma))
+        gaps[np.abs(gaps) <= TIE_TOLERANCE * scale] = 0.0
+    return gaps
+
+def _crossover_codes(gaps):
+    """
+    Returns HOLD/BUY/SELL codes (int8) for every position of SMA gaps (see _sma_gaps) along the last axis.
+    """
+    previous = np.full_like(gaps, np.nan)
+    previous[..., 1:] = gaps[..., :-1]
+    with np.errstate(invalid='ignore'):
+        codes = np.where((gaps > 0) & (previous <= 0), BUY, HOLD).astype(np.int8)
+        codes[(gaps < 0) & (previous >= 0)] = SELL
+    return codes
+
+def _timestamps_and_closes(history):
+    """
+    Returns (int64 epoch-ms timestamps, float64 closes) of a DataFrame (default or compact
+    layout) or a mapping of column arrays.
+    """
+    if isinstance(history, pd.DataFrame) and 'timestamp' not in history.columns:
+        timestamps = history.index.to_numpy()
+    else:
+        timestamps = np.asarray(history['timestamp'])
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype('datetime64[ms]')
+    return timestamps.astype(np.int64), np.asarray(history['close'], dtype=np.float64)
+
+def close_matrix(histories):
+    """
+    Aligns the closes of several symbols on their timestamps, for batch signal evaluation.
+
+    Args:
+        histories (Mapping): Symbol to OHLCV DataFrame (default or compact layout) or mapping of column
+                             arrays, e.g. from CandleStore.load_columns().
+
+    Returns:
+        pd.DataFrame: One row per symbol and one column per timestamp (int64 epoch milliseconds, the union
+                      of all series), NaN where a symbol has no bar.
+    """
+    series = {symbol: _timestamps_and_closes(history) for symbol, history in histories.items()}
+    timestamps = np.unique(np.concatenate([ts for ts, _ in series.values()])) if series else np.array([], dtype=np.int64)
+    matrix = np.full((len(series), len(timestamps)), np.nan)
+    for row, (ts, closes) in enumerate(series.values()):
+        matrix[row, np.searchsorted(timestamps, ts)] = closes
+    return pd.DataFrame(matrix, index=pd.Index(list(series), name='symbol'), columns=pd.Index(timestamps, name='timestamp'))
+
+def _as_matrix(close_matrix):
+    """
+    Returns (2-D float64 array, row index, column index) of a symbols x time DataFrame or array.
+    """
+    if isinstance(close_matrix, pd.DataFrame):
+        return close_matrix.to_numpy(dtype=np.float64), close_matrix.index, close_matrix.columns
+    values = np.asarray(close_matrix, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError(f"Expected a symbols x time matrix, got an array of shape {values.shape}")
+    return values, pd.RangeIndex(values.shape[0]), pd.RangeIndex(values.shape[1])
+
 class SignalGenerator:
     """
     Base class for signal generators.
@@ -20,7 +115,9 @@ class SignalGenerator:
         Generates a trading signal based on historical data.
 
         Args:
-            historical_data (pd.DataFrame): A Pandas DataFrame containing historical market data.
+            historical_data (pd.DataFrame or Mapping): A Pandas DataFrame containing historical market data,
+                                            or a mapping of column name to array (e.g. the memory-mapped
+                                            arrays returned by CandleStore.load_arrays).
                                             Typically requires at least a 'close' column.
 
         Returns:
@@ -32,6 +129,77 @@ class SignalGenerator:
         logger.error("generate_signal() called on base SignalGenerator class. Subclasses must implement it.")
         raise NotImplementedError("This method must be implemented by subclasses.")
 
+    def generate_signals(self, historical_data):
+        """
+        Generates the signal of every bar in one vectorized pass.
+
+        Element i is the signal generate_signal() returns for the first i + 1 bars, so a
+        backtest over a history costs one pass instead of one call per bar.
+
+        Args:
+            historical_data (pd.DataFrame or Mapping): As for generate_signal().
+
+        Returns:
+            pd.Series: "BUY", "SELL" or "HOLD" per bar, indexed like the DataFrame (a RangeIndex for mappings).
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses.
+        """
+        logger.error("generate_signals() called on base SignalGenerator class. Subclasses must implement it.")
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    def generate_batch_signals(self, close_matrix, latest_only=False):
+        """
+        Generates signals for many symbols at once from a symbols x time matrix of closes.
+
+        Row i of the result equals generate_signals() on row i's closes, but all symbols are
+        evaluated in one set of array operations.
+
+        Args:
+            close_matrix (pd.DataFrame or np.ndarray): Closes with one row per symbol and one column per
+                                                       timestamp, aligned (see close_matrix()); NaN for missing bars.
+            latest_only (bool): Return only each symbol's signal at the last timestamp, reading just the
+                                columns needed for it. Defaults to False.
+
+        Returns:
+            pd.DataFrame or pd.Series: Signals shaped like the matrix, or per symbol with `latest_only`.
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses.
+        """
+        logger.error("generate_batch_signals() called on base SignalGenerator class. Subclasses must implement it.")
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    @staticmethod
+    def _batch_result(codes, index, columns, latest_only):
+        """
+        Labels a symbols x time array of signal codes as generate_batch_signals() returns it.
+        """
+        if latest_only:
+            latest = codes[:, -1] if codes.shape[1] else np.zeros(codes.shape[0], dtype=np.int8)
+            return pd.Series(SIGNAL_LABELS[latest], index=index, name='signal')
+        return pd.DataFrame(SIGNAL_LABELS[codes], index=index, columns=columns)
+
+    @staticmethod
+    def _close_column(historical_data):
+        """
+        Returns (close as a float64 array, index) of a DataFrame or column mapping, or (None, index)
+        without a 'close' column.
+        """
+        if isinstance(historical_data, pd.DataFrame):
+            index = historical_data.index
+            if 'close' not in historical_data.columns:
+                return None, index
+            return historical_data['close'].to_numpy(dtype=np.float64), index
+        if isinstance(historical_data, Mapping):
+            if 'close' not in historical_data:
+                lengths = [len(column) for column in historical_data.values()]
+                return None, pd.RangeIndex(lengths[0] if lengths else 0)
+            close = np.asarray(historical_data['close'], dtype=np.float64)
+            return close, pd.RangeIndex(len(close))
+        logger.warning("Historical data is neither a Pandas DataFrame nor a mapping of columns.")
+        return None, pd.RangeIndex(0)
+
 class RandomSignalGenerator(SignalGenerator):
     """
     Generates a random trading signal.
@@ -54,6 +222,27 @@ class RandomSignalGenerator(SignalGenerator):
         logger.info(f"RandomSignalGenerator generated signal: {signal}")
         return signal
 
+    def generate_signals(self, historical_data):
+        """
+        Generates a random signal for every bar.
+
+        Args:
+            historical_data (pd.DataFrame or Mapping): Historical market data (only its length is used).
+
+        Returns:
+            pd.Series: Randomly chosen "BUY", "SELL" or "HOLD" per bar.
+        """
+        _, index = self._close_column(historical_data)
+        return pd.Series(random.choices(["BUY", "SELL", "HOLD"], k=len(index)), index=index, name='signal')
+
+    def generate_batch_signals(self, close_matrix, latest_only=False):
+        """
+        Generates a random signal per symbol and bar (or per symbol with `latest_only`).
+        """
+        values, index, columns = _as_matrix(close_matrix)
+        codes = np.array(random.choices([HOLD, BUY, SELL], k=values.size), dtype=np.int8).reshape(values.shape)
+        return self._batch_result(codes, index, columns, latest_only)
+
 class MovingAverageCrossoverSignalGenerator(SignalGenerator):
     """
     Generates trading signals based on a moving average crossover strategy.
@@ -72,6 +261,7 @@ class MovingAverageCrossoverSignalGenerator(SignalGenerator):
             raise ValueError("short_window must be less than long_window")
         self.short_window = short_window
         self.long_window = long_window
+        self.reset()
         logger.debug(f"MovingAverageCrossoverSignalGenerator initialized with short_window={short_window}, long_window={long_window}.")
 
     def generate_signal(self, historical_data):
@@ -79,11 +269,15 @@ class MovingAverageCrossoverSignalGenerator(SignalGenerator):
         Generates a trading signal based on a moving average crossover.
 
         Args:
-            historical_data (pd.DataFrame): A Pandas DataFrame with a 'close' column.
+            historical_data (pd.DataFrame or Mapping): A Pandas DataFrame with a 'close' column, or a
+                mapping with a 'close' array. Arrays (including np.memmap) are only read for the last
+                long_window + 1 values, so memory-mapped histories are never copied in full.
 
         Returns:
             str: "BUY" for a bullish crossover, "SELL" for a bearish crossover, "HOLD" otherwise.
         """
+        if isinstance(historical_data, Mapping):
+            return self._generate_signal_from_arrays(historical_data)
         if not isinstance(historical_data, pd.DataFrame):
             logger.warning("Historical data is not a Pandas DataFrame. Returning HOLD.")
             return "HOLD"
@@ -126,15 +320,171 @@ class MovingAverageCrossoverSignalGenerator(SignalGenerator):
             logger.warning("NaN values encountered in SMAs needed for crossover detection. Returning HOLD.")
             return "HOLD"
 
-        signal = "HOLD"
-        if current_short_sma > current_long_sma and previous_short_sma <= previous_long_sma:
-            signal = "BUY"
-        elif current_short_sma < current_long_sma and previous_short_sma >= previous_long_sma:
-            signal = "SELL"
-        
+        return self._crossover_signal(current_short_sma, previous_short_sma, current_long_sma, previous_long_sma)
+
+    def _crossover_signal(self, current_short_sma, previous_short_sma, current_long_sma, previous_long_sma):
+        """
+        Maps the current and previous SMA values to "BUY", "SELL" or "HOLD"; SMAs within
+        TIE_TOLERANCE of each other count as equal.
+        """
+        signal = _crossover_label(_sma_gap(current_short_sma, current_long_sma),
+                                  _sma_gap(previous_short_sma, previous_long_sma))
         logger.info(f"MA Crossover Signal generated: {signal} (Short SMA: {current_short_sma:.2f}, Long SMA: {current_long_sma:.2f})")
         return signal
 
+    def _generate_signal_from_arrays(self, columns):
+        """
+        Generates the crossover signal from a mapping of column arrays, reading only the tail of 'close'.
+        """
+        if 'close' not in columns:
+            logger.warning("'close' column not in historical_data. Returning HOLD.")
+            return "HOLD"
+        close = columns['close']
+        if len(close) < self.long_window + 1:
+            logger.warning(f"Not enough data for long_window ({self.long_window}). "
+                           f"Data length: {len(close)}. Returning HOLD.")
+            return "HOLD"
+
+        tail = np.asarray(close[-(self.long_window + 1):], dtype=np.float64)
+        if np.isnan(tail).any():
+            logger.warning("NaN values encountered in SMAs needed for crossover detection. Returning HOLD.")
+            return "HOLD"
+
+        current_short_sma = tail[-self.short_window:].mean()
+        previous_short_sma = tail[-self.short_window - 1:-1].mean()
+        current_long_sma = tail[1:].mean()
+        previous_long_sma = tail[:-1].mean()
+        logger.debug(f"Current Short SMA: {current_short_sma}, Previous Short SMA: {previous_short_sma}")
+        logger.debug(f"Current Long SMA: {current_long_sma}, Previous Long SMA: {previous_long_sma}")
+        return self._crossover_signal(current_short_sma, previous_short_sma, current_long_sma, previous_long_sma)
+
+    def generate_signals(self, historical_data):
+        """
+        Generates the crossover signal of every bar in one vectorized pass.
+
+        Both SMAs are computed by sma() from prefix sums instead of rolling windows, so the
+        cost is linear in the history length whatever the window sizes. SMAs equal within
+        TIE_TOLERANCE (common on flat stretches of tick-rounded prices) count as ties, so every
+        bar's signal equals generate_signal() on the data up to it.
+
+        Args:
+            historical_data (pd.DataFrame or Mapping): A Pandas DataFrame with a 'close' column, or a
+                                                       mapping with a 'close' array.
+
+        Returns:
+            pd.Series: "BUY", "SELL" or "HOLD" per bar; all "HOLD" without a 'close' column.
+        """
+        close, index = self._close_column(historical_data)
+        if close is None:
+            logger.warning("'close' column not in historical_data. Returning HOLD for every bar.")
+            return pd.Series(SIGNAL_LABELS[np.zeros(len(index), dtype=np.int8)], index=index, name='signal')
+        codes = self._signal_codes(close)
+        logger.debug(f"MA Crossover signals for {len(codes)} bars: {np.count_nonzero(codes == BUY)} BUY, "
+                     f"{np.count_nonzero(codes == SELL)} SELL.")
+        return pd.Series(SIGNAL_LABELS[codes], index=index, name='signal')
+
+    def generate_batch_signals(self, close_matrix, latest_only=False):
+        """
+        Generates crossover signals for all symbols of a symbols x time close matrix at once.
+
+        With `latest_only`, only the last long_window + 1 columns are used, so scoring a whole
+        universe on each bar close costs a few array operations on a small matrix.
+
+        Args:
+            close_matrix (pd.DataFrame or np.ndarray): Closes with one row per symbol and one column per
+                                                       timestamp (see close_matrix()).
+            latest_only (bool): Return only each symbol's signal at the last timestamp. Defaults to False.
+
+        Returns:
+            pd.DataFrame or pd.Series: Signals shaped like the matrix, or per symbol with `latest_only`.
+        """
+        values, index, columns = _as_matrix(close_matrix)
+        if latest_only:
+            values = values[:, -(self.long_window + 1):]
+        codes = self._signal_codes(values)
+        logger.debug(f"MA Crossover batch signals for {values.shape[0]} symbols x {values.shape[1]} bars.")
+        return self._batch_result(codes, index, columns, latest_only)
+
+    @classmethod
+    def generate_grid_signals(cls, historical_data, short_windows, long_windows):
+        """
+        Generates the signals of every (short_window, long_window) pair of a parameter grid.
+
+        Each distinct window's SMA is computed once with sma(), in time linear in the history
+        length, and each short SMA is compared with all longer SMAs in one array operation.
+        A 100 x 100 sweep thus costs about 200 SMAs and 100 crossover passes, instead of one generator and two rolling means per pair. Ties are resolved as
+        in generate_signals(). Pairs with short_window >= long_window are skipped.
+
+        Args:
+            historical_data (pd.DataFrame or Mapping): A Pandas DataFrame with a 'close' column, or a
+                                                       mapping with a 'close' array.
+            short_windows (iterable): Short window sizes to try.
+            long_windows (iterable): Long window sizes to try.
+
+        Returns:
+            pd.DataFrame: One int8 column of signal codes (HOLD, BUY, SELL; SIGNAL_LABELS[codes] gives the
+                          labels) per (short_window, long_window) pair, indexed like the data. Column
+                          (s, l) equals MovingAverageCrossoverSignalGenerator(s, l).generate_signals().
+                          None without a 'close' column.
+        """
+        close, index = cls._close_column(historical_data)
+        if close is None:
+            logger.warning("'close' column not in historical_data. Cannot evaluate the parameter grid.")
+            return None
+        long_windows = sorted(set(long_windows))
+        long_smas = np.array([sma(close, window) for window in long_windows]).reshape(len(long_windows), len(close))
+        pairs = []
+        blocks = []
+        for short_window in sorted(set(short_windows)):
+            longer = [row for row, window in enumerate(long_windows) if window > short_window]
+            if not longer:
+                continue
+            blocks.append(_crossover_codes(_sma_gaps(sma(close, short_window), long_smas[longer])))
+            pairs.extend((short_window, long_windows[row]) for row in longer)
+        codes = np.concatenate(blocks) if blocks else np.empty((0, len(close)), dtype=np.int8)
+        logger.info(f"Evaluated {len(pairs)} MA crossover parameter pairs over {len(close)} bars.")
+        return pd.DataFrame(codes.T, index=index,
+                            columns=pd.MultiIndex.from_tuples(pairs, names=['short_window', 'long_window']))
+
+    def _signal_codes(self, close):
+        """
+        Returns the crossover signal codes of every bar of `close` (1-D, or one series per row).
+        """
+        return _crossover_codes(_sma_gaps(sma(close, self.short_window), sma(close, self.long_window)))
+
+    def reset(self):
+        """
+        Clears the state of update(), e.g. before feeding another symbol's closes.
+        """
+        self._short_sma = SMA(self.short_window)
+        self._long_sma = SMA(self.long_window)
+        self._previous_gap = None # SMA gap (see _sma_gap) after the previous close
+
+    def update(self, close):
+        """
+        Adds the close of a new bar and returns the crossover signal at that bar, in constant time.
+
+        Both SMAs are streaming SMA indicators, so feeding every bar of a history gives the
+        same signals as generate_signal() on each prefix of it, without re-reading the history.
+
+        Args:
+            close (float): The new bar's close price.
+
+        Returns:
+            str: "BUY", "SELL" or "HOLD". HOLD until long_window + 1 closes were seen, and while
+                 a NaN close is among the last long_window + 1.
+        """
+        short_sma = self._short_sma.update(close)
+        long_sma = self._long_sma.update(close)
+        gap = None if short_sma is None or long_sma is None else _sma_gap(short_sma, long_sma)
+        previous_gap, self._previous_gap = self._previous_gap, gap
+        if gap is None or previous_gap is None:
+            return "HOLD"
+        signal = _crossover_label(gap, previous_gap)
+        if signal != "HOLD":
+            logger.debug(f"MA Crossover update: {signal} (Short SMA: {short_sma:.2f}, Long SMA: {long_sma:.2f})")
+        return signal
+
 if __name__ == '__main__':
     # Setup basic logging for __main__ execution
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -162,19 +512,16 @@ if __name__ == '__main__':
     signal_insufficient = mavg_gen_3_6.generate_signal(sample_df.head(5))
     logger.info(f"Signal (insufficient data): {signal_insufficient}") 
 
-    logger.info("\nTest with sufficient data (iterating):")
-    for i in range(mavg_gen_3_6.long_window, len(sample_df) + 1):
-        current_data = sample_df.iloc[:i]
-        signal = mavg_gen_3_6.generate_signal(current_data)
-        
-        sma_short_val_str = f"{current_data['close'].rolling(window=mavg_gen_3_6.short_window).mean().iloc[-1]:.2f}"
-        sma_long_val_str = f"{current_data['close'].rolling(window=mavg_gen_3_6.long_window).mean().iloc[-1]:.2f}"
-        
-        logger.info(f"Data up to {current_data['timestamp'].iloc[-1].date()}: "
-                    f"Close={current_data['close'].iloc[-1]:.2f}, "
-                    f"ShortSMA({mavg_gen_3_6.short_window})={sma_short_val_str}, "
-                    f"LongSMA({mavg_gen_3_6.long_window})={sma_long_val_str}, "
-                    f"Signal: {signal}")
+    logger.info("\nTest with sufficient data (every bar in one pass):")
+    signals = mavg_gen_3_6.generate_signals(sample_df)
+    sma_short = sample_df['close'].rolling(window=mavg_gen_3_6.short_window).mean()
+    sma_long = sample_df['close'].rolling(window=mavg_gen_3_6.long_window).mean()
+    for i in range(mavg_gen_3_6.long_window - 1, len(sample_df)):
+        logger.info(f"Data up to {sample_df['timestamp'].iloc[i].date()}: "
+                    f"Close={sample_df['close'].iloc[i]:.2f}, "
+                    f"ShortSMA({mavg_gen_3_6.short_window})={sma_short.iloc[i]:.2f}, "
+                    f"LongSMA({mavg_gen_3_6.long_window})={sma_long.iloc[i]:.2f}, "
+                    f"Signal: {signals.iloc[i]}")
     
     logger.info("\nTest with specific crossover data (Bullish):")
     bullish_data_dict = {
@@ -0,0 +1,177 @@
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate` tokens per second.
+
+    Reservations may take the bucket below zero; the caller then waits until the debt has
+    been refilled. Requests are therefore served in the order they reserved, and sustained
+    throughput converges on exactly `rate` without ever exceeding `capacity` in a burst.
+    """
+    def __init__(self, rate, capacity=None):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second. Must be positive.
+            capacity (float, optional): Maximum tokens stored for bursts. Defaults to `rate` (one second's worth).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else float(rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(self, rate, capacity=None):
+        """
+        Changes the rate and capacity (as for __init__), keeping the tokens reserved so far.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = float(capacity) if capacity else float(rate)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens=1.0):
+        """
+        Takes `tokens` from the bucket and returns how many seconds the caller must wait before using them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens=1.0):
+        """
+        Blocks until `tokens` are available. Returns the number of seconds waited.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class RateLimitScheduler:
+    """
+    Process-wide rate-limit scheduler with one bucket per exchange and optional per-endpoint buckets.
+
+    Every request reserves its weight from the exchange bucket and, when one is configured,
+    from the bucket of its endpoint (the ccxt method name, e.g. 'fetch_ohlcv'). Because all
+    ExchangeHandler instances share get_rate_limiter(), several handlers or threads using the
+    same exchange cannot exceed its limit together.
+    """
+    def __init__(self):
+        self._exchange_buckets = {}
+        self._endpoint_buckets = {}
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def configure_exchange(self, exchange_id, rate, capacity=None):
+        """
+        Sets the overall limit for an exchange in weight units per second.
+        """
+        with self._lock:
+            self._exchange_buckets[exchange_id] = TokenBucket(rate, capacity)
+        logger.debug(f"Rate limit for {exchange_id} set to {rate}/s (burst {capacity or rate}).")
+
+    def configure_endpoint(self, exchange_id, endpoint, weight=None, rate=None, capacity=None):
+        """
+        Sets the weight charged against the exchange bucket for an endpoint and, optionally, a separate endpoint limit.
+
+        Args:
+            exchange_id (str): The exchange id.
+            endpoint (str): The ccxt method name (e.g., 'fetch_balance').
+            weight (float, optional): Weight charged per call. When never configured, ExchangeHandler charges
+                                      ccxt's cost of each HTTP request the call makes instead.
+            rate (float, optional): Separate limit for this endpoint in weight units per second.
+            capacity (float, optional): Burst capacity of the endpoint bucket.
+        """
+        with self._lock:
+            if weight is not None:
+                self._weights[(exchange_id, endpoint)] = float(weight)
+            if rate is not None:
+                self._endpoint_buckets[(exchange_id, endpoint)] = TokenBucket(rate, capacity)
+
+    def is_configured(self, exchange_id):
+        """
+        Returns True if an overall limit has been set for the exchange.
+        """
+        return exchange_id in self._exchange_buckets
+
+    def register_exchange(self, exchange_id, rate_limit_ms=None, overrides=None):
+        """
+        Registers an exchange each time a handler for it is created.
+
+        The first registration creates the exchange bucket, from the override rate or else from
+        ccxt's `rateLimit` (milliseconds between requests). Later registrations keep the bucket,
+        and the requests already reserved from it, unless they override the rate or burst with
+        different values.
+
+        Args:
+            exchange_id (str): The exchange id.
+            rate_limit_ms (float, optional): ccxt's `rateLimit` for the exchange.
+            overrides (dict, optional): 'rate' (weight units per second), 'burst' and 'weights' ({endpoint: weight}).
+        """
+        overrides = overrides or {}
+        rate = overrides.get('rate')
+        burst = overrides.get('burst')
+        with self._lock:
+            bucket = self._exchange_buckets.get(exchange_id)
+        if bucket is None:
+            if not rate and rate_limit_ms:
+                rate = 1000.0 / rate_limit_ms
+            if rate:
+                self.configure_exchange(exchange_id, rate, burst)
+        elif (rate and float(rate) != bucket.rate) or (burst and float(burst) != bucket.capacity):
+            bucket.configure(rate or bucket.rate, burst or (None if rate else bucket.capacity))
+            logger.debug(f"Rate limit for {exchange_id} changed to {bucket.rate}/s (burst {bucket.capacity}).")
+        for endpoint, weight in (overrides.get('weights') or {}).items():
+            self.configure_endpoint(exchange_id, endpoint, weight=weight)
+
+    def weight_for(self, exchange_id, endpoint, default=1.0):
+        """
+        Returns the configured weight of an endpoint, or `default` if none was configured.
+        """
+        return self._weights.get((exchange_id, endpoint), default)
+
+    def reserve(self, exchange_id, endpoint, weight=None):
+        """
+        Reserves capacity for one call and returns the number of seconds to wait before making it.
+
+        Exchanges without a configured limit are not throttled.
+        """
+        if weight is None:
+            weight = self.weight_for(exchange_id, endpoint)
+        with self._lock:
+            buckets = [self._exchange_buckets.get(exchange_id), self._endpoint_buckets.get((exchange_id, endpoint))]
+        return max([bucket.reserve(weight) for bucket in buckets if bucket is not None], default=0.0)
+
+    def acquire(self, exchange_id, endpoint, weight=None):
+        """
+        Blocks until one call to `endpoint` may be made. Returns the number of seconds waited.
+        """
+        wait = self.reserve(exchange_id, endpoint, weight)
+        if wait > 0:
+            logger.debug(f"Throttling {exchange_id}.{endpoint} for {wait:.3f}s.")
+            time.sleep(wait)
+        return wait
+
+_rate_limiter = RateLimitScheduler()
+
+def get_rate_limiter():
+    """
+    Returns the process-wide RateLimitScheduler.
+    """
+    return _rate_limiter
@@ -0,0 +1,180 @@
+import bisect
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets; a last bucket catches slower requests.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _new_site():
+    return {
+        'calls': 0, 'errors': 0, 'errors_by_type': {}, 'http_requests': 0, 'bytes_received': 0,
+        'total_latency': 0.0, 'max_latency': 0.0, 'total_wait': 0.0, 'histogram': [0] * (len(LATENCY_BUCKETS) + 1),
+        'logical_calls': 0, 'retries': 0, 'failures': 0, 'total_call_latency': 0.0, 'max_call_latency': 0.0,
+    }
+
+def _merge(target, site):
+    for field in ('calls', 'errors', 'http_requests', 'bytes_received', 'total_latency', 'total_wait',
+                  'logical_calls', 'retries', 'failures', 'total_call_latency'):
+        target[field] += site[field]
+    for field in ('max_latency', 'max_call_latency'):
+        target[field] = max(target[field], site[field])
+    for name, count in site['errors_by_type'].items():
+        target['errors_by_type'][name] = target['errors_by_type'].get(name, 0) + count
+    target['histogram'] = [a + b for a, b in zip(target['histogram'], site['histogram'])]
+
+def latency_quantile(histogram, q):
+    """
+    Estimates a latency quantile from histogram counts: the upper bound of the bucket holding it.
+
+    Returns:
+        float: Seconds; inf if it falls in the overflow bucket, None if the histogram is empty.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), histogram):
+        seen += count
+        if seen >= rank:
+            return bound
+    return float('inf')
+
+class RequestStats:
+    """
+    Thread-safe accounting of exchange requests per exchange id and endpoint.
+
+    Every attempt made by ExchangeHandler.request() is counted as a call, with its latency
+    (excluding the rate-limit wait, which is added up separately), the ccxt exception class if it
+    failed, and the number of HTTP requests and response bytes it caused. Each logical call,
+    from the first attempt to the final result, is recorded too; RetryStats reads its retry
+    counters from here, so attempts and errors are only counted once.
+    """
+    def __init__(self):
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def _site(self, exchange_id, endpoint):
+        site = self._sites.get((exchange_id, endpoint))
+        if site is None:
+            site = self._sites[(exchange_id, endpoint)] = _new_site()
+        return site
+
+    def record(self, exchange_id, endpoint, latency, error=None, wait=0.0):
+        """
+        Records one attempt that took `latency` seconds and raised `error` (None if it succeeded),
+        after waiting `wait` seconds for the rate limiter.
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            site = self._site(exchange_id, endpoint)
+            site['calls'] += 1
+            site['total_latency'] += latency
+            site['total_wait'] += wait
+            site['max_latency'] = max(site['max_latency'], latency)
+            site['histogram'][bucket] += 1
+            if error is not None:
+                name = type(error).__name__
+                site['errors'] += 1
+                site['errors_by_type'][name] = site['errors_by_type'].get(name, 0) + 1
+
+    def record_call(self, exchange_id, endpoint, attempts, latency, succeeded):
+        """
+        Records one logical call that took `attempts` attempts and `latency` seconds, including
+        rate-limit waits and backoff.
+        """
+        with self._lock:
+            site = self._site(exchange_id, endpoint)
+            site['logical_calls'] += 1
+            site['retries'] += attempts - 1
+            site['failures'] += 0 if succeeded else 1
+            site['total_call_latency'] += latency
+            site['max_call_latency'] = max(site['max_call_latency'], latency)
+
+    def record_response(self, exchange_id, endpoint, nbytes):
+        """
+        Records one HTTP response of `nbytes` bytes received for an endpoint.
+        """
+        with self._lock:
+            site = self._site(exchange_id, endpoint)
+            site['http_requests'] += 1
+            site['bytes_received'] += nbytes
+
+    @staticmethod
+    def _summarize(site):
+        site['mean_latency'] = site['total_latency'] / site['calls'] if site['calls'] else None
+        site['p50_latency'] = latency_quantile(site['histogram'], 0.5)
+        site['p95_latency'] = latency_quantile(site['histogram'], 0.95)
+        return site
+
+    def get(self, exchange_id, endpoint=None):
+        """
+        Returns the counters of one endpoint, or of all endpoints of an exchange combined.
+
+        Counters: 'calls', 'errors', 'errors_by_type' ({exception class name: count}), 'http_requests',
+        'bytes_received', 'total_latency', 'max_latency', 'mean_latency', 'p50_latency' and 'p95_latency'
+        (histogram bucket bounds, in seconds), 'histogram' (counts per LATENCY_BUCKETS bucket plus overflow),
+        'total_wait' (rate-limit waits of the attempts), and per logical call 'logical_calls', 'retries',
+        'failures', 'total_call_latency' and 'max_call_latency'.
+
+        Returns:
+            dict: A copy of the counters, or None if nothing was recorded.
+        """
+        with self._lock:
+            if endpoint is not None:
+                site = self._sites.get((exchange_id, endpoint))
+                if site is None:
+                    return None
+                site = dict(site, errors_by_type=dict(site['errors_by_type']), histogram=list(site['histogram']))
+            else:
+                sites = [site for (site_exchange, _), site in self._sites.items() if site_exchange == exchange_id]
+                if not sites:
+                    return None
+                site = _new_site()
+                for other in sites:
+                    _merge(site, other)
+        return self._summarize(site)
+
+    def snapshot(self):
+        """
+        Returns a copy of all counters as {(exchange_id, endpoint): counters}.
+        """
+        with self._lock:
+            keys = list(self._sites)
+        return {key: self.get(*key) for key in keys}
+
+    def top(self, n=10, by='total_latency'):
+        """
+        Returns the `n` (exchange_id, endpoint, counters) entries with the largest `by` counter,
+        e.g. 'total_latency', 'calls', 'errors' or 'bytes_received'.
+        """
+        entries = [(exchange_id, endpoint, site) for (exchange_id, endpoint), site in self.snapshot().items()]
+        entries.sort(key=lambda entry: entry[2][by], reverse=True)
+        return entries[:n]
+
+    def format_table(self, n=20):
+        """
+        Returns the top `n` endpoints by total latency as a text table for logs and the CLI.
+        """
+        lines = [f"{'exchange':<12} {'endpoint':<28} {'calls':>7} {'errors':>6} {'mean ms':>9} {'p95 ms':>8} "
+                 f"{'total s':>9} {'wait s':>8} {'KiB recv':>10}"]
+        for exchange_id, endpoint, site in self.top(n):
+            p95 = site['p95_latency']
+            lines.append(f"{exchange_id:<12} {endpoint:<28} {site['calls']:>7} {site['errors']:>6} "
+                         f"{(site['mean_latency'] or 0.0) * 1000:>9.1f} {p95 * 1000 if p95 is not None else float('nan'):>8.0f} "
+                         f"{site['total_latency']:>9.2f} {site['total_wait']:>8.2f} {site['bytes_received'] / 1024:>10.1f}")
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._sites.clear()
+
+_request_stats = RequestStats()
+
+def get_request_stats():
+    """
+    Returns the process-wide RequestStats shared by ExchangeHandler instances by default.
+    """
+    return _request_stats
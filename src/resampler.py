@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+import logging
+from .candle_store import OHLCV_COLUMNS
+from .lazy_import import lazy_import
+
+ccxt = lazy_import('ccxt') # For ccxt.Exchange.parse_timeframe, loaded on first use
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86_400_000
+# Exchanges start weekly candles on Monday; 1970-01-01 (epoch 0) was a Thursday.
+WEEK_OFFSET_MS = 4 * DAY_MS
+
+def timeframe_to_ms(timeframe):
+    """
+    Converts a fixed-length ccxt timeframe (e.g. '1m', '4h', '1w') to milliseconds.
+
+    Raises:
+        ValueError: For calendar timeframes such as '1M', whose length varies.
+    """
+    if timeframe.endswith('M') or timeframe.endswith('y'):
+        raise ValueError(f"Timeframe '{timeframe}' has no fixed length and cannot be resampled to.")
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+def bucket_starts(timestamps, target_ms):
+    """
+    Returns the open time of the target-timeframe bar each timestamp (epoch ms) belongs to.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    offset = WEEK_OFFSET_MS if target_ms % (7 * DAY_MS) == 0 else 0
+    return (timestamps - offset) // target_ms * target_ms + offset
+
+def _as_columns(candles):
+    """
+    Normalizes a DataFrame (default or compact layout), a mapping of column arrays or a list of
+    raw candles to a dict of numpy arrays with int64 epoch-millisecond timestamps.
+    """
+    if isinstance(candles, (list, tuple)):
+        values = np.asarray(candles, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        columns = {column: values[:, position] for position, column in enumerate(OHLCV_COLUMNS)}
+        columns['timestamp'] = np.asarray([candle[0] for candle in candles], dtype=np.int64)
+        return columns
+    if isinstance(candles, pd.DataFrame) and 'timestamp' not in candles.columns:
+        columns = {column: candles[column].to_numpy() for column in OHLCV_COLUMNS[1:]}
+        columns['timestamp'] = candles.index.to_numpy(dtype=np.int64)
+        return columns
+    columns = {column: np.asarray(candles[column]) for column in OHLCV_COLUMNS}
+    if np.issubdtype(columns['timestamp'].dtype, np.datetime64):
+        columns['timestamp'] = columns['timestamp'].astype('datetime64[ms]').astype(np.int64)
+    else:
+        columns['timestamp'] = columns['timestamp'].astype(np.int64)
+    return columns
+
+def resample_columns(candles, target_ms):
+    """
+    Aggregates base candles into target-timeframe bars in one vectorized pass.
+
+    Bars take the first open, max high, min low, last close and summed volume of the base
+    candles in their interval. The last bar may be incomplete.
+
+    Args:
+        candles (pd.DataFrame, Mapping or list): Base candles sorted by time.
+        target_ms (int): The target timeframe in milliseconds.
+
+    Returns:
+        dict: Column name to numpy array, timestamps as int64 epoch milliseconds.
+    """
+    columns = _as_columns(candles)
+    if len(columns['timestamp']) == 0:
+        return {column: values[:0] for column, values in columns.items()}
+
+    buckets = bucket_starts(columns['timestamp'], target_ms)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    return {
+        'timestamp': buckets[starts],
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends],
+        'volume': np.add.reduceat(columns['volume'], starts),
+    }
+
+def _to_rows(bars):
+    """
+    Converts resampled column arrays to [timestamp, open, high, low, close, volume] lists.
+    """
+    rows = np.column_stack([bars[column].astype(np.float64) for column in OHLCV_COLUMNS]).tolist()
+    for row, timestamp in zip(rows, bars['timestamp'].tolist()):
+        row[0] = timestamp
+    return rows
+
+def resample_ohlcv(candles, target_timeframe):
+    """
+    Builds higher-timeframe OHLCV bars from lower-timeframe candles without any network calls.
+
+    Args:
+        candles (pd.DataFrame, Mapping or list): Base candles (e.g. 1m) sorted by time.
+        target_timeframe (str): The timeframe to build (e.g. '1h', '4h', '1d').
+
+    Returns:
+        pd.DataFrame: Bars in the fetch_historical_ohlcv layout (datetime 'timestamp' column).
+    """
+    bars = resample_columns(candles, timeframe_to_ms(target_timeframe))
+    df = pd.DataFrame(bars, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+class IncrementalResampler:
+    """
+    Maintains higher-timeframe bars as new base candles arrive.
+
+    Completed bars are kept as they are; only the trailing, still-open bar is recomputed when
+    new base candles fall into it.
+    """
+    def __init__(self, target_timeframe):
+        """
+        Initializes the IncrementalResampler.
+
+        Args:
+            target_timeframe (str): The timeframe to build (e.g. '1h').
+        """
+        self.target_timeframe = target_timeframe
+        self.target_ms = timeframe_to_ms(target_timeframe)
+        self.closed_bars = []
+        self.current_bar = None
+        logger.debug(f"IncrementalResampler initialized for {target_timeframe}.")
+
+    def update(self, candles):
+        """
+        Folds new base candles (newer than any seen before) into the bars.
+
+        Args:
+            candles (pd.DataFrame, Mapping or list): New base candles sorted by time.
+
+        Returns:
+            list: The bars closed by this update, as [timestamp, open, high, low, close, volume] lists.
+        """
+        rows = _to_rows(resample_columns(candles, self.target_ms))
+        if not rows:
+            return []
+
+        newly_closed = []
+        current = self.current_bar
+        first = rows[0]
+        if current is not None and current[0] == first[0]:
+            rows[0] = [current[0], current[1], max(current[2], first[2]), min(current[3], first[3]),
+                       first[4], current[5] + first[5]]
+        elif current is not None:
+            newly_closed.append(current)
+        newly_closed.extend(rows[:-1])
+        self.current_bar = rows[-1]
+        self.closed_bars.extend(newly_closed)
+        return newly_closed
+
+    def to_frame(self, include_current=True):
+        """
+        Returns all bars as a DataFrame in the fetch_historical_ohlcv layout.
+        """
+        rows = self.closed_bars + ([self.current_bar] if include_current and self.current_bar else [])
+        df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        return df
+
+def resample_store(store, exchange_id, symbol, base_timeframe, target_timeframe, target_store=None):
+    """
+    Derives a higher-timeframe series in a CandleStore from a stored base series.
+
+    Only base candles after the last stored target bar are resampled, and only bars whose
+    interval is fully covered by the base series are appended, so repeated calls are
+    incremental. A leading bar whose interval starts before the base series does (e.g. 1m
+    data starting at 10:17 for a 10:00 1h bar) is skipped rather than stored partial. For 'npy' stores only those base candles are read from disk; other formats
+    are parsed in full on each call (see CandleStore.load_columns).
+
+    Args:
+        store (CandleStore): The store holding the base series.
+        exchange_id (str): The exchange id.
+        symbol (str): The trading symbol.
+        base_timeframe (str): The stored timeframe (e.g. '1m').
+        target_timeframe (str): The timeframe to build (e.g. '1h').
+        target_store (CandleStore, optional): Where to write the bars. Defaults to `store`.
+
+    Returns:
+        int: The number of bars appended, or None if an error occurs.
+    """
+    target_store = target_store or store
+    try:
+        base_ms = timeframe_to_ms(base_timeframe)
+        target_ms = timeframe_to_ms(target_timeframe)
+    except ValueError as e:
+        logger.error(f"Cannot resample {symbol} from {base_timeframe} to {target_timeframe}: {e}")
+        return None
+    if target_ms <= base_ms or target_ms % base_ms:
+        logger.error(f"Cannot resample {symbol}: {target_timeframe} is not a multiple of {base_timeframe}.")
+        return None
+
+    last_bar = target_store.last_timestamp(exchange_id, symbol, target_timeframe)
+    since = None if last_bar is None else last_bar + target_ms
+    columns = store.load_columns(exchange_id, symbol, base_timeframe, since=since)
+    if columns is None:
+        return None
+    if len(columns['timestamp']) == 0:
+        return 0
+
+    bars = resample_columns(columns, target_ms)
+    # A bar is complete once the base series reaches the last candle of its interval, and
+    # the base series covers its start.
+    complete = bars['timestamp'] + target_ms <= columns['timestamp'][-1] + base_ms
+    if columns['timestamp'][0] != bars['timestamp'][0]:
+        complete[0] = False
+    rows = _to_rows({column: values[complete] for column, values in bars.items()})
+    appended = target_store.append(exchange_id, symbol, target_timeframe, rows)
+    if appended is not None:
+        logger.info(f"Resampled {symbol} {base_timeframe} into {appended} new {target_timeframe} bars.")
+    return appended
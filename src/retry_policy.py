@@ -0,0 +1,125 @@
+import random
+import logging
+from .lazy_import import lazy_import
+from .request_stats import RequestStats
+
+ccxt = lazy_import('ccxt') # For the ccxt exception classes, loaded on first use
+
+logger = logging.getLogger(__name__)
+
+# ccxt methods that change account state. A timeout on one of these says nothing about
+# whether the exchange acted on it, so they are only retried on errors that prove it did not.
+NON_IDEMPOTENT_PREFIXES = ('create_', 'edit_', 'withdraw', 'transfer')
+
+def is_idempotent(endpoint):
+    """
+    Returns True if a ccxt method can safely be repeated (reads, and cancels by order id).
+    """
+    return not endpoint.startswith(NON_IDEMPOTENT_PREFIXES)
+
+class RetryStats:
+    """
+    Retry counters and latencies per call site (exchange id and endpoint).
+
+    Latency is measured per logical call, from the first attempt to the final result,
+    including rate-limit waits and backoff. The counters are kept by a RequestStats, so a
+    handler's per-attempt and retry accounting share one source.
+    """
+    def __init__(self, request_stats=None):
+        """
+        Args:
+            request_stats (RequestStats, optional): Where the logical calls are recorded. Defaults to a new one.
+        """
+        self.request_stats = request_stats or RequestStats()
+
+    def record(self, exchange_id, endpoint, attempts, latency, succeeded):
+        """
+        Records one logical call that took `attempts` attempts and `latency` seconds.
+        """
+        self.request_stats.record_call(exchange_id, endpoint, attempts, latency, succeeded)
+
+    def get(self, exchange_id, endpoint):
+        """
+        Returns a copy of the counters of one call site, with 'mean_latency' added, or None if it was never called.
+        """
+        site = self.request_stats.get(exchange_id, endpoint)
+        if site is None or not site['logical_calls']:
+            return None
+        return {
+            'calls': site['logical_calls'], 'retries': site['retries'], 'failures': site['failures'],
+            'total_latency': site['total_call_latency'], 'max_latency': site['max_call_latency'],
+            'mean_latency': site['total_call_latency'] / site['logical_calls'],
+        }
+
+    def snapshot(self):
+        """
+        Returns a copy of all counters as {(exchange_id, endpoint): counters}.
+        """
+        sites = {key: self.get(*key) for key in self.request_stats.snapshot()}
+        return {key: site for key, site in sites.items() if site is not None}
+
+    def reset(self):
+        """
+        Clears the underlying RequestStats.
+        """
+        self.request_stats.reset()
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed exchange call is retried.
+
+    Delays grow exponentially from `base_delay` up to `max_delay`. With jitter, each delay is
+    drawn uniformly between zero and that cap ("full jitter"), so clients that failed together
+    do not retry in lockstep. No retry is scheduled if it would end after the `deadline`
+    budget of the whole call.
+
+    Only transient errors are retried: network errors for idempotent calls, and for calls
+    that change state (orders) only errors showing the request was rejected before it was
+    processed, such as rate limiting.
+    """
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0, deadline=30.0, jitter=True):
+        """
+        Initializes the RetryPolicy.
+
+        Args:
+            max_attempts (int): Maximum attempts per call, including the first. 1 disables retries. Defaults to 3.
+            base_delay (float): Delay before the first retry, in seconds. Defaults to 0.5.
+            max_delay (float): Upper bound of any single delay, in seconds. Defaults to 10.0.
+            deadline (float): Time budget of a call across all attempts, in seconds. None for no limit. Defaults to 30.0.
+            jitter (bool): Whether to randomize delays. Defaults to True.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = int(max_attempts)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.deadline = deadline
+        self.jitter = jitter
+
+    def backoff(self, attempt):
+        """
+        Returns the delay in seconds before retry number `attempt` (1 for the first retry).
+        """
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, cap) if self.jitter else cap
+
+    def is_retryable(self, error, idempotent=True):
+        """
+        Returns True if `error` is transient and retrying the call cannot duplicate its effect.
+        """
+        if isinstance(error, (ccxt.RateLimitExceeded, ccxt.DDoSProtection, ccxt.InvalidNonce, ccxt.OnMaintenance)):
+            return True # The exchange rejected the request before processing it
+        return idempotent and isinstance(error, ccxt.NetworkError)
+
+    def next_delay(self, error, attempt, elapsed, idempotent=True):
+        """
+        Returns how long to wait before retrying a call whose attempt number `attempt` failed
+        with `error` after `elapsed` seconds, or None if the call should not be retried.
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error, idempotent):
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and elapsed + delay >= self.deadline:
+            logger.debug(f"Not retrying after {elapsed:.2f}s: the {self.deadline}s deadline would be exceeded.")
+            return None
+        return delay
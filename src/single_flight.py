@@ -0,0 +1,85 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def freeze(value):
+    """
+    Returns a hashable equivalent of nested call arguments (lists, tuples, dicts and sets).
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    While a call for a key is running, other threads calling do() with the same key wait for
+    it and receive its result (or exception) instead of starting their own call. Once it has
+    finished, the next call for the key runs again: nothing is cached.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0 # Calls answered by another thread's in-flight call
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs), or waits for the in-flight call with the same key.
+
+        Args:
+            key (hashable): Identifies equivalent calls.
+            fn (callable): The call to run.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            fn's return value, shared with all threads that waited for it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"Shared one call among {call.waiters + 1} callers for {key}.")
+
+    def in_flight(self):
+        """
+        Returns the number of calls currently running.
+        """
+        with self._lock:
+            return len(self._calls)
@@ -1,5 +1,7 @@
-import ccxt # For catching ccxt specific exceptions
 import logging
+from .lazy_import import lazy_import
+
+ccxt = lazy_import('ccxt') # For catching ccxt specific exceptions, loaded on first use
 # from .exchange_handler import ExchangeHandler # For type hinting if desired
 
 logger = logging.getLogger(__name__)
@@ -39,12 +41,12 @@ class TradingEngine:
                 logger.info(f"Attempting to place MARKET BUY order for {quantity} of {symbol}.")
                 # Example: self.config.get('trade_params', {}) could hold extra params for create_order
                 # params = self.config.get('buy_params', {}) 
-                order_result = self.exchange_handler.exchange.create_market_buy_order(symbol, quantity)
+                order_result = self.exchange_handler.request('create_market_buy_order', symbol, quantity)
                 logger.info(f"BUY order for {symbol} successful. Result: {order_result}")
             elif signal == "SELL":
                 logger.info(f"Attempting to place MARKET SELL order for {quantity} of {symbol}.")
                 # params = self.config.get('sell_params', {})
-                order_result = self.exchange_handler.exchange.create_market_sell_order(symbol, quantity)
+                order_result = self.exchange_handler.request('create_market_sell_order', symbol, quantity)
                 logger.info(f"SELL order for {symbol} successful. Result: {order_result}")
             elif signal == "HOLD":
                 logger.info(f"Signal is HOLD for {symbol}. No action taken.")
@@ -54,22 +56,31 @@ class TradingEngine:
                 return None
             
             logger.debug(f"Full order result for {symbol} ({signal}): {order_result}")
+            # Keep the cached balance in step with the fill, or drop it if the fill cannot be applied
+            self.exchange_handler.apply_fill_to_balance(order_result)
             return order_result
 
         except ccxt.InsufficientFunds as e:
             logger.error(f"Insufficient funds for {signal} order on {symbol}. Details: {e}", exc_info=True)
+            self.exchange_handler.invalidate_balance()
             return None
         except ccxt.NetworkError as e:
+            # The order may still have been executed, so the cached balance can no longer be trusted
             logger.error(f"Network error during {signal} order on {symbol}. Details: {e}", exc_info=True)
+            self.exchange_handler.invalidate_balance()
             return None
         except ccxt.ExchangeError as e: 
             logger.error(f"Exchange error during {signal} order on {symbol}. Details: {e}", exc_info=True)
+            self.exchange_handler.invalidate_balance()
             return None
         except Exception as e: 
             logger.error(f"An unexpected error occurred during {signal} order on {symbol}. Details: {e}", exc_info=True)
+            self.exchange_handler.invalidate_balance()
             return None
 
 if __name__ == '__main__':
+    # Run from the project root as `python -m src.trading_engine`: the module uses package-relative imports,
+    # so `python src/trading_engine.py` cannot import it.
     # Setup basic logging for __main__ execution
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                         handlers=[logging.StreamHandler()])
@@ -118,6 +129,15 @@ if __name__ == '__main__':
             logger.info("[MockExchangeHandler] Markets loaded (simulated).")
             return True
 
+        def request(self, endpoint, *args, **kwargs):
+            return getattr(self.exchange, endpoint)(*args, **kwargs)
+
+        def apply_fill_to_balance(self, order):
+            return False
+
+        def invalidate_balance(self):
+            pass
+
     mock_handler = MockExchangeHandler(exchange_id='mock_binance')
     engine_config = {'trade_params': {'test': True}} 
     trading_engine = TradingEngine(exchange_handler=mock_handler, config=engine_config)
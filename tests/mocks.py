@@ -27,9 +27,19 @@ class MockExchangeHandler:
         # or if methods relying on markets being loaded are called.
         # For simplicity, we can assume it's called or methods call it.
 
-    def fetch_balance(self):
+    def request(self, endpoint, *args, weight=None, idempotent=None, **kwargs):
+        # Same call path as ExchangeHandler.request, without throttling
+        return getattr(self.exchange, endpoint)(*args, **kwargs)
+
+    def fetch_balance(self, max_age=None):
         return self.exchange.fetch_balance()
 
+    def invalidate_balance(self):
+        pass
+
+    def apply_fill_to_balance(self, order):
+        return False
+
     def load_markets(self): # Add this method
         return self.exchange.load_markets()
 
@@ -39,3 +49,31 @@ class MockExchangeHandler:
             market['symbol'] for market in self.exchange.markets.values()
             if market.get('future') and market.get('active')
         ]
+
+class MockAsyncCCXTExchange(MockCCXTExchange):
+    """Coroutine-returning variant of MockCCXTExchange, mirroring ccxt.async_support."""
+    def __init__(self, exchange_id='mock_exchange', api_key=None, secret=None):
+        super().__init__(exchange_id, api_key, secret)
+        self.closed = False
+
+    async def fetch_balance(self):
+        return MockCCXTExchange.fetch_balance(self)
+
+    async def load_markets(self):
+        return MockCCXTExchange.load_markets(self)
+
+    async def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=1):
+        return MockCCXTExchange.fetch_ohlcv(self, symbol, timeframe, since, limit)
+
+    async def close(self):
+        self.closed = True
+
+class MockAsyncExchangeHandler:
+    def __init__(self, exchange_id='mock_exchange', api_key='mock_key', api_secret='mock_secret', is_testnet=False):
+        self.exchange = MockAsyncCCXTExchange(exchange_id, api_key, api_secret)
+
+    async def request(self, endpoint, *args, weight=None, idempotent=None, **kwargs):
+        return await getattr(self.exchange, endpoint)(*args, **kwargs)
+
+    async def load_markets(self):
+        return await self.exchange.load_markets()
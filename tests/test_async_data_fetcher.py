@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+import pandas as pd
+import ccxt
+from src.async_data_fetcher import AsyncDataFetcher
+from src.async_exchange_handler import AsyncExchangeHandler
+from tests.mocks import MockAsyncExchangeHandler
+
+@pytest.fixture
+def async_fetcher():
+    return AsyncDataFetcher(exchange_handler=MockAsyncExchangeHandler())
+
+def test_async_fetch_historical_ohlcv(async_fetcher, tmp_path):
+    df = asyncio.run(async_fetcher.fetch_historical_ohlcv("BTC/USDT", timeframe='1h', limit=1, output_dir=str(tmp_path)))
+
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+    assert (tmp_path / "mock_exchange_BTC_USDT_1h.csv").exists()
+
+def test_async_fetch_historical_ohlcv_network_error(async_fetcher, caplog):
+    async def failing_fetch_ohlcv(*args, **kwargs):
+        raise ccxt.NetworkError("Simulated API error")
+    async_fetcher.exchange_handler.exchange.fetch_ohlcv = failing_fetch_ohlcv
+
+    assert asyncio.run(async_fetcher.fetch_historical_ohlcv("BTC/USDT", output_dir=None)) is None
+    assert "Network error fetching OHLCV for BTC/USDT" in caplog.text
+
+def test_async_fetch_many(async_fetcher):
+    async def collect():
+        return [result async for result in async_fetcher.fetch_many(["BTC/USDT", "ETH/USDT"], ['1h', '4h'],
+                                                                   max_concurrency=2)]
+    results = asyncio.run(collect())
+    assert sorted((s, tf) for s, tf, _ in results) == [("BTC/USDT", "1h"), ("BTC/USDT", "4h"),
+                                                       ("ETH/USDT", "1h"), ("ETH/USDT", "4h")]
+    assert all(len(df) == 1 for _, _, df in results)
+
+def test_async_exchange_handler_unknown_exchange(caplog):
+    handler = AsyncExchangeHandler("not_an_exchange", "key", "secret")
+    assert handler.exchange is None
+    assert asyncio.run(handler.load_markets()) is False
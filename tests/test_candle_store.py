@@ -0,0 +1,135 @@
+import pytest
+import numpy as np
+import pandas as pd
+import os
+from src.candle_store import (CandleStore, OHLCVWriter, expand_compact_frame, find_gaps, load_ohlcv, make_safe_filename,
+                              ohlcv_to_frame, save_ohlcv)
+
+HOUR_MS = 3_600_000
+START = 1672531200000 # 2023-01-01 00:00:00 UTC
+
+def make_candles(start, count):
+    return [[start + i * HOUR_MS, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 5.0] for i in range(count)]
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+def test_make_safe_filename():
+    assert make_safe_filename("ETH/USDT:USDT") == "ETH_USDT_USDT"
+
+def test_path_matches_fetcher_naming(store, tmp_path):
+    assert store.path_for("binance", "BTC/USDT", "1h") == os.path.join(str(tmp_path), "binance_BTC_USDT_1h.csv")
+
+def test_last_timestamp_missing_series(store):
+    assert store.last_timestamp("binance", "BTC/USDT", "1h") is None
+
+def test_append_and_last_timestamp(store):
+    assert store.append("binance", "BTC/USDT", "1h", make_candles(START, 5)) == 5
+    assert store.last_timestamp("binance", "BTC/USDT", "1h") == START + 4 * HOUR_MS
+
+    # A fresh store instance has to recover the last timestamp from the file itself
+    reopened = CandleStore(store.base_dir)
+    assert reopened.last_timestamp("binance", "BTC/USDT", "1h") == START + 4 * HOUR_MS
+
+def test_append_skips_already_stored_candles(store):
+    store.append("binance", "BTC/USDT", "1h", make_candles(START, 5))
+    assert store.append("binance", "BTC/USDT", "1h", make_candles(START + 3 * HOUR_MS, 4)) == 2
+
+    df = store.load("binance", "BTC/USDT", "1h")
+    assert len(df) == 7
+    assert df['timestamp'].is_unique
+    assert df['timestamp'].is_monotonic_increasing
+
+def test_load_tail(store):
+    store.append("binance", "BTC/USDT", "1h", make_candles(START, 50))
+    df = store.load("binance", "BTC/USDT", "1h", tail=3)
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert len(df) == 3
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+    assert df['close'].tolist() == [147.5, 148.5, 149.5]
+
+def test_load_missing_series_is_empty(store):
+    df = store.load("binance", "NOPE/USDT", "1h")
+    assert df is not None and df.empty
+
+def make_frame(start, count):
+    df = pd.DataFrame(make_candles(start, count), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+@pytest.mark.parametrize("fmt", ["csv", "npy", "parquet", "feather"])
+def test_save_and_load_roundtrip(tmp_path, fmt):
+    if fmt in ("parquet", "feather"):
+        pytest.importorskip("pyarrow")
+    df = make_frame(START, 10)
+    path = str(tmp_path / f"series.{fmt}")
+
+    save_ohlcv(df, path, fmt)
+    loaded = load_ohlcv(path, fmt)
+
+    assert list(loaded.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert (loaded['timestamp'] == df['timestamp']).all()
+    assert loaded['close'].tolist() == df['close'].tolist()
+
+def test_writer_streams_chunks_to_npy_columns(tmp_path):
+    path = str(tmp_path / "series")
+    with OHLCVWriter(path, 'npy') as writer:
+        writer.write(make_frame(START, 4))
+        writer.write(make_frame(START + 4 * HOUR_MS, 3))
+
+    timestamps = np.load(os.path.join(path, "timestamp.npy"))
+    assert timestamps.dtype == np.int64
+    assert timestamps.tolist() == [START + i * HOUR_MS for i in range(7)]
+    assert np.load(os.path.join(path, "close.npy")).dtype == np.float64
+
+def test_writer_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        OHLCVWriter(str(tmp_path / "x"), 'xlsx')
+
+def test_npy_store_appends_in_place_and_memory_maps(tmp_path):
+    store = CandleStore(str(tmp_path), fmt='npy')
+    assert store.append("binance", "BTC/USDT", "1h", make_candles(START, 5)) == 5
+    assert store.append("binance", "BTC/USDT", "1h", make_candles(START + 3 * HOUR_MS, 6)) == 4
+    assert CandleStore(str(tmp_path), fmt='npy').last_timestamp("binance", "BTC/USDT", "1h") == START + 8 * HOUR_MS
+
+    arrays = store.load_arrays("binance", "BTC/USDT", "1h")
+    assert isinstance(arrays['close'], np.memmap)
+    assert arrays['timestamp'].tolist() == [START + i * HOUR_MS for i in range(9)]
+    assert arrays['close'][-1] == 105.5
+
+    df = store.load("binance", "BTC/USDT", "1h", tail=2)
+    assert df['close'].tolist() == [104.5, 105.5]
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+
+def test_load_arrays_requires_npy_store(store):
+    assert store.load_arrays("binance", "BTC/USDT", "1h") is None
+
+def test_find_gaps():
+    timestamps = [0, 1, 2, 5, 6, 9]
+    assert find_gaps(timestamps, 1) == [(3, 5), (7, 9)]
+    assert find_gaps([0, 1, 2], 1) == []
+    assert find_gaps([], 1) == []
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_insert_fills_gaps_and_store_finds_them(tmp_path, fmt):
+    store = CandleStore(str(tmp_path), fmt=fmt)
+    candles = make_candles(START, 10)
+    store.append("binance", "BTC/USDT", "1h", candles[:3] + candles[6:])
+    assert store.find_gaps("binance", "BTC/USDT", "1h", HOUR_MS) == [(START + 3 * HOUR_MS, START + 6 * HOUR_MS)]
+
+    assert store.insert("binance", "BTC/USDT", "1h", candles[2:6]) == 3
+    assert store.find_gaps("binance", "BTC/USDT", "1h", HOUR_MS) == []
+    df = store.load("binance", "BTC/USDT", "1h")
+    assert df['close'].tolist() == [c[4] for c in candles]
+    assert store.last_timestamp("binance", "BTC/USDT", "1h") == START + 9 * HOUR_MS
+
+def test_ohlcv_to_frame_compact_roundtrip():
+    candles = make_candles(START, 4)
+    compact = ohlcv_to_frame(candles, compact=True)
+    assert compact.index.tolist() == [START + i * HOUR_MS for i in range(4)]
+    assert compact['close'].dtype == np.float32
+    assert compact.memory_usage(index=True).sum() < ohlcv_to_frame(candles).memory_usage(index=True).sum()
+
+    expanded = expand_compact_frame(compact)
+    pd.testing.assert_frame_equal(expanded, make_frame(START, 4), check_dtype=False)
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import socketserver
+import threading
+import time
+import ccxt
+import pandas as pd
+from src.candle_store import save_ohlcv
+from src.candle_stream import (CandleSubscription, PollingTransport, ReplayTransport, SocketReplayTransport,
+                               WebsocketTransport)
+
+MINUTE = 60_000
+
+def bar(index, close=1.0):
+    return [index * MINUTE, close, close, close, close, 1.0]
+
+def run_replay(candles, since=None):
+    delivered = []
+    subscription = CandleSubscription('BTC/USDT', '1m', delivered.append, ReplayTransport(candles), since=since)
+    subscription.start().join(5)
+    assert not subscription.running
+    return delivered
+
+def test_replay_delivers_each_closed_bar_once():
+    # Revisions of the open bar and a repeated, older bar
+    candles = [bar(0, 1.0), bar(0, 2.0), bar(1, 3.0), bar(0, 9.0), bar(1, 4.0), bar(2, 5.0)]
+    delivered = run_replay(candles)
+    assert delivered == [bar(0, 2.0), bar(1, 4.0), bar(2, 5.0)]
+
+def test_replay_since_skips_earlier_bars():
+    delivered = run_replay([bar(i) for i in range(5)], since=3 * MINUTE)
+    assert [candle[0] for candle in delivered] == [3 * MINUTE, 4 * MINUTE]
+
+def test_replay_from_file(tmp_path):
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime([i * MINUTE for i in range(3)], unit='ms'),
+        'open': [1.0, 2.0, 3.0], 'high': [1.5, 2.5, 3.5], 'low': [0.5, 1.5, 2.5],
+        'close': [1.2, 2.2, 3.2], 'volume': [10.0, 20.0, 30.0],
+    })
+    filepath = tmp_path / 'candles.csv'
+    save_ohlcv(df, str(filepath), 'csv')
+    delivered = run_replay(ReplayTransport.from_file(str(filepath)).candles)
+    assert delivered == [[i * MINUTE, o, h, l, c, v] for i, (o, h, l, c, v) in
+                         enumerate(df[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False))]
+
+def test_callback_errors_do_not_stop_the_subscription():
+    delivered = []
+
+    def callback(candle):
+        delivered.append(candle)
+        raise RuntimeError('boom')
+
+    CandleSubscription('BTC/USDT', '1m', callback, ReplayTransport([bar(i) for i in range(3)])).start().join(5)
+    assert len(delivered) == 3
+
+class PagedHandler:
+    """Serves fetch_ohlcv pages (or raises exceptions) in order, then empty pages."""
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+        self.limits = []
+
+    def request(self, endpoint, symbol, timeframe, since, limit):
+        self.calls.append(since)
+        self.limits.append(limit)
+        page = self.pages.pop(0) if self.pages else []
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+def test_polling_transport_resumes_from_the_last_bar():
+    start = int(time.time() * 1000) // MINUTE - 3
+    # Overlapping pages; the last one ends with the bar open now
+    handler = PagedHandler([
+        [bar(start), bar(start + 1)],
+        [bar(start + 1), bar(start + 2), bar(start + 3)],
+    ])
+    delivered = []
+    transport = PollingTransport(handler, page_limit=2, settle_delay=30.0, min_interval=0.01)
+    subscription = CandleSubscription('BTC/USDT', '1m', delivered.append, transport, since=start * MINUTE)
+    subscription.start()
+    deadline = time.time() + 5
+    while len(handler.calls) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    subscription.stop(5)
+
+    assert handler.calls[:3] == [start * MINUTE, (start + 1) * MINUTE, (start + 3) * MINUTE]
+    # The open bar is not delivered before its interval has passed
+    assert delivered == [bar(start), bar(start + 1), bar(start + 2)]
+    assert not subscription.running
+
+def test_polling_transport_stops_on_non_network_errors():
+    handler = PagedHandler([ccxt.RequestTimeout('slow'), ccxt.BadSymbol('no such market')])
+    transport = PollingTransport(handler, settle_delay=30.0, min_interval=0.01)
+    subscription = CandleSubscription('XXX/USDT', '1m', lambda candle: None, transport, since=0).start()
+    subscription.join(5)
+    # Polled again after the network error, then gave up
+    assert len(handler.calls) == 2
+    assert not subscription.running
+
+def test_socket_replay_transport():
+    candles = [bar(0, 1.0), bar(0, 2.0), bar(1, 3.0)]
+
+    class FeedHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for candle in candles:
+                self.wfile.write((json.dumps(candle) + '\n').encode())
+
+    with socketserver.TCPServer(('127.0.0.1', 0), FeedHandler) as server:
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        delivered = []
+        transport = SocketReplayTransport(*server.server_address, timeout=0.1)
+        CandleSubscription('BTC/USDT', '1m', delivered.append, transport).start().join(5)
+    assert delivered == [bar(0, 2.0), bar(1, 3.0)]
+
+class QuietExchange:
+    """ccxt.pro stand-in that streams the given updates, then nothing."""
+    updates = []
+
+    def __init__(self, config):
+        self.updates = list(self.updates)
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        if self.updates:
+            return self.updates.pop(0)
+        await asyncio.sleep(3600)
+
+    async def close(self):
+        pass
+
+def run_websocket(monkeypatch, handler, updates, since=None, wait_for=1):
+    import ccxt.pro
+    monkeypatch.setattr(ccxt.pro, 'quiet', type('Quiet', (QuietExchange,), {'updates': updates}), raising=False)
+    handler.exchange_id, handler.api_key, handler.api_secret, handler.is_testnet = 'quiet', None, None, False
+    delivered = []
+    transport = WebsocketTransport(handler, poll_timeout=0.05, close_delay=0.0, page_limit=2)
+    subscription = CandleSubscription('BTC/USDT', '1m', delivered.append, transport, since=since).start()
+    deadline = time.time() + 5
+    while len(delivered) < wait_for and time.time() < deadline:
+        time.sleep(0.01)
+    subscription.stop(5)
+    return delivered
+
+def test_websocket_transport_closes_bars_on_a_quiet_stream(monkeypatch):
+    update = [int(time.time() * 1000) - MINUTE + 200, 1.0, 1.0, 1.0, 1.0, 1.0]
+    delivered = run_websocket(monkeypatch, PagedHandler([]), [[update]])
+    # Delivered once the bar's interval passed, without a newer bar arriving
+    assert delivered == [update]
+
+def test_websocket_transport_catches_up_through_the_handler(monkeypatch):
+    handler = PagedHandler([[bar(0), bar(1)], [bar(1), bar(2)], [bar(2)]])
+    delivered = run_websocket(monkeypatch, handler, [], since=0, wait_for=3)
+    assert handler.calls == [0, MINUTE, 2 * MINUTE]
+    assert handler.limits == [2, 2, 2]
+    assert delivered == [bar(0), bar(1), bar(2)]
@@ -117,3 +117,66 @@ LOG_LEVEL = WARNING
     assert config is not None
     assert config['LOG_LEVEL'] == 'WARNING'
     assert config['LOG_FILE'] == 'logs/app.log' # Default value
+
+def test_load_config_rate_limit_section(tmp_path):
+    p = tmp_path / "rate_limit_config.ini"
+    p.write_text("""
+[EXCHANGE]
+API_KEY = TEST_KEY
+API_SECRET = TEST_SECRET
+DEFAULT_EXCHANGE_ID = test_exchange
+USE_TESTNET = True
+
+[RATE_LIMIT]
+RATE = 20
+BURST =
+ENDPOINT_WEIGHTS = fetch_balance:10, fetch_ohlcv:2
+""")
+    config = load_config(str(p))
+    assert config['rate_limits'] == {'rate': 20.0, 'weights': {'fetch_balance': 10.0, 'fetch_ohlcv': 2.0}}
+
+def test_load_config_invalid_rate_limit(tmp_path, caplog):
+    p = tmp_path / "bad_rate_limit_config.ini"
+    p.write_text("""
+[EXCHANGE]
+API_KEY = TEST_KEY
+API_SECRET = TEST_SECRET
+DEFAULT_EXCHANGE_ID = test_exchange
+USE_TESTNET = True
+
+[RATE_LIMIT]
+RATE = fast
+""")
+    assert load_config(str(p)) is None
+    assert "Invalid value in [RATE_LIMIT] section" in caplog.text
+
+def test_load_config_markets_cache_section(tmp_path, temp_config_file):
+    assert load_config(temp_config_file)['markets_cache'] == {'dir': 'cache', 'ttl': 86400.0}
+
+    p = tmp_path / "markets_cache_config.ini"
+    p.write_text("""
+[EXCHANGE]
+API_KEY = TEST_KEY
+API_SECRET = TEST_SECRET
+DEFAULT_EXCHANGE_ID = test_exchange
+USE_TESTNET = True
+
+[MARKETS_CACHE]
+DIR = /tmp/markets
+TTL = 0
+""")
+    assert load_config(str(p))['markets_cache'] == {'dir': '/tmp/markets', 'ttl': 0.0}
+
+def test_load_config_balance_ttl(tmp_path, temp_config_file):
+    assert load_config(temp_config_file)['balance_ttl'] == 5.0
+
+    p = tmp_path / "balance_ttl_config.ini"
+    p.write_text("""
+[EXCHANGE]
+API_KEY = TEST_KEY
+API_SECRET = TEST_SECRET
+DEFAULT_EXCHANGE_ID = test_exchange
+USE_TESTNET = True
+BALANCE_TTL = 0
+""")
+    assert load_config(str(p))['balance_ttl'] == 0.0
@@ -2,7 +2,9 @@ import pytest
 import pandas as pd
 import os
 import ccxt # For ccxt.NetworkError
-from src.data_fetcher import DataFetcher
+from src.data_fetcher import DataFetcher, plan_gap_requests
+from src.exchange_handler import ExchangeHandler
+from src.rate_limiter import get_rate_limiter
 from tests.mocks import MockExchangeHandler # Import the mock
 import logging # Add this import
 
@@ -111,3 +113,167 @@ def test_fetch_ohlcv_output_dir_none(data_fetcher, tmp_path, caplog):
     
     assert not os.path.exists(file_path_in_tmp), f"File was unexpectedly created in tmp_path: {file_path_in_tmp}"
     assert not os.path.exists(current_dir_file_path), f"File was unexpectedly created in current dir: {current_dir_file_path}"
+
+def make_paged_fetch_ohlcv(start_ms, count, interval_ms=3_600_000, page_cap=3):
+    """Builds a fetch_ohlcv replacement serving `count` hourly candles, at most `page_cap` per call."""
+    candles = [[start_ms + i * interval_ms, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0 + i] for i in range(count)]
+    calls = []
+
+    def fetch_ohlcv(symbol, timeframe='1h', since=None, limit=None):
+        calls.append(since)
+        page = [c for c in candles if since is None or c[0] >= since]
+        return page[:min(limit or page_cap, page_cap)]
+
+    return fetch_ohlcv, calls
+
+def test_iter_ohlcv_pages_walks_since_forward(data_fetcher, mock_exchange_handler):
+    start = 1672531200000
+    mock_exchange_handler.exchange.fetch_ohlcv, calls = make_paged_fetch_ohlcv(start, 8)
+
+    pages = list(data_fetcher.iter_ohlcv_pages("BTC/USDT", timeframe='1h', since=start, page_limit=1000))
+
+    assert [len(p) for p in pages] == [3, 3, 2]
+    assert calls[:3] == [start, start + 3 * 3_600_000, start + 6 * 3_600_000]
+    timestamps = [c[0] for p in pages for c in p]
+    assert timestamps == [start + i * 3_600_000 for i in range(8)]
+
+def test_iter_ohlcv_pages_respects_until(data_fetcher, mock_exchange_handler):
+    start = 1672531200000
+    mock_exchange_handler.exchange.fetch_ohlcv, calls = make_paged_fetch_ohlcv(start, 20)
+
+    until = start + 5 * 3_600_000
+    pages = list(data_fetcher.iter_ohlcv_pages("BTC/USDT", timeframe='1h', since=start, until=until))
+
+    timestamps = [c[0] for p in pages for c in p]
+    assert timestamps == [start + i * 3_600_000 for i in range(5)]
+    assert len(calls) == 2 # No request is made past the end of the range
+
+def test_backfill_ohlcv_streams_to_csv(data_fetcher, mock_exchange_handler, tmp_path):
+    start = 1672531200000
+    mock_exchange_handler.exchange.fetch_ohlcv, _ = make_paged_fetch_ohlcv(start, 10)
+
+    written = data_fetcher.backfill_ohlcv("BTC/USDT", timeframe='1h', since=start, output_dir=str(tmp_path))
+
+    assert written == 10
+    df_read = pd.read_csv(tmp_path / "mock_exchange_BTC_USDT_1h.csv", parse_dates=['timestamp'])
+    assert list(df_read.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert len(df_read) == 10
+    assert df_read['timestamp'].is_monotonic_increasing
+    assert df_read['timestamp'].iloc[0] == pd.Timestamp(start, unit='ms')
+
+def test_backfill_ohlcv_requires_since(data_fetcher, tmp_path, caplog):
+    assert data_fetcher.backfill_ohlcv("BTC/USDT", output_dir=str(tmp_path)) is None
+    assert "backfill_ohlcv requires a 'since' timestamp." in caplog.text
+
+def test_update_ohlcv_appends_only_new_candles(data_fetcher, mock_exchange_handler, tmp_path):
+    from src.candle_store import CandleStore
+    start = 1672531200000
+    mock_exchange_handler.exchange.fetch_ohlcv, calls = make_paged_fetch_ohlcv(start, 10)
+    store = CandleStore(str(tmp_path))
+    store.append("mock_exchange", "BTC/USDT", "1h", [[start + i * 3_600_000, 1, 1, 1, 1, 1] for i in range(6)])
+
+    appended = data_fetcher.update_ohlcv(store, "BTC/USDT", timeframe='1h')
+
+    assert appended == 4
+    assert calls[0] == start + 6 * 3_600_000 # Fetching resumes right after the last stored candle
+    assert len(store.load("mock_exchange", "BTC/USDT", "1h")) == 10
+    assert data_fetcher.update_ohlcv(store, "BTC/USDT", timeframe='1h') == 0
+
+def test_fetch_historical_ohlcv_npy_format(data_fetcher, tmp_path):
+    from src.candle_store import load_ohlcv
+    df = data_fetcher.fetch_historical_ohlcv(symbol="BTC/USDT", timeframe='1h', limit=1,
+                                             output_dir=str(tmp_path), fmt='npy')
+
+    path = tmp_path / "mock_exchange_BTC_USDT_1h"
+    assert (path / "close.npy").exists()
+    loaded = load_ohlcv(str(path), 'npy')
+    assert loaded['open'].tolist() == df['open'].tolist()
+    assert loaded['timestamp'].iloc[0] == df['timestamp'].iloc[0]
+
+def test_fetch_historical_ohlcv_unknown_format(data_fetcher, tmp_path, caplog):
+    assert data_fetcher.fetch_historical_ohlcv(symbol="BTC/USDT", output_dir=str(tmp_path), fmt='xlsx') is None
+    assert "Unsupported output format 'xlsx'" in caplog.text
+
+def test_fetch_many_returns_every_pair(data_fetcher, tmp_path):
+    symbols = ["BTC/USDT", "ETH/USDT:USDT", "ADA/USDT:USDT"]
+    results = list(data_fetcher.fetch_many(symbols, timeframes=['1h', '1d'], limit=1,
+                                           output_dir=str(tmp_path), max_workers=4))
+
+    assert sorted((s, tf) for s, tf, _ in results) == sorted((s, tf) for s in symbols for tf in ['1h', '1d'])
+    assert all(isinstance(df, pd.DataFrame) and len(df) == 1 for _, _, df in results)
+    assert (tmp_path / "mock_exchange_ETH_USDT_USDT_1d.csv").exists()
+
+def test_fetch_many_reports_failures(data_fetcher, mock_exchange_handler):
+    original_fetch_ohlcv = mock_exchange_handler.exchange.fetch_ohlcv
+
+    def flaky_fetch_ohlcv(symbol, timeframe='1h', since=None, limit=1):
+        if symbol == "BAD/USDT":
+            raise ccxt.BadSymbol("unknown symbol")
+        return original_fetch_ohlcv(symbol, timeframe, since, limit)
+
+    mock_exchange_handler.exchange.fetch_ohlcv = flaky_fetch_ohlcv
+    results = {symbol: df for symbol, _, df in data_fetcher.fetch_many(["BTC/USDT", "BAD/USDT"], '1h')}
+
+    assert results["BAD/USDT"] is None
+    assert not results["BTC/USDT"].empty
+
+def test_fetch_many_respects_rate_limit(monkeypatch):
+    limiter = get_rate_limiter()
+    acquires = []
+    monkeypatch.setattr(limiter, 'weight_for', lambda exchange_id, endpoint, default=1.0: 1.0)
+    monkeypatch.setattr(limiter, 'acquire', lambda exchange_id, endpoint, weight=None:
+                        acquires.append((exchange_id, endpoint, weight)) or 0.0)
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    handler.exchange.fetch_ohlcv, calls = make_paged_fetch_ohlcv(1672531200000, 3)
+    symbols = ["BTC/USDT", "ETH/USDT", "ADA/USDT", "SOL/USDT", "XRP/USDT"]
+
+    results = list(DataFetcher(exchange_handler=handler).fetch_many(symbols, '1h', limit=3, max_workers=5))
+
+    assert len(results) == 5 and all(len(df) == 3 for _, _, df in results)
+    assert len(calls) == 5
+    assert acquires == [('binance', 'fetch_ohlcv', 1.0)] * 5 # One reservation per page, from every worker
+
+def test_plan_gap_requests_merges_nearby_gaps_and_splits_long_ones():
+    # Two small gaps within one page share a request; a 25-candle gap needs three pages of 10.
+    gaps = [(10, 12), (15, 17), (100, 125)]
+    assert plan_gap_requests(gaps, interval_ms=1, page_limit=10) == [(10, 7), (100, 10), (110, 10), (120, 5)]
+    assert plan_gap_requests([], interval_ms=1, page_limit=10) == []
+
+def test_repair_gaps_refetches_only_missing_candles(data_fetcher, mock_exchange_handler, tmp_path):
+    from src.candle_store import CandleStore
+    start = 1672531200000
+    hour = 3_600_000
+    mock_exchange_handler.exchange.fetch_ohlcv, calls = make_paged_fetch_ohlcv(start, 30, page_cap=1000)
+    store = CandleStore(str(tmp_path))
+    all_candles = mock_exchange_handler.exchange.fetch_ohlcv("BTC/USDT", '1h', start, 1000)
+    calls.clear()
+    kept = [c for i, c in enumerate(all_candles) if i not in (4, 5, 20)]
+    store.append("mock_exchange", "BTC/USDT", "1h", kept)
+
+    filled = data_fetcher.repair_gaps(store, "BTC/USDT", timeframe='1h', page_limit=100)
+
+    assert filled == 3
+    assert calls == [start + 4 * hour] # Both gaps fit in one page
+    df = store.load("mock_exchange", "BTC/USDT", "1h")
+    assert len(df) == 30
+    assert df['timestamp'].is_monotonic_increasing and df['timestamp'].is_unique
+
+def test_repair_gaps_without_gaps(data_fetcher, mock_exchange_handler, tmp_path):
+    from src.candle_store import CandleStore
+    store = CandleStore(str(tmp_path))
+    store.append("mock_exchange", "BTC/USDT", "1h", [[1672531200000 + i * 3_600_000, 1, 1, 1, 1, 1] for i in range(3)])
+    assert data_fetcher.repair_gaps(store, "BTC/USDT", timeframe='1h') == 0
+
+def test_fetch_historical_ohlcv_compact(mock_exchange_handler, tmp_path):
+    mock_exchange_handler.load_markets()
+    fetcher = DataFetcher(exchange_handler=mock_exchange_handler, compact=True)
+    df = fetcher.fetch_historical_ohlcv(symbol="BTC/USDT", timeframe='1h', limit=1, output_dir=str(tmp_path))
+
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert df.index.name == 'timestamp' and df.index.dtype == 'int64'
+    assert (df.dtypes == 'float32').all()
+
+    # Files keep the default layout regardless of the in-memory representation
+    df_read = pd.read_csv(os.path.join(str(tmp_path), "mock_exchange_BTC_USDT_1h.csv"))
+    assert list(df_read.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert df_read['open'].iloc[0] == 16000
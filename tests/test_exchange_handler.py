@@ -0,0 +1,165 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import ccxt
+import numpy as np
+import pytest
+from src.data_fetcher import DataFetcher
+from src.exchange_handler import ExchangeHandler
+from src.trading_engine import TradingEngine
+
+MARKETS = {
+    'BTC/USDT': {'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', 'baseId': 'BTC',
+                 'quoteId': 'USDT', 'type': 'spot', 'spot': True, 'active': True},
+}
+
+def make_balance():
+    return {
+        'BTC': {'free': 1.0, 'used': 0.0, 'total': 1.0},
+        'USDT': {'free': 1000.0, 'used': 0.0, 'total': 1000.0},
+        'free': {'BTC': 1.0, 'USDT': 1000.0},
+        'used': {'BTC': 0.0, 'USDT': 0.0},
+        'total': {'BTC': 1.0, 'USDT': 1000.0},
+    }
+
+@pytest.fixture
+def handler():
+    handler = ExchangeHandler('binance', 'key', 'secret', balance_ttl=60)
+    handler.exchange.set_markets(MARKETS)
+    handler.balance_calls = 0
+
+    def fetch_balance():
+        handler.balance_calls += 1
+        return make_balance()
+
+    handler.exchange.fetch_balance = fetch_balance
+    return handler
+
+def test_balance_is_fetched_once_within_ttl(handler):
+    for _ in range(5):
+        assert handler.fetch_balance()['free']['USDT'] == 1000.0
+    assert handler.balance_calls == 1
+
+    handler.fetch_balance(max_age=0)
+    assert handler.balance_calls == 2
+
+def test_invalidate_balance(handler):
+    handler.fetch_balance()
+    handler.invalidate_balance()
+    handler.fetch_balance()
+    assert handler.balance_calls == 2
+
+def test_fill_is_applied_to_cached_balance(handler):
+    handler.fetch_balance()
+    order = {'id': '1', 'symbol': 'BTC/USDT', 'side': 'buy', 'filled': 0.5, 'cost': 100.0,
+             'fee': {'cost': 0.001, 'currency': 'BTC'}}
+    assert handler.apply_fill_to_balance(order)
+
+    balance = handler.fetch_balance()
+    assert handler.balance_calls == 1
+    assert balance['free']['BTC'] == pytest.approx(1.499)
+    assert balance['BTC']['total'] == pytest.approx(1.499)
+    assert balance['free']['USDT'] == pytest.approx(900.0)
+
+def test_applied_fill_does_not_change_returned_snapshots(handler):
+    before = handler.fetch_balance()
+    free_btc, total_usdt = before['free']['BTC'], before['USDT']['total']
+    order = {'id': '4', 'symbol': 'BTC/USDT', 'side': 'buy', 'filled': 0.5, 'cost': 100.0, 'fees': []}
+    assert handler.apply_fill_to_balance(order)
+
+    assert (before['free']['BTC'], before['USDT']['total']) == (free_btc, total_usdt)
+    after = handler.fetch_balance()
+    assert after is not before
+    assert after['free']['BTC'] == pytest.approx(free_btc + 0.5)
+    assert handler.balance_calls == 1
+
+def test_unusable_fill_invalidates_cached_balance(handler):
+    handler.fetch_balance()
+    assert not handler.apply_fill_to_balance({'id': '2', 'symbol': 'BTC/USDT', 'side': 'sell', 'status': 'open'})
+    handler.fetch_balance()
+    assert handler.balance_calls == 2
+
+def test_trading_engine_keeps_balance_cache_in_step(handler):
+    engine = TradingEngine(handler)
+    handler.exchange.create_market_sell_order = lambda symbol, amount: {
+        'id': '3', 'symbol': symbol, 'side': 'sell', 'filled': amount, 'cost': amount * 200.0, 'fees': []}
+    handler.fetch_balance()
+    engine.execute_trade('BTC/USDT', 'SELL', 0.25)
+    assert handler.fetch_balance()['free']['USDT'] == pytest.approx(1050.0)
+    assert handler.balance_calls == 1
+
+    def rejected(symbol, amount):
+        raise ccxt.InsufficientFunds("no funds")
+    handler.exchange.create_market_sell_order = rejected
+    assert engine.execute_trade('BTC/USDT', 'SELL', 10) is None
+    handler.fetch_balance()
+    assert handler.balance_calls == 2
+
+def make_ticker(symbol, last):
+    return {'symbol': symbol, 'bid': last - 1, 'ask': last + 1, 'last': last, 'quoteVolume': last * 10}
+
+def test_tickers_snapshot_uses_bulk_endpoint_in_chunks():
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    calls = []
+
+    def fetch_tickers(symbols=None):
+        calls.append(symbols)
+        return {symbol: make_ticker(symbol, 100.0 + i) for i, symbol in enumerate(symbols)}
+
+    handler.exchange.fetch_tickers = fetch_tickers
+    symbols = [f"C{i}/USDT" for i in range(250)]
+    snapshot = handler.fetch_tickers_snapshot(symbols, chunk_size=100)
+
+    assert sorted(len(chunk) for chunk in calls) == [50, 100, 100]
+    assert snapshot['symbol'].tolist() == symbols
+    assert snapshot['last'].dtype == np.float64
+    assert snapshot['last'][0] == 100.0
+
+def test_tickers_snapshot_falls_back_to_per_symbol_requests():
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    handler.exchange.has = dict(handler.exchange.has, fetchTickers=False)
+
+    def fetch_ticker(symbol):
+        if symbol == 'BAD/USDT':
+            raise ccxt.BadSymbol("unknown symbol")
+        ticker = make_ticker(symbol, 50.0)
+        ticker['bid'] = None
+        return ticker
+
+    handler.exchange.fetch_ticker = fetch_ticker
+    snapshot = handler.fetch_tickers_snapshot(['BTC/USDT', 'BAD/USDT', 'ETH/USDT'])
+    assert snapshot['symbol'].tolist() == ['BTC/USDT', 'ETH/USDT']
+    assert np.isnan(snapshot['bid']).all()
+    assert snapshot['quoteVolume'].tolist() == [500.0, 500.0]
+
+def test_identical_concurrent_reads_share_one_request(tmp_path):
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    calls = []
+
+    def fetch_ohlcv(symbol, timeframe='1m', since=None, limit=None):
+        calls.append((symbol, since))
+        time.sleep(0.2)
+        return [[since, 1.0, 1.0, 1.0, 1.0, 1.0]]
+
+    handler.exchange.fetch_ohlcv = fetch_ohlcv
+    fetcher = DataFetcher(handler)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        frames = list(executor.map(lambda since: fetcher.fetch_historical_ohlcv('BTC/USDT', '1m', since, 1, None),
+                                   [0, 0, 0, 0, 60_000, 60_000]))
+
+    assert sorted(calls) == [('BTC/USDT', 0), ('BTC/USDT', 60_000)]
+    assert [len(df) for df in frames] == [1] * 6
+    assert handler.single_flight.coalesced == 4
+
+def test_order_calls_are_never_coalesced():
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    calls = []
+
+    def create_order(*args):
+        calls.append(args)
+        time.sleep(0.1)
+        return {'id': str(len(calls))}
+
+    handler.exchange.create_order = create_order
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: handler.request('create_order', 'BTC/USDT', 'market', 'buy', 1), range(3)))
+    assert len(calls) == 3
@@ -0,0 +1,44 @@
+import gc
+from concurrent.futures import ThreadPoolExecutor
+from src.exchange_pool import ExchangeHandlerPool, create_http_session
+
+def test_http_session_pool_size():
+    session = create_http_session(32)
+    adapter = session.get_adapter('https://api.binance.com')
+    assert adapter._pool_maxsize == 32
+    session.close()
+
+def test_pool_reuses_handlers_per_account():
+    with ExchangeHandlerPool(pool_size=4, balance_ttl=30) as pool:
+        handler = pool.get('binance', 'key', 'secret')
+        assert pool.get('binance', 'key', 'secret') is handler
+        assert pool.get('binance', 'key', 'secret', is_testnet=True) is not handler
+        assert pool.get('binance', 'other_key', 'secret') is not handler
+        assert len(pool) == 3
+
+        # Every handler sends its requests through the pool's keep-alive session
+        assert handler.exchange.session is pool.session
+        assert pool.get('kraken', 'key', 'secret').exchange.session is pool.session
+        assert handler.balance_ttl == 30
+
+def test_pool_creates_one_handler_under_concurrency():
+    with ExchangeHandlerPool() as pool:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            handlers = list(executor.map(lambda _: pool.get('binance', 'key', 'secret'), range(32)))
+    assert len({id(handler) for handler in handlers}) == 1
+
+def test_failed_handlers_are_not_pooled():
+    with ExchangeHandlerPool() as pool:
+        assert pool.get('no_such_exchange', 'key', 'secret').exchange is None
+        assert len(pool) == 0
+
+def test_disposed_handlers_leave_the_shared_session_open():
+    with ExchangeHandlerPool() as pool:
+        closed = []
+        pool.session.close = lambda: closed.append(True)
+        handler = pool.get('binance', 'key', 'secret')
+        handler.exchange.close()
+        pool._handlers.clear()
+        del handler
+        gc.collect()
+        assert closed == []
@@ -0,0 +1,91 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.indicators import (ATR, EMA, MACD, RSI, SMA, BollingerBands, atr, bollinger_bands, ema, macd, rsi,
+                                   sma, true_range)
+
+def make_bars(length=400, seed=0, price=100.0):
+    rng = np.random.default_rng(seed)
+    close = price + np.cumsum(rng.normal(0, 1, length))
+    return close + rng.random(length), close - rng.random(length), close
+
+def as_array(values):
+    return np.array([np.nan if value is None else value for value in values])
+
+def test_ema_matches_pandas_after_seed():
+    _, _, close = make_bars()
+    values = ema(close, 10)
+    assert np.isnan(values[:9]).all()
+    assert values[9] == pytest.approx(close[:10].mean())
+    expected = pd.Series(np.concatenate([[close[:10].mean()], close[10:]])).ewm(span=10, adjust=False).mean()
+    np.testing.assert_allclose(values[9:], expected.to_numpy())
+
+def test_sma_matches_pandas_and_skips_windows_with_nan():
+    _, _, close = make_bars()
+    close[100] = np.nan
+    expected = pd.Series(close).rolling(10).mean().to_numpy()
+    np.testing.assert_allclose(sma(close, 10), expected, rtol=1e-12)
+    np.testing.assert_allclose(sma(np.vstack([close, close * 2]), 10)[1], expected * 2, rtol=1e-12)
+    assert np.isnan(sma(close[:5], 10)).all()
+    stream = SMA(10)
+    np.testing.assert_allclose(as_array([stream.update(value) for value in close]), expected, rtol=1e-12)
+
+def test_sma_does_not_drift_on_long_histories():
+    close = np.round(np.repeat(np.linspace(100, 60_000, 1000), 100), 2)
+    stream = SMA(20)
+    for value in close:
+        streamed = stream.update(value)
+    assert sma(close, 20)[-1] == streamed == close[-20:].mean()
+
+def test_rsi_bounds_and_flat_prices():
+    _, _, close = make_bars()
+    values = rsi(close, 14)
+    assert np.isnan(values[:14]).all()
+    assert ((values[14:] >= 0) & (values[14:] <= 100)).all()
+    assert (rsi(np.full(30, 5.0), 14)[14:] == 50.0).all()
+    assert (rsi(np.arange(30.0), 14)[14:] == 100.0).all()
+
+def test_true_range_uses_previous_close():
+    assert true_range([10.0, 12.0], [9.0, 11.0], [9.5, 11.5]).tolist() == [1.0, 2.5]
+
+@pytest.mark.parametrize("name, make_stream, batch, fields", [
+    ('sma', lambda: SMA(10), lambda h, l, c: {'value': sma(c, 10)}, ('value',)),
+    ('ema', lambda: EMA(10), lambda h, l, c: {'value': ema(c, 10)}, ('value',)),
+    ('rsi', lambda: RSI(14), lambda h, l, c: {'value': rsi(c, 14)}, ('value',)),
+    ('macd', lambda: MACD(), lambda h, l, c: macd(c), ('macd', 'signal', 'histogram')),
+    ('bollinger', lambda: BollingerBands(20, 2.0), lambda h, l, c: bollinger_bands(c, 20, 2.0), ('middle', 'upper', 'lower')),
+    ('atr', lambda: ATR(14), lambda h, l, c: {'value': atr(h, l, c, 14)}, ('value',)),
+])
+def test_streaming_matches_batch(name, make_stream, batch, fields):
+    high, low, close = make_bars()
+    stream = make_stream()
+    outputs = [stream.update(*bar) if name == 'atr' else stream.update(bar[2]) for bar in zip(high, low, close)]
+    expected = batch(high, low, close)
+    for field in fields:
+        values = [output if field == 'value' else output and output[field] for output in outputs]
+        np.testing.assert_allclose(as_array(values), expected[field], rtol=1e-9, atol=1e-9, err_msg=f"{name} {field}")
+
+def test_streaming_bollinger_keeps_precision_at_high_prices():
+    _, _, close = make_bars(length=20_000, seed=1, price=60_000.0)
+    close = close + np.sin(np.arange(len(close))) * 1e-3
+    stream = BollingerBands(20)
+    for value in close:
+        bands = stream.update(value)
+    expected = bollinger_bands(close, 20)
+    assert bands['upper'] - bands['middle'] == pytest.approx(expected['upper'][-1] - expected['middle'][-1], rel=1e-6)
+
+@pytest.mark.parametrize("make_stream", [lambda: SMA(5), lambda: EMA(5), lambda: RSI(5), lambda: MACD(3, 6, 2), lambda: BollingerBands(5), lambda: ATR(5)])
+def test_state_roundtrips_through_json(make_stream):
+    high, low, close = make_bars(length=50)
+    original = make_stream()
+    args = (lambda i: (high[i], low[i], close[i])) if isinstance(original, ATR) else (lambda i: (close[i],))
+    for i in range(30):
+        original.update(*args(i))
+    restored = type(original).from_state(json.loads(json.dumps(original.get_state())))
+    for i in range(30, 50):
+        assert restored.update(*args(i)) == original.update(*args(i))
+
+def test_from_state_rejects_other_indicators():
+    with pytest.raises(ValueError):
+        RSI.from_state(EMA(5).get_state())
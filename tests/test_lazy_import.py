@@ -0,0 +1,21 @@
+import subprocess
+import sys
+from src.lazy_import import LazyModule, lazy_import
+
+def test_lazy_module_imports_on_first_attribute_access():
+    sys.modules.pop('colorsys', None)
+    module = lazy_import('colorsys')
+    assert isinstance(module, LazyModule)
+    assert 'colorsys' not in sys.modules
+
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert 'colorsys' in sys.modules
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_import('json') is sys.modules['json']
+
+def test_importing_package_modules_does_not_import_ccxt():
+    code = ("import sys; import src.exchange_handler, src.data_fetcher, src.trading_engine, src.resampler, "
+            "src.async_exchange_handler, src.async_data_fetcher, src.exchange_pool; print('ccxt' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,49 @@
+from src.market_index import MarketIndex, market_type
+from src.exchange_handler import ExchangeHandler
+
+MARKETS = {
+    'BTC/USDT': {'symbol': 'BTC/USDT', 'type': 'spot', 'active': True, 'base': 'BTC', 'quote': 'USDT', 'settle': None,
+                 'precision': {'amount': 0.00001, 'price': 0.01}, 'limits': {'amount': {'min': 0.00001}}},
+    'BTC/USDT:USDT': {'symbol': 'BTC/USDT:USDT', 'type': 'swap', 'active': True, 'base': 'BTC', 'quote': 'USDT', 'settle': 'USDT'},
+    'ETH/USDT:USDT': {'symbol': 'ETH/USDT:USDT', 'type': 'swap', 'active': True, 'base': 'ETH', 'quote': 'USDT', 'settle': 'USDT'},
+    'LUNA/USDT:USDT': {'symbol': 'LUNA/USDT:USDT', 'type': 'swap', 'active': False, 'base': 'LUNA', 'quote': 'USDT', 'settle': 'USDT'},
+    'BTC/USD:BTC': {'symbol': 'BTC/USD:BTC', 'type': 'swap', 'active': True, 'base': 'BTC', 'quote': 'USD', 'settle': 'BTC'},
+    'BTC/USDT:USDT-240628': {'symbol': 'BTC/USDT:USDT-240628', 'type': 'future', 'active': True, 'base': 'BTC',
+                             'quote': 'USDT', 'settle': 'USDT'},
+}
+
+def test_select_combines_criteria():
+    index = MarketIndex(MARKETS)
+    assert index.select(type='swap', active=True, settle='USDT') == ['BTC/USDT:USDT', 'ETH/USDT:USDT']
+    assert index.select(base='BTC', active=True) == ['BTC/USDT', 'BTC/USDT:USDT', 'BTC/USD:BTC', 'BTC/USDT:USDT-240628']
+    assert index.select(active=False) == ['LUNA/USDT:USDT']
+    assert index.select(type='option') == []
+    assert index.select() == list(MARKETS)
+
+def test_select_returns_a_copy():
+    index = MarketIndex(MARKETS)
+    index.select(type='spot').append('X')
+    assert index.select(type='spot') == ['BTC/USDT']
+
+def test_precision_and_limits():
+    index = MarketIndex(MARKETS)
+    assert index.precision('BTC/USDT') == {'amount': 0.00001, 'price': 0.01}
+    assert index.limits('BTC/USDT')['amount']['min'] == 0.00001
+    assert index.precision('ETH/USDT:USDT') == {}
+    assert index.precision('NOPE/USDT') is None
+    assert 'BTC/USDT' in index and len(index) == len(MARKETS)
+
+def test_market_type_falls_back_to_flags():
+    assert market_type({'future': True, 'active': True}) == 'future'
+    assert market_type({'spot': True}) == 'spot'
+
+def test_handler_rebuilds_index_only_on_markets_load():
+    handler = ExchangeHandler('binance', 'key', 'secret')
+    handler.exchange.markets = MARKETS
+    index = handler.market_index
+    assert handler.market_index is index
+    assert handler.fetch_futures_trading_pairs() == ['BTC/USDT:USDT-240628']
+
+    handler.exchange.markets = {'BTC/USDT': MARKETS['BTC/USDT']}
+    assert handler.market_index is not index
+    assert handler.fetch_futures_trading_pairs() == []
@@ -0,0 +1,70 @@
+import json
+import os
+import time
+import pytest
+from src.markets_cache import MarketsCache
+from src.exchange_handler import ExchangeHandler
+
+MARKETS = {
+    'BTC/USDT': {'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', 'baseId': 'BTC',
+                 'quoteId': 'USDT', 'type': 'spot', 'spot': True, 'active': True},
+}
+
+@pytest.fixture
+def cache(tmp_path):
+    return MarketsCache(str(tmp_path), ttl=60)
+
+def test_save_and_load(cache):
+    assert cache.load('binance') is None
+    assert cache.save('binance', MARKETS, {'BTC': {'code': 'BTC'}})
+    markets, currencies = cache.load('binance')
+    assert markets == MARKETS
+    assert currencies == {'BTC': {'code': 'BTC'}}
+
+def test_entries_are_keyed_by_testnet_flag(cache):
+    cache.save('binance', MARKETS, is_testnet=True)
+    assert cache.load('binance') is None
+    assert cache.load('binance', is_testnet=True) is not None
+    assert cache.path_for('binance', True).endswith('markets_binance_testnet.json')
+
+def test_expired_entry_is_ignored(cache):
+    cache.save('binance', MARKETS)
+    path = cache.path_for('binance')
+    with open(path) as f:
+        entry = json.load(f)
+    entry['saved_at'] = time.time() - 120
+    with open(path, 'w') as f:
+        json.dump(entry, f)
+    assert cache.load('binance') is None
+
+def test_corrupt_entry_is_ignored(cache):
+    os.makedirs(cache.cache_dir, exist_ok=True)
+    with open(cache.path_for('binance'), 'w') as f:
+        f.write('{not json')
+    assert cache.load('binance') is None
+
+def test_handler_skips_download_when_cache_is_fresh(cache):
+    handler = ExchangeHandler('binance', 'key', 'secret', markets_cache=cache)
+    downloads = []
+
+    def fake_load_markets(reload=False):
+        downloads.append(reload)
+        handler.exchange.set_markets(MARKETS)
+        return handler.exchange.markets
+
+    handler.exchange.load_markets = fake_load_markets
+    assert handler.load_markets()
+    assert downloads == [False]
+    assert os.path.exists(cache.path_for('binance'))
+
+    # A new process restores the catalog from disk with no request at all
+    fresh = ExchangeHandler('binance', 'key', 'secret', markets_cache=cache)
+    fresh.exchange.load_markets = fake_load_markets
+    assert fresh.load_markets()
+    assert downloads == [False]
+    assert 'BTC/USDT' in fresh.exchange.markets
+    assert fresh.exchange.market('BTC/USDT')['id'] == 'BTCUSDT'
+
+    # An explicit refresh downloads again
+    assert fresh.load_markets(reload=True)
+    assert downloads == [False, True]
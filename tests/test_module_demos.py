@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.parametrize('module', ['src.trading_engine', 'src.data_fetcher'])
+def test_module_demo_runs_with_dash_m(module, tmp_path):
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    result = subprocess.run([sys.executable, '-m', module], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert 'Complete ---' in result.stderr
@@ -0,0 +1,90 @@
+import threading
+import time
+import pytest
+from src.rate_limiter import RateLimitScheduler, TokenBucket, get_rate_limiter
+from src.exchange_handler import ExchangeHandler
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+def test_scheduler_unconfigured_exchange_is_not_throttled():
+    scheduler = RateLimitScheduler()
+    assert scheduler.reserve("unknown", "fetch_ohlcv") == 0.0
+
+def test_scheduler_charges_endpoint_weight():
+    scheduler = RateLimitScheduler()
+    scheduler.configure_exchange("ex", rate=10, capacity=10)
+    scheduler.configure_endpoint("ex", "fetch_balance", weight=10)
+    assert scheduler.reserve("ex", "fetch_balance") == 0.0
+    assert scheduler.reserve("ex", "fetch_ohlcv") == pytest.approx(0.1, abs=0.01)
+
+def test_scheduler_endpoint_bucket_limits_independently():
+    scheduler = RateLimitScheduler()
+    scheduler.configure_exchange("ex", rate=100)
+    scheduler.configure_endpoint("ex", "create_order", rate=1, capacity=1)
+    assert scheduler.reserve("ex", "create_order") == 0.0
+    assert scheduler.reserve("ex", "create_order") == pytest.approx(1.0, abs=0.01)
+    assert scheduler.reserve("ex", "fetch_ohlcv") == 0.0
+
+def test_register_exchange_derives_rate_from_ccxt_rate_limit():
+    scheduler = RateLimitScheduler()
+    scheduler.register_exchange("ex", rate_limit_ms=100)
+    assert scheduler.is_configured("ex")
+    waits = [scheduler.reserve("ex", "fetch_ohlcv") for _ in range(12)]
+    assert waits[-1] == pytest.approx(0.2, abs=0.02) # 10/s with a burst of 10
+
+def test_register_exchange_again_keeps_reservations():
+    scheduler = RateLimitScheduler()
+    scheduler.register_exchange("ex", rate_limit_ms=100, overrides={'rate': 10, 'burst': 2})
+    scheduler.reserve("ex", "fetch_ohlcv", weight=2)
+    # Another handler with the same overrides must not refill the bucket
+    scheduler.register_exchange("ex", rate_limit_ms=100, overrides={'rate': 10, 'burst': 2})
+    assert scheduler.reserve("ex", "fetch_ohlcv") == pytest.approx(0.1, abs=0.02)
+
+    # A different rate applies, still counting what was reserved
+    scheduler.register_exchange("ex", rate_limit_ms=100, overrides={'rate': 20, 'burst': 2})
+    assert scheduler._exchange_buckets["ex"].rate == 20
+    assert scheduler.reserve("ex", "fetch_ohlcv") == pytest.approx(0.1, abs=0.02)
+
+def test_scheduler_is_shared_across_threads():
+    scheduler = RateLimitScheduler()
+    scheduler.configure_exchange("ex", rate=50, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=scheduler.acquire, args=("ex", "fetch_ohlcv")) for _ in range(11)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 0.19 # 10 calls beyond the burst at 50/s
+
+def record_acquires(monkeypatch):
+    calls = []
+    monkeypatch.setattr(get_rate_limiter(), "acquire",
+                        lambda exchange_id, endpoint, weight=None: calls.append((exchange_id, endpoint, weight)) or 0.0)
+    handler = ExchangeHandler("binance", "key", "secret")
+    handler.exchange.fetch = lambda url, method='GET', headers=None, body=None: {}
+    return handler, calls
+
+def test_exchange_handler_requests_go_through_shared_scheduler(monkeypatch):
+    handler, calls = record_acquires(monkeypatch)
+    assert handler.request('public_get_ping') == {}
+    assert calls == [("binance", "public_get_ping", 0.2)] # ccxt's cost of the endpoint
+    assert handler.exchange.enableRateLimit is False
+
+def test_exchange_handler_charges_ccxt_endpoint_costs(monkeypatch):
+    handler, calls = record_acquires(monkeypatch)
+    handler.request('public_get_ticker_24hr') # All symbols
+    handler.request('public_get_ticker_24hr', {'symbol': 'BTCUSDT'})
+    assert [weight for _, _, weight in calls] == [16, 0.4]
+
+    # An explicit weight replaces the ccxt cost
+    calls.clear()
+    handler.request('public_get_ticker_24hr', weight=3)
+    assert calls == [("binance", "public_get_ticker_24hr", 3)]
@@ -0,0 +1,89 @@
+import time
+import ccxt
+import pytest
+import requests
+from src.exchange_handler import ExchangeHandler
+from src.request_stats import LATENCY_BUCKETS, RequestStats, latency_quantile
+from src.retry_policy import RetryPolicy
+
+def test_record_counts_errors_by_class_and_buckets_latency():
+    stats = RequestStats()
+    stats.record('binance', 'fetch_ohlcv', 0.03)
+    stats.record('binance', 'fetch_ohlcv', 0.3)
+    stats.record('binance', 'fetch_ohlcv', 20.0, ccxt.RequestTimeout('slow'))
+    stats.record('binance', 'fetch_balance', 0.2, ccxt.AuthenticationError('bad key'))
+
+    site = stats.get('binance', 'fetch_ohlcv')
+    assert site['calls'] == 3
+    assert site['errors_by_type'] == {'RequestTimeout': 1}
+    assert site['histogram'][0] == 1 and site['histogram'][3] == 1 and site['histogram'][-1] == 1
+    assert site['max_latency'] == 20.0
+    assert site['p50_latency'] == 0.5
+
+    exchange = stats.get('binance')
+    assert exchange['calls'] == 4
+    assert exchange['errors_by_type'] == {'RequestTimeout': 1, 'AuthenticationError': 1}
+    assert stats.get('kraken') is None
+    assert [endpoint for _, endpoint, _ in stats.top(by='calls')] == ['fetch_ohlcv', 'fetch_balance']
+
+def test_latency_quantile():
+    histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+    assert latency_quantile(histogram, 0.5) is None
+    histogram[1] = 9
+    histogram[-1] = 1
+    assert latency_quantile(histogram, 0.5) == 0.1
+    assert latency_quantile(histogram, 1.0) == float('inf')
+
+def test_handler_accounts_attempts_and_response_bytes():
+    stats = RequestStats()
+    handler = ExchangeHandler('binance', 'key', 'secret', request_stats=stats,
+                              retry_policy=RetryPolicy(base_delay=0.0, jitter=False))
+    body = '{"serverTime": 1700000000000, "note": "±1ms"}'.encode() # Bytes, not characters, are counted
+    responses = [ccxt.NetworkError('reset'), body]
+
+    def fake_request(method, url, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        http_response = requests.Response()
+        http_response.status_code = 200
+        http_response.reason = 'OK'
+        http_response.url = url
+        http_response._content = response
+        http_response.encoding = 'utf-8'
+        return http_response
+
+    handler.exchange.session.request = fake_request
+    assert handler.request('fetch_time') == 1700000000000
+
+    site = stats.get('binance', 'fetch_time')
+    assert site['calls'] == 2
+    assert site['errors_by_type'] == {'NetworkError': 1}
+    assert site['http_requests'] == 1
+    assert site['bytes_received'] == len(body)
+    assert 'fetch_time' in stats.format_table()
+
+def test_handler_latency_excludes_rate_limit_waits(monkeypatch):
+    stats = RequestStats()
+    handler = ExchangeHandler('binance', 'key', 'secret', request_stats=stats)
+    clock = [0.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+
+    def acquire(exchange_id, endpoint, weight=None):
+        clock[0] += 2.0 # Throttled for 2s before each HTTP request
+        return 2.0
+
+    def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        clock[0] += 0.1 # The request itself takes 0.1s
+        return {'serverTime': 1700000000000}
+
+    monkeypatch.setattr(handler.rate_limiter, 'acquire', acquire)
+    monkeypatch.setattr(handler.exchange, 'fetch2', fetch2)
+    handler._charge_endpoint_costs()
+    handler.request('fetch_time')
+    handler.request('fetch_time', weight=1)
+
+    site = stats.get('binance', 'fetch_time')
+    assert site['total_latency'] == pytest.approx(0.2)
+    assert site['total_wait'] == pytest.approx(4.0)
+    assert site['total_call_latency'] == pytest.approx(4.2)
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.candle_store import CandleStore
+from src.resampler import IncrementalResampler, resample_ohlcv, resample_store, timeframe_to_ms
+
+MINUTE_MS = 60_000
+HOUR_MS = 3_600_000
+START = 1672531200000 # 2023-01-01 00:00:00 UTC (a Sunday)
+
+def make_minutes(start, count):
+    return [[start + i * MINUTE_MS, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0 + i] for i in range(count)]
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms('5m') == 5 * MINUTE_MS
+    assert timeframe_to_ms('4h') == 4 * HOUR_MS
+    with pytest.raises(ValueError):
+        timeframe_to_ms('1M')
+
+def test_resample_ohlcv_aggregates_each_bucket():
+    df = resample_ohlcv(make_minutes(START, 150), '1h')
+
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+    assert len(df) == 3
+    first = df.iloc[0]
+    assert first['timestamp'] == pd.Timestamp(START, unit='ms')
+    assert (first['open'], first['high'], first['low'], first['close']) == (100.0, 160.0, 99.0, 159.5)
+    assert first['volume'] == sum(1.0 + i for i in range(60))
+    # The trailing bar only covers 30 minutes
+    assert df.iloc[2]['close'] == 249.5
+
+def test_resample_weekly_bars_start_on_monday():
+    daily = [[START + i * 86_400_000, 1.0, 2.0, 0.5, 1.5, 1.0] for i in range(9)]
+    df = resample_ohlcv(daily, '1w')
+    assert df['timestamp'].dt.dayofweek.tolist() == [0, 0, 0]
+    assert df['volume'].tolist() == [1.0, 7.0, 1.0]
+
+def test_incremental_resampler_matches_batch():
+    candles = make_minutes(START, 200)
+    resampler = IncrementalResampler('1h')
+    closed = []
+    for chunk_start in range(0, 200, 7):
+        closed.extend(resampler.update(candles[chunk_start:chunk_start + 7]))
+
+    assert [bar[0] for bar in closed] == [START, START + HOUR_MS, START + 2 * HOUR_MS]
+    expected = resample_ohlcv(candles, '1h')
+    pd.testing.assert_frame_equal(resampler.to_frame(), expected, check_dtype=False)
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_resample_store_appends_only_complete_bars(tmp_path, fmt):
+    store = CandleStore(str(tmp_path), fmt=fmt)
+    candles = make_minutes(START, 150)
+    store.append("binance", "BTC/USDT", "1m", candles[:90])
+
+    assert resample_store(store, "binance", "BTC/USDT", "1m", "1h") == 1
+    assert resample_store(store, "binance", "BTC/USDT", "1m", "1h") == 0
+
+    store.append("binance", "BTC/USDT", "1m", candles[90:])
+    assert resample_store(store, "binance", "BTC/USDT", "1m", "1h") == 1
+
+    stored = store.load("binance", "BTC/USDT", "1h")
+    expected = resample_ohlcv(candles, '1h').iloc[:2].reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_resample_store_skips_a_partial_leading_bar(tmp_path, fmt):
+    store = CandleStore(str(tmp_path), fmt=fmt)
+    # Base data starting at 00:17, so the 00:00 bar would only cover 43 minutes
+    candles = make_minutes(START, 180)
+    store.append("binance", "BTC/USDT", "1m", candles[17:])
+
+    assert resample_store(store, "binance", "BTC/USDT", "1m", "1h") == 2
+    stored = store.load("binance", "BTC/USDT", "1h")
+    expected = resample_ohlcv(candles, '1h').iloc[1:3].reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+
+def test_resample_store_rejects_incompatible_timeframes(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert resample_store(store, "binance", "BTC/USDT", "1h", "1m") is None
+    assert resample_store(store, "binance", "BTC/USDT", "1h", "90m") is None
+
+def test_load_columns_since(tmp_path):
+    store = CandleStore(str(tmp_path), fmt='npy')
+    store.append("binance", "BTC/USDT", "1m", make_minutes(START, 10))
+    columns = store.load_columns("binance", "BTC/USDT", "1m", since=START + 7 * MINUTE_MS)
+    assert columns['timestamp'].dtype == np.int64
+    assert columns['close'].tolist() == [107.5, 108.5, 109.5]
@@ -0,0 +1,93 @@
+import asyncio
+import ccxt
+import pytest
+from src.request_stats import RequestStats
+from src.retry_policy import RetryPolicy, RetryStats, is_idempotent
+from src.exchange_handler import ExchangeHandler
+from src.async_exchange_handler import AsyncExchangeHandler
+
+FAST = dict(base_delay=0.001, max_delay=0.002, deadline=5.0)
+
+def flaky(errors, result='ok'):
+    """Returns a function raising each of `errors` once before returning `result`, and its call log."""
+    calls = []
+    def fn(*args, **kwargs):
+        calls.append(args)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return fn, calls
+
+def test_is_idempotent():
+    assert is_idempotent('fetch_ohlcv')
+    assert is_idempotent('cancel_order')
+    assert not is_idempotent('create_market_buy_order')
+
+def test_backoff_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+    jittered = RetryPolicy(base_delay=1, max_delay=5)
+    assert all(0 <= jittered.backoff(3) <= 4 for _ in range(50))
+
+def test_orders_are_only_retried_when_rejected():
+    policy = RetryPolicy()
+    assert policy.is_retryable(ccxt.RequestTimeout("timeout"), idempotent=True)
+    assert not policy.is_retryable(ccxt.RequestTimeout("timeout"), idempotent=False)
+    assert policy.is_retryable(ccxt.RateLimitExceeded("429"), idempotent=False)
+    assert not policy.is_retryable(ccxt.InsufficientFunds("no funds"), idempotent=True)
+
+def test_deadline_stops_retries():
+    policy = RetryPolicy(base_delay=1, jitter=False, deadline=2)
+    assert policy.next_delay(ccxt.NetworkError(), attempt=1, elapsed=0.5) == 1
+    assert policy.next_delay(ccxt.NetworkError(), attempt=1, elapsed=1.5) is None
+    assert policy.next_delay(ccxt.NetworkError(), attempt=3, elapsed=0) is None
+
+def test_stats_record_retries_and_latency():
+    stats = RetryStats()
+    stats.record('ex', 'fetch_ohlcv', attempts=3, latency=0.3, succeeded=True)
+    stats.record('ex', 'fetch_ohlcv', attempts=1, latency=0.1, succeeded=False)
+    site = stats.get('ex', 'fetch_ohlcv')
+    assert (site['calls'], site['retries'], site['failures']) == (2, 2, 1)
+    assert site['mean_latency'] == pytest.approx(0.2)
+    assert site['max_latency'] == pytest.approx(0.3)
+    assert stats.get('ex', 'fetch_balance') is None
+
+@pytest.fixture
+def handler():
+    return ExchangeHandler('binance', 'key', 'secret', request_stats=RequestStats(),
+                           retry_policy=RetryPolicy(max_attempts=3, **FAST))
+
+def test_request_retries_transient_errors(handler):
+    handler.exchange.fetch_ohlcv, calls = flaky([ccxt.RequestTimeout("t"), ccxt.ExchangeNotAvailable("503")])
+    assert handler.request('fetch_ohlcv', 'BTC/USDT') == 'ok'
+    assert len(calls) == 3
+    assert handler.retry_stats.get('binance', 'fetch_ohlcv')['retries'] == 2
+    site = handler.request_stats.get('binance', 'fetch_ohlcv')
+    assert (site['calls'], site['errors'], site['logical_calls']) == (3, 2, 1)
+
+def test_request_gives_up_after_max_attempts(handler):
+    handler.exchange.fetch_balance, calls = flaky([ccxt.NetworkError("down")] * 5)
+    assert handler.fetch_balance() is None
+    assert len(calls) == 3
+    assert handler.retry_stats.get('binance', 'fetch_balance')['failures'] == 1
+
+def test_request_does_not_retry_ambiguous_order_failures(handler):
+    handler.exchange.create_market_buy_order, calls = flaky([ccxt.RequestTimeout("t")])
+    with pytest.raises(ccxt.RequestTimeout):
+        handler.request('create_market_buy_order', 'BTC/USDT', 1)
+    assert len(calls) == 1
+
+    handler.exchange.create_market_buy_order, calls = flaky([ccxt.RateLimitExceeded("429")])
+    assert handler.request('create_market_buy_order', 'BTC/USDT', 1) == 'ok'
+    assert len(calls) == 2
+
+def test_async_request_retries_transient_errors():
+    async def scenario():
+        async with AsyncExchangeHandler('binance', 'key', 'secret', retry_policy=RetryPolicy(**FAST)) as handler:
+            fn, calls = flaky([ccxt.RequestTimeout("t")])
+            async def fetch_ohlcv(*args, **kwargs):
+                return fn(*args, **kwargs)
+            handler.exchange.fetch_ohlcv = fetch_ohlcv
+            return await handler.request('fetch_ohlcv', 'BTC/USDT'), len(calls)
+
+    assert asyncio.run(scenario()) == ('ok', 2)
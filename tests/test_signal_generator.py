@@ -0,0 +1,199 @@
+import math
+import pytest
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+from src.models.signal_generator import (MovingAverageCrossoverSignalGenerator, RandomSignalGenerator,
+                                         SIGNAL_LABELS, close_matrix)
+
+BULLISH_CLOSES = [20, 19, 18, 17, 16, 15, 18, 22, 23]
+BEARISH_CLOSES = [10, 11, 12, 13, 14, 15, 12, 10, 9]
+
+def test_invalid_windows():
+    with pytest.raises(ValueError):
+        MovingAverageCrossoverSignalGenerator(short_window=10, long_window=5)
+
+@pytest.mark.parametrize("closes", [BULLISH_CLOSES, BEARISH_CLOSES])
+def test_array_input_matches_dataframe_input(closes):
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    for i in range(1, len(closes) + 1):
+        df_signal = generator.generate_signal(pd.DataFrame({'close': closes[:i]}))
+        array_signal = generator.generate_signal({'close': np.asarray(closes[:i], dtype=float)})
+        assert array_signal == df_signal, f"Mismatch at length {i}"
+
+def test_array_input_detects_crossovers():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    signals = [generator.generate_signal({'close': np.asarray(BULLISH_CLOSES[:i], dtype=float)})
+               for i in range(6, len(BULLISH_CLOSES) + 1)]
+    assert "BUY" in signals
+    assert "SELL" not in signals
+
+def test_array_input_without_close():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    assert generator.generate_signal({'open': np.arange(10.0)}) == "HOLD"
+
+def random_walk(length, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(0, 1, length))
+
+@pytest.mark.parametrize("short_window, long_window", [(3, 5), (2, 10), (7, 8)])
+def test_update_matches_generate_signal_on_every_prefix(short_window, long_window):
+    closes = random_walk(300)
+    closes[[40, 41, 150]] = np.nan
+    generator = MovingAverageCrossoverSignalGenerator(short_window, long_window)
+    updates = [generator.update(close) for close in closes]
+    expected = [generator.generate_signal({'close': closes[:i]}) for i in range(1, len(closes) + 1)]
+    assert updates == expected
+    assert "BUY" in updates and "SELL" in updates
+
+def test_update_sums_do_not_drift():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    closes = random_walk(100_000, seed=1) * 1e6
+    for close in closes:
+        generator.update(close)
+    assert math.fsum(generator._long_sma._partials) == math.fsum(closes[-5:])
+    assert math.fsum(generator._short_sma._partials) == math.fsum(closes[-3:])
+
+def test_reset_clears_update_state():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    first = [generator.update(close) for close in BULLISH_CLOSES]
+    generator.reset()
+    assert [generator.update(close) for close in BULLISH_CLOSES] == first
+
+@pytest.mark.parametrize("short_window, long_window", [(3, 5), (2, 10), (7, 8)])
+def test_generate_signals_matches_generate_signal_on_every_prefix(short_window, long_window):
+    closes = random_walk(300, seed=2)
+    closes[[40, 41, 150]] = np.nan
+    generator = MovingAverageCrossoverSignalGenerator(short_window, long_window)
+    index = pd.date_range('2024-01-01', periods=len(closes), freq='h')
+    signals = generator.generate_signals(pd.DataFrame({'close': closes}, index=index))
+    expected = [generator.generate_signal({'close': closes[:i]}) for i in range(1, len(closes) + 1)]
+    assert signals.index.equals(index)
+    assert signals.tolist() == expected
+    assert generator.generate_signals({'close': closes}).tolist() == expected
+
+def tick_walk(length, decimals, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.round(100 + np.cumsum(rng.normal(0, 0.02, length)), decimals)
+
+def exact_signals(closes, short_window, long_window):
+    """Crossover signals computed in exact decimal arithmetic."""
+    prices = [Fraction(repr(float(close))) for close in closes]
+    signals, previous_gap = [], None
+    for i in range(len(prices)):
+        gap = None
+        if i >= long_window - 1:
+            gap = sum(prices[i - short_window + 1:i + 1]) / short_window - sum(prices[i - long_window + 1:i + 1]) / long_window
+        signal = "HOLD"
+        if gap is not None and previous_gap is not None:
+            signal = "BUY" if gap > 0 >= previous_gap else "SELL" if gap < 0 <= previous_gap else "HOLD"
+        signals.append(signal)
+        previous_gap = gap
+    return signals
+
+@pytest.mark.parametrize("decimals", [1, 2])
+@pytest.mark.parametrize("short_window, long_window", [(3, 5), (5, 20)])
+def test_generate_signals_resolves_ties_on_tick_rounded_closes(decimals, short_window, long_window):
+    # Equal SMAs are frequent on rounded prices; all paths must treat them as exact ties
+    closes = tick_walk(2000, decimals, seed=5)
+    generator = MovingAverageCrossoverSignalGenerator(short_window, long_window)
+    expected = exact_signals(closes, short_window, long_window)
+    assert generator.generate_signals({'close': closes}).tolist() == expected
+    assert [generator.generate_signal({'close': closes[:i]}) for i in range(1, len(closes) + 1)] == expected
+    assert generator.generate_signal(pd.DataFrame({'close': closes})) == expected[-1]
+
+@pytest.mark.parametrize("decimals", [1, 2])
+@pytest.mark.parametrize("short_window, long_window", [(3, 5), (2, 10)])
+def test_update_matches_generate_signals_on_tick_rounded_closes(decimals, short_window, long_window):
+    closes = tick_walk(3000, decimals, seed=6)
+    closes[[500, 501]] = np.nan
+    generator = MovingAverageCrossoverSignalGenerator(short_window, long_window)
+    updates = [generator.update(close) for close in closes]
+    assert updates == generator.generate_signals({'close': closes}).tolist()
+    assert updates[:500] == exact_signals(closes[:500], short_window, long_window)
+
+def test_generate_signal_keeps_rolling_mean_semantics():
+    # Away from ties, generate_signal() is the plain comparison of pandas rolling means
+    closes = random_walk(200, seed=8)
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=8)
+    short_sma = pd.Series(closes).rolling(3).mean()
+    long_sma = pd.Series(closes).rolling(8).mean()
+    for i in range(9, len(closes) + 1):
+        current, previous = short_sma[i - 1] - long_sma[i - 1], short_sma[i - 2] - long_sma[i - 2]
+        expected = "BUY" if current > 0 >= previous else "SELL" if current < 0 <= previous else "HOLD"
+        assert generator.generate_signal(pd.DataFrame({'close': closes[:i]})) == expected
+
+def test_generate_signals_stays_exact_on_long_histories():
+    # 100k closes rising in flat steps from 100 to 60,000: the prefix sums grow large, yet
+    # every tie on a step must still be resolved like update()
+    closes = np.round(np.repeat(np.linspace(100, 60_000, 1000), 100), 2)
+    generator = MovingAverageCrossoverSignalGenerator(short_window=5, long_window=20)
+    signals = generator.generate_signals({'close': closes}).tolist()
+    assert signals == [generator.update(close) for close in closes]
+
+def test_generate_signals_holds_on_flat_prices():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=7)
+    closes = np.concatenate([random_walk(500, seed=3) * 1000, np.full(200, 101_234.37)])
+    assert set(generator.generate_signals({'close': closes})[-190:]) == {"HOLD"}
+
+def test_generate_signals_short_and_missing_input():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=5)
+    assert generator.generate_signals(pd.DataFrame({'close': [1.0, 2.0]})).tolist() == ["HOLD", "HOLD"]
+    assert generator.generate_signals(pd.DataFrame({'open': [1.0, 2.0, 3.0]})).tolist() == ["HOLD"] * 3
+
+def test_random_generate_signals_covers_every_bar():
+    signals = RandomSignalGenerator().generate_signals(pd.DataFrame({'close': np.arange(50.0)}))
+    assert len(signals) == 50
+    assert set(signals) <= {"BUY", "SELL", "HOLD"}
+
+def test_batch_signals_match_per_symbol_signals():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=3, long_window=8)
+    matrix = np.vstack([random_walk(200, seed=seed) for seed in range(20)])
+    matrix[5, 100] = np.nan
+    batch = generator.generate_batch_signals(matrix)
+    assert batch.shape == matrix.shape
+    for row in range(len(matrix)):
+        assert batch.iloc[row].tolist() == generator.generate_signals({'close': matrix[row]}).tolist()
+
+    latest = generator.generate_batch_signals(matrix, latest_only=True)
+    assert latest.tolist() == batch.iloc[:, -1].tolist()
+
+def test_batch_signals_on_tick_rounded_closes():
+    generator = MovingAverageCrossoverSignalGenerator(short_window=5, long_window=20)
+    matrix = np.vstack([tick_walk(1000, decimals=seed % 2 + 1, seed=seed) for seed in range(6)])
+    batch = generator.generate_batch_signals(matrix)
+    for row in range(len(matrix)):
+        assert batch.iloc[row].tolist() == exact_signals(matrix[row], 5, 20)
+    latest = generator.generate_batch_signals(matrix, latest_only=True)
+    assert latest.tolist() == batch.iloc[:, -1].tolist()
+
+def test_close_matrix_aligns_symbols_on_timestamps():
+    hour = 3_600_000
+    btc = pd.DataFrame({'timestamp': pd.to_datetime([0, hour, 2 * hour], unit='ms'), 'close': [1.0, 2.0, 3.0]})
+    eth = {'timestamp': np.array([hour, 3 * hour], dtype=np.int64), 'close': np.array([10.0, 30.0])}
+    matrix = close_matrix({'BTC/USDT': btc, 'ETH/USDT': eth})
+    assert matrix.columns.tolist() == [0, hour, 2 * hour, 3 * hour]
+    assert matrix.loc['BTC/USDT'].tolist()[:3] == [1.0, 2.0, 3.0]
+    assert np.isnan(matrix.loc['ETH/USDT', 0]) and matrix.loc['ETH/USDT', 3 * hour] == 30.0
+
+    latest = MovingAverageCrossoverSignalGenerator(2, 3).generate_batch_signals(matrix, latest_only=True)
+    assert latest.index.tolist() == ['BTC/USDT', 'ETH/USDT']
+
+def test_grid_signals_match_single_generators():
+    closes = random_walk(400, seed=4)
+    closes[200] = np.nan
+    df = pd.DataFrame({'close': closes})
+    grid = MovingAverageCrossoverSignalGenerator.generate_grid_signals(df, [2, 5, 9], [5, 10, 30])
+    assert set(grid.columns) == {(2, 5), (2, 10), (2, 30), (5, 10), (5, 30), (9, 10), (9, 30)}
+    for (short_window, long_window), codes in grid.items():
+        expected = MovingAverageCrossoverSignalGenerator(short_window, long_window).generate_signals(df)
+        assert SIGNAL_LABELS[codes.to_numpy()].tolist() == expected.tolist()
+
+def test_grid_signals_without_close():
+    assert MovingAverageCrossoverSignalGenerator.generate_grid_signals({'open': np.arange(5.0)}, [2], [3]) is None
+
+def test_grid_signals_on_tick_rounded_closes():
+    closes = tick_walk(1500, decimals=2, seed=7)
+    grid = MovingAverageCrossoverSignalGenerator.generate_grid_signals({'close': closes}, [2, 3, 5], [5, 10, 20])
+    for (short_window, long_window), codes in grid.items():
+        assert SIGNAL_LABELS[codes.to_numpy()].tolist() == exact_signals(closes, short_window, long_window)
@@ -0,0 +1,64 @@
+import threading
+import time
+import pytest
+from src.single_flight import SingleFlight, freeze
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+def test_concurrent_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return ['page']
+
+    results, errors = run_concurrently(5, lambda: flight.do('key', slow))
+    assert len(calls) == 1
+    assert errors == [None] * 5
+    assert all(result is results[0] for result in results)
+    assert flight.coalesced == 4
+    assert flight.in_flight() == 0
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError('down')
+
+    results, errors = run_concurrently(3, lambda: flight.do('key', failing))
+    assert len(calls) == 1
+    assert all(isinstance(error, ValueError) for error in errors)
+
+    with pytest.raises(ValueError):
+        flight.do('key', failing)
+    assert len(calls) == 2
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.coalesced == 0
+
+def test_freeze_makes_arguments_hashable():
+    assert freeze(([1, 2], {'b': [3], 'a': 1})) == ((1, 2), (('a', 1), ('b', (3,))))
+    hash(freeze({'symbols': ['BTC/USDT'], 'params': {'type': 'swap'}}))